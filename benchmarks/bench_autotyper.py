@@ -0,0 +1,194 @@
+"""
+End-to-end benchmark of the Autotyper against the offline replica of the typing website.
+
+Starts the fixture server, launches a headless Chromium with the remote debugging port used by the
+``BrowserNavigator`` and runs every lesson of the replica, then reports:
+
+* keystrokes per second (accepted keystrokes over the ``run_lessons`` wall time)
+* per exercise latency, measured by the exercise page from its first render to its last accepted keystroke
+* CDP commands sent per exercise, counted from the Playwright driver ``pw:protocol`` debug output
+
+With ``--instrument`` the per method table of browser calls is logged at the end of every lesson and
+``--trace trace.json`` writes a Chrome trace of the typing loop (open it in ui.perfetto.dev).
+
+``--resource-latency 0.3`` adds a slow image, font and tracker to the replica pages, compare a run with and without
+``--block-resources`` to measure the ``ResourceFilter``.
+
+``--lookahead`` types the whole remaining exercise text at once instead of one active key per page read.
+
+``--browsers 2 --concurrency 4`` spreads the lessons over a ``BrowserPool`` of 2 extra Chromium processes (2 tabs each).
+
+Usage: ``python -m benchmarks.bench_autotyper --delay 0 --event-driven --backend type``
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from benchmarks.fixture_server import FixtureSite, serve
+
+CDP_PORT = 9222
+
+
+def _chromium_executable() -> str:
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as playwright:
+        return playwright.chromium.executable_path
+
+
+def _start_browser(user_data_dir:str) -> subprocess.Popen:
+    """
+    Launches the Chromium bundled with Playwright in headless mode and waits for its debugging endpoint.
+    :param user_data_dir: A throwaway profile directory.
+    :return:
+    """
+    process = subprocess.Popen(
+        [_chromium_executable(), "--headless=new", f"--remote-debugging-port={CDP_PORT}", f"--user-data-dir={user_data_dir}",
+         "--no-first-run", "--no-default-browser-check", "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://localhost:{CDP_PORT}/json/version", timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Chromium did not open the debugging port {CDP_PORT}")
+
+
+def _redirect_stderr(path:Path) -> int:
+    """
+    Redirects the process stderr (inherited by the Playwright driver) to a file.
+    :param path: The file receiving the output.
+    :return: The duplicated original stderr descriptor.
+    """
+    sys.stderr.flush()
+    original = os.dup(2)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    os.dup2(descriptor, 2)
+    os.close(descriptor)
+    return original
+
+
+def _restore_stderr(original:int):
+    sys.stderr.flush()
+    os.dup2(original, 2)
+    os.close(original)
+
+
+def _percentile(values:list[float], percent:float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+def run(delay:float, event_driven:bool, backend:str, layout:str, concurrency:int, count_cdp:bool, instrument:bool,
+        trace_file:str, resource_latency:float = 0.0, block_resources:bool = False, lookahead:bool = False,
+        browsers:int = 0):
+    site = FixtureSite(resource_latency=resource_latency)
+    server = serve(site)
+    # Must be set before importing the package, ``TYPING_URL`` is resolved at import time.
+    os.environ["AUTOTYPER_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    protocol_log = Path(tempfile.mkstemp(prefix="autotyper-protocol-", suffix=".log")[1])
+    with tempfile.TemporaryDirectory(prefix="autotyper-bench-") as user_data_dir:
+        browser = _start_browser(user_data_dir)
+        original_stderr = None
+        pool = None
+        try:
+            if count_cdp:
+                os.environ["DEBUG"] = "pw:protocol"
+                original_stderr = _redirect_stderr(protocol_log)
+
+            from src.autotyper.autotyper import Autotyper
+            from src.autotyper.typing_keyboard import KeyboardSettings
+            from src.core.browser_pool import BrowserPool
+            from src.utils.instrumentation import INSTRUMENTATION
+            from src.utils.resource_filter import ResourceFilter
+            from src.utils.tracing import TRACER
+
+            if instrument:
+                INSTRUMENTATION.enable()
+            if trace_file:
+                TRACER.enable(trace_file)
+
+            resource_filter = ResourceFilter() if block_resources else None
+            typer = Autotyper(resource_filter=resource_filter)
+            typer.keyboard_settings = KeyboardSettings(event_driven, backend, layout, lookahead=lookahead)
+            typer.start("", delay)
+            lessons = [lesson for category in typer.categories for lesson in typer.get_lessons(category)]
+            if browsers:
+                pool = BrowserPool(_chromium_executable(), browsers, CDP_PORT + 1, arguments=("--headless=new", "about:blank"))
+                pool.start()
+                typer.browser_pool = pool
+
+            started = time.perf_counter()
+            results = typer.run_lessons(lessons, concurrency)
+            elapsed = time.perf_counter() - started
+            typer.close()
+        finally:
+            if original_stderr is not None:
+                _restore_stderr(original_stderr)
+                os.environ.pop("DEBUG", None)
+            if pool is not None:
+                pool.close()
+            browser.kill()
+            server.shutdown()
+
+    failed = [result for result in results if not result.succeeded]
+    keystrokes = sum(report.keystrokes - report.rejected_keystrokes for report in site.reports)
+    rejected = sum(report.rejected_keystrokes for report in site.reports)
+    durations = [duration for report in site.reports for duration in report.exercise_durations]
+
+    print(f"lessons:             {len(results) - len(failed)}/{len(results)} completed")
+    for result in failed:
+        print(f"  failed: {result.category} / {result.title}: {result.error}")
+    print(f"wall time:           {elapsed:.2f} s")
+    print(f"keystrokes:          {keystrokes} accepted, {rejected} rejected")
+    print(f"keystrokes/sec:      {keystrokes / elapsed:.1f}")
+    if durations:
+        print(f"exercise latency:    mean {statistics.mean(durations):.1f} ms, p50 {_percentile(durations, 50):.1f} ms, "
+              f"p95 {_percentile(durations, 95):.1f} ms over {len(durations)} exercises")
+    if resource_latency > 0:
+        print(f"heavy resources:     {site.resource_requests} served")
+    if resource_filter is not None:
+        stats = resource_filter.stats.snapshot()
+        print(f"blocked requests:    {stats['blocked_total']} {stats['blocked']}, "
+              f"{stats['loaded_bytes'] / 1024:.0f} KiB loaded by {stats['loaded']} responses")
+    if count_cdp:
+        with protocol_log.open(encoding="utf-8", errors="replace") as log:
+            sent = sum(1 for line in log if "pw:protocol SEND" in line)
+        print(f"CDP commands:        {sent} total, {sent / max(1, len(durations)):.1f} per exercise")
+    protocol_log.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the Autotyper against the offline typing replica.")
+    parser.add_argument("--delay", type=float, default=0.0, help="keyboard delay in milliseconds")
+    parser.add_argument("--event-driven", action="store_true", help="wait for exercise changes with the observer")
+    parser.add_argument("--backend", default="locator", help="keystroke dispatch backend")
+    parser.add_argument("--layout", default="us", help="keyboard layout")
+    parser.add_argument("--concurrency", type=int, default=1, help="lessons typed at the same time")
+    parser.add_argument("--no-cdp-count", action="store_true", help="don't count the CDP commands")
+    parser.add_argument("--instrument", action="store_true", help="log the browser calls table of every lesson")
+    parser.add_argument("--trace", default="", metavar="PATH", help="write a Chrome trace of the typing loop")
+    parser.add_argument("--resource-latency", type=float, default=0.0, metavar="SECONDS",
+                        help="serve a slow image, font and tracker on every replica page")
+    parser.add_argument("--block-resources", action="store_true", help="block them with the ResourceFilter")
+    parser.add_argument("--browsers", type=int, default=0, help="spread the lessons over a pool of extra browsers")
+    parser.add_argument("--lookahead", action="store_true", help="type the whole remaining exercise text at once")
+    arguments = parser.parse_args()
+
+    run(arguments.delay, arguments.event_driven, arguments.backend, arguments.layout, arguments.concurrency,
+        not arguments.no_cdp_count, arguments.instrument, arguments.trace, arguments.resource_latency,
+        arguments.block_resources, arguments.lookahead, arguments.browsers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Offline replica of the typing website used to exercise and benchmark the Autotyper without the live site.
+
+The pages follow the markup expected by ``TypingLocators`` and ``TypingLessonLocators``:
+
+* ``/student/lessons``: dashboard with a tablist, one ``div.lesson`` per lesson with its ``a.lesson-btn``
+  and ``div.chunks`` exercises.
+* ``/student/lesson/<id>``: exercise page with the keyboard (``div.js-keyboard-holder``), the main key alert,
+  the continue button (``button.js-continue-button``) and the ``.badge`` shown at the end of the lesson.
+* ``/static/*`` and ``/analytics/*``: a banner image, a web font and a tracker beacon included in both pages when
+  ``FixtureSite.resource_latency`` is set, to measure the effect of the ``ResourceFilter``.
+
+Run it standalone with ``python -m benchmarks.fixture_server --port 8765``
+"""
+import argparse
+import html
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Union
+
+# Exercise texts of every lesson. The first exercise of each lesson introduces its main key.
+DEFAULT_CATALOG:dict[str, list[dict]] = {
+    "Beginner": [
+        {"title": "J, F, and Space", "main_key": "f", "exercises": ["fff jjj fj fj", "jf fj jjf ffj", "fj jf ff jj"]},
+        {"title": "U, R, and K Keys", "main_key": "u", "exercises": ["uuu rrr kkk", "ur ku rk uk", "jug rug fur"]},
+        {"title": "D, E, and I Keys", "main_key": "d", "exercises": ["ddd eee iii", "did die ride", "Fired Kid"]},
+    ],
+    "Intermediate": [
+        {"title": "Shift Keys", "main_key": None, "exercises": ["Jake Fred", "Ride Free!", "Dire Kite?"]},
+        {"title": "Number Row", "main_key": None, "exercises": ["12 34 56", "7 8 9 0", "1, 2, 3."]},
+    ],
+}
+
+# US keyboard rows as rendered by the typing website. Each key is a list of labels,
+# keys with two labels are rendered with spans: [shifted, main] for symbols or [name, symbol] for special keys.
+KEYBOARD_ROWS:list[list[list[str]]] = [
+    [["~", "`"], ["!", "1"], ["@", "2"], ["#", "3"], ["$", "4"], ["%", "5"], ["^", "6"], ["&", "7"], ["*", "8"],
+     ["(", "9"], [")", "0"], ["_", "-"], ["+", "="], ["Backspace", "⌫"]],
+    [["Tab", "↹"], ["Q"], ["W"], ["E"], ["R"], ["T"], ["Y"], ["U"], ["I"], ["O"], ["P"], ["{", "["], ["}", "]"], ["|", "\\"]],
+    [["Caps", "Lock", "⇪"], ["A"], ["S"], ["D"], ["F"], ["G"], ["H"], ["J"], ["K"], ["L"], [":", ";"], ["\"", "'"],
+     ["Enter", "⏎"]],
+    [["Shift", "⇧"], ["Z"], ["X"], ["C"], ["V"], ["B"], ["N"], ["M"], ["<", ","], [">", "."], ["?", "/"], ["⇧", "Shift"]],
+    [["␣"]],
+]
+
+
+@dataclass
+class FixtureLesson:
+    lesson_id: str
+    category: str
+    title: str
+    main_key: Optional[str]
+    exercises: list[str]
+    state: str = "btn--a"
+    completed: set[int] = field(default_factory=set)
+
+
+@dataclass
+class LessonReport:
+    lesson_id: str
+    keystrokes: int
+    rejected_keystrokes: int
+    exercise_durations: list[float]
+
+
+class FixtureSite:
+    def __init__(self, catalog:Optional[dict[str, list[dict]]] = None, block_after_first:bool = True,
+                 resource_latency:float = 0.0):
+        """
+        In-memory state of the replica: the lessons, their progress and the reports sent by the exercise pages.
+        :param catalog: The lessons of every category, ``DEFAULT_CATALOG`` by default.
+        :param block_after_first: Every lesson but the first of each category starts ``BLOCKED`` and is unlocked
+            when the previous one is completed.
+        :param resource_latency: Seconds the heavy resources (image, font, tracker) take to be served,
+            0 doesn't include them in the pages.
+        """
+        self._lock = threading.Lock()
+        self.resource_latency = resource_latency
+        self.resource_requests:int = 0
+        self.lessons:dict[str, FixtureLesson] = {}
+        self.categories:dict[str, list[str]] = {}
+        self.reports:list[LessonReport] = []
+        for category, lessons in (catalog or DEFAULT_CATALOG).items():
+            self.categories[category] = []
+            for position, lesson in enumerate(lessons):
+                lesson_id = f"{len(self.lessons) + 1}"
+                state = "btn--b" if block_after_first and position > 0 else "btn--a"
+                self.lessons[lesson_id] = FixtureLesson(lesson_id, category, lesson["title"], lesson["main_key"],
+                                                        list(lesson["exercises"]), state)
+                self.categories[category].append(lesson_id)
+
+    def complete(self, report:LessonReport):
+        """
+        Marks the lesson as completed and unlocks the next lesson of its category.
+        :param report: The report sent by the exercise page.
+        :return:
+        """
+        with self._lock:
+            self.reports.append(report)
+            lesson = self.lessons[report.lesson_id]
+            lesson.state = "btn--c"
+            lesson.completed = set(range(1, len(lesson.exercises) + 1))
+            siblings = self.categories[lesson.category]
+            position = siblings.index(lesson.lesson_id)
+            if position + 1 < len(siblings) and self.lessons[siblings[position + 1]].state == "btn--b":
+                self.lessons[siblings[position + 1]].state = "btn--a"
+
+    def render_dashboard(self) -> str:
+        tabs = []
+        templates = []
+        for index, (category, lesson_ids) in enumerate(self.categories.items()):
+            completed = sum(1 for lesson_id in lesson_ids if self.lessons[lesson_id].state == "btn--c")
+            tabs.append(
+                f'<button role="tab" data-category="{html.escape(category)}" aria-selected="{str(index == 0).lower()}">'
+                f'<span>{html.escape(category)}</span>\n\n<span>{completed}/{len(lesson_ids)}</span></button>'
+            )
+            lessons = "".join(self._render_lesson(self.lessons[lesson_id]) for lesson_id in lesson_ids)
+            templates.append(f'<template data-category="{html.escape(category)}">{lessons}</template>')
+
+        return _DASHBOARD_TEMPLATE.format(tabs="".join(tabs), templates="".join(templates), resources=self._resources())
+
+    @staticmethod
+    def _render_lesson(lesson:FixtureLesson) -> str:
+        chunks = "".join(
+            f'<div class="lesson-chunk{" is-complete" if index in lesson.completed else ""}" data-display-order="{index}"></div>'
+            for index in range(1, len(lesson.exercises) + 1)
+        )
+        return (
+            f'<div class="lesson"><p class="lesson-title">{html.escape(lesson.title)}</p>'
+            f'<a class="lesson-btn btn {lesson.state}" data-id="{lesson.lesson_id}" href="/student/lesson/{lesson.lesson_id}">Start</a>'
+            f'<div class="chunks">{chunks}</div></div>'
+        )
+
+    def render_lesson(self, lesson_id:str) -> Optional[str]:
+        lesson = self.lessons.get(lesson_id)
+        if lesson is None:
+            return None
+        data = {"id": lesson.lesson_id, "mainKey": lesson.main_key, "exercises": lesson.exercises}
+        return _LESSON_TEMPLATE.format(keyboard=_render_keyboard(), data=json.dumps(data), resources=self._resources())
+
+    def _resources(self) -> str:
+        return _HEAVY_RESOURCES if self.resource_latency > 0 else ""
+
+    def serve_resource(self) -> bytes:
+        """
+        Waits for ``resource_latency`` and returns the body of a heavy resource.
+        :return:
+        """
+        with self._lock:
+            self.resource_requests += 1
+        time.sleep(self.resource_latency)
+        return bytes(_HEAVY_RESOURCE_SIZE)
+
+
+def _render_keyboard() -> str:
+    rows = []
+    for row in KEYBOARD_ROWS:
+        keys = []
+        for labels in row:
+            if len(labels) == 1:
+                label = f'<div class="key-label">{html.escape(labels[0])}</div>'
+            else:
+                label = '<div class="key-label">' + "".join(
+                    f'<span class="key-label--{index}">{html.escape(text)}</span>' for index, text in enumerate(labels)
+                ) + '</div>'
+            keys.append(f'<div class="keyboard-key" data-labels="{html.escape(json.dumps(labels))}">{label}</div>')
+        rows.append(f'<div class="keyboard-row">{"".join(keys)}</div>')
+    return "".join(rows)
+
+
+# Size in bytes of every heavy resource
+_HEAVY_RESOURCE_SIZE = 256 * 1024
+_HEAVY_RESOURCES = """<style>@font-face { font-family: "Lesson"; src: url("/static/lesson.woff2"); } body { font-family: "Lesson"; }</style>
+<img src="/static/banner.png" alt="" width="1" height="1">
+<script src="/analytics/tracker.js" async></script>
+"""
+
+_DASHBOARD_TEMPLATE = """<!doctype html>
+<html><head><title>Lessons</title></head>
+<body>
+{resources}
+<div role="tablist">{tabs}</div>
+<div class="lessons-holder"></div>
+{templates}
+<script>
+  const holder = document.querySelector(".lessons-holder");
+  const select = (tab) => {{
+    document.querySelectorAll('[role="tab"]').forEach((other) => other.setAttribute("aria-selected", "false"));
+    tab.setAttribute("aria-selected", "true");
+    const template = document.querySelector(`template[data-category="${{tab.dataset.category}}"]`);
+    holder.replaceChildren(template.content.cloneNode(true));
+  }};
+  document.querySelectorAll('[role="tab"]').forEach((tab) => tab.addEventListener("click", () => select(tab)));
+  select(document.querySelector('[role="tab"]'));
+</script>
+</body></html>
+"""
+
+_LESSON_TEMPLATE = """<!doctype html>
+<html><head><title>Lesson</title>
+<style>.keyboard-key.is-active {{ background: #9cf; }} .hidden {{ display: none; }}</style>
+</head>
+<body>
+{resources}
+<div class="js-lesson-text"></div>
+<div class="lesson-alert"></div>
+<div class="js-keyboard-holder">{keyboard}</div>
+<div class="lesson-footer"></div>
+<script>
+  const lesson = {data};
+  const keys = Array.from(document.querySelectorAll(".keyboard-key"));
+  const labelsOf = (key) => JSON.parse(key.dataset.labels);
+  const shiftKey = keys.find((key) => labelsOf(key)[0] === "Shift");
+  const findKey = (character) => {{
+    if (character === " ") return [keys.find((key) => labelsOf(key)[0] === "␣"), false];
+    for (const key of keys) {{
+      const labels = labelsOf(key);
+      if (labels.length === 1 && labels[0].length === 1 && labels[0].toLowerCase() === character.toLowerCase()) {{
+        return [key, character !== character.toLowerCase()];
+      }}
+      if (labels.length === 2 && labels[1] === character) return [key, false];
+      if (labels.length === 2 && labels[0] === character && labels[0].length === 1) return [key, true];
+    }}
+    return [null, false];
+  }};
+
+  let exercise = -1;
+  let position = 0;
+  let waitingMainKey = null;
+  let keystrokes = 0;
+  let rejected = 0;
+  let exerciseStart = 0;
+  const durations = [];
+  const text = document.querySelector(".js-lesson-text");
+  const alert = document.querySelector(".lesson-alert");
+  const footer = document.querySelector(".lesson-footer");
+
+  const highlight = () => {{
+    keys.forEach((key) => key.classList.remove("is-active"));
+    // The keyboard stays idle while the main key alert is shown, like on the typing website.
+    if (waitingMainKey !== null) return;
+    const expected = lesson.exercises[exercise][position];
+    if (expected === undefined) return;
+    const [key, shifted] = findKey(expected);
+    if (key) key.classList.add("is-active");
+    if (shifted) shiftKey.classList.add("is-active");
+  }};
+  const renderText = () => {{
+    const characters = Array.from(lesson.exercises[exercise], (character, index) => {{
+      const state = index < position ? "is-correct" : index === position ? "is-current" : "";
+      return `<span class="screenBasic-letter ${{state}}">${{character === " " ? "&nbsp;" : character}}</span>`;
+    }});
+    text.innerHTML = characters.join("");
+  }};
+  const startExercise = () => {{
+    exercise += 1;
+    position = 0;
+    footer.replaceChildren();
+    exerciseStart = performance.now();
+    if (exercise === 0 && lesson.mainKey) {{
+      waitingMainKey = lesson.mainKey;
+      alert.innerHTML = `<div role="alert">Press the key <div class="key-label">${{lesson.mainKey.toUpperCase()}}</div></div>`;
+    }}
+    renderText();
+    highlight();
+  }};
+  const finishExercise = () => {{
+    durations.push(performance.now() - exerciseStart);
+    keys.forEach((key) => key.classList.remove("is-active"));
+    if (exercise + 1 < lesson.exercises.length) {{
+      footer.innerHTML = '<button class="js-continue-button">Continue</button>';
+      footer.querySelector("button").addEventListener("click", startExercise);
+      return;
+    }}
+    fetch("/api/complete", {{
+      method: "POST",
+      body: JSON.stringify({{id: lesson.id, keystrokes: keystrokes, rejected: rejected, durations: durations}}),
+    }}).then(() => {{
+      footer.innerHTML = '<div class="badge">Lesson complete</div><a class="js-continue btn" href="/student/lessons">Next</a>';
+    }});
+  }};
+
+  document.addEventListener("keydown", (event) => {{
+    if (event.key === "Shift" || event.key === "CapsLock" || exercise >= lesson.exercises.length) return;
+    keystrokes += 1;
+    if (waitingMainKey !== null) {{
+      if (event.key.toLowerCase() !== waitingMainKey.toLowerCase()) {{ rejected += 1; return; }}
+      waitingMainKey = waitingMainKey === "Enter" ? null : "Enter";
+      if (waitingMainKey === null) alert.replaceChildren();
+      highlight();
+      return;
+    }}
+    const expected = lesson.exercises[exercise][position];
+    if (expected === undefined || event.key !== expected) {{ rejected += 1; return; }}
+    position += 1;
+    renderText();
+    if (position === lesson.exercises[exercise].length) finishExercise(); else highlight();
+  }});
+  startExercise();
+</script>
+</body></html>
+"""
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    site:FixtureSite
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status:int, body:Union[str, bytes], content_type:str = "text/html; charset=utf-8"):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/student/lessons":
+            return self._send(200, self.site.render_dashboard())
+        if path.startswith(("/static/", "/analytics/")):
+            content_type = "text/javascript" if path.endswith(".js") else "application/octet-stream"
+            return self._send(200, self.site.serve_resource(), content_type)
+        if path.startswith("/student/lesson/"):
+            page = self.site.render_lesson(path.rsplit("/", 1)[1])
+            if page is not None:
+                return self._send(200, page)
+        self._send(404, "Not found", "text/plain")
+
+    def do_POST(self):
+        if self.path != "/api/complete":
+            return self._send(404, "Not found", "text/plain")
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.site.complete(LessonReport(str(data["id"]), data["keystrokes"], data["rejected"], data["durations"]))
+        self._send(200, "{}", "application/json")
+
+
+def serve(site:FixtureSite, host:str = "127.0.0.1", port:int = 0) -> ThreadingHTTPServer:
+    """
+    Starts serving the replica on a daemon thread and returns the server.
+    Use ``server.server_address`` to get the bound port when ``port`` is 0.
+    :param site: The replica state.
+    :param host: The interface to bind.
+    :param port: The port to bind, 0 picks a free one.
+    :return:
+    """
+    handler = type("FixtureHandler", (_FixtureHandler,), {"site": site})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves the offline replica of the typing website.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    arguments = parser.parse_args()
+
+    server = serve(FixtureSite(), arguments.host, arguments.port)
+    print(f"Serving the typing replica on http://{arguments.host}:{server.server_address[1]}/student/lessons")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,33 @@
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Non-interactive mode for scripts. e.g: python main.py run --category Beginner --lessons 1-20
+    # Dispatched before the imports of the menus (rich, the TUI modules) which the batch mode doesn't use.
+    from src.cli import main as cli_main
+
+    sys.exit(cli_main(sys.argv[1:]))
+
 import time
 from pathlib import Path
-from typing import Optional, Literal, Iterable, Union
-from tkinter.filedialog import askopenfilename
+from typing import Optional, Literal, Iterable, Union, TYPE_CHECKING
 from rich.console import Console, ScreenContext
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.text import Text
-import playwright.sync_api
 from src.core.config_loader import ConfigLoader
-from src.autotyper.autotyper import Autotyper
-from src.core.errors import UserNotLoggedError, URLChangedError
-from src.utils.browser_utils import get_default_browser
+from src.autotyper.keyboard_layout import LAYOUTS
+from src.core.errors import (UserNotLoggedError, URLChangedError, LessonDeadlineError, CircuitOpenError, BrowserStartupError,
+                             DefaultBrowserNotFoundError)
+from src.utils.browser_discovery import resolve_browser_path
+from src.utils.logutil import setup_logging, LoggingSettings
+from src.utils.tracing import TRACER
+
+# Playwright, the Autotyper and the file dialog are imported on the menus that need them so the main menu shows up
+# without waiting for them.
+if TYPE_CHECKING:
+    from src.autotyper.autotyper import Autotyper
+    from src.autotyper.progress_journal import ProgressJournal
+    from src.autotyper.typing_keyboard import KeyboardSettings
 
 __version__ = "0.2"
 
@@ -61,8 +78,15 @@ def option_picker(
     user_answer = int(Prompt.ask(prompt=prompt_message, choices=choices, console=console))
     return len(options), user_answer
 
+def keyboard_settings_from_config(config:ConfigLoader.ConfigFile) -> "KeyboardSettings":
+    from src.autotyper.typing_keyboard import KeyboardSettings
+
+    return KeyboardSettings.from_config(config)
+
 # Display lessons menu
-def display_lessons(screen: ScreenContext, typer: Autotyper):
+def display_lessons(screen: ScreenContext, typer: "Autotyper", journal: Optional["ProgressJournal"] = None):
+    import playwright.sync_api
+
     while True:
         screen.update()
         categories_options = typer.categories + ["Back"]
@@ -102,7 +126,18 @@ def display_lessons(screen: ScreenContext, typer: Autotyper):
                     try:
                         screen.update()
                         with screen.console.status(f"Starting lesson: {lessons[lesson_index].title}"):
-                            lessons[lesson_index].start()
+                            if journal is None:
+                                lessons[lesson_index].start()
+                            elif not lessons[lesson_index].resume(journal):
+                                screen.console.print(f"[yellow]The lesson: {lessons[lesson_index].title} is already complete.")
+                    except CircuitOpenError:
+                        screen.console.print(
+                            "[bold red]An error occurred while doing a lesson. Browser or tab might have been closed."
+                        )
+                    except LessonDeadlineError:
+                        screen.console.print(
+                            "[bold red]The lesson took too long and was stopped. Check your internet connection and try again."
+                        )
                     except playwright.sync_api.Error:
                         screen.console.print(
                             "[bold red]An error occurred while doing a lesson. Browser or tab might have been closed."
@@ -117,12 +152,19 @@ def display_lessons(screen: ScreenContext, typer: Autotyper):
                         )
 
 # Display settings menu
-def display_settings(screen: ScreenContext, settings: ConfigLoader.ConfigFile, typer: Autotyper):
+def display_settings(screen: ScreenContext, settings: ConfigLoader.ConfigFile, typer: Optional["Autotyper"]):
     while True:
         screen.update()
         options = [
             f"Typing delay: {Text(str(settings.typing_delay), style='blue')}ms",
             f"Browser path: {Text(str(settings.browser_path), style='blue')}",
+            f"Event driven typing: {Text(str(settings.event_driven), style='blue')}",
+            f"Keystroke backend: {Text(settings.dispatch_backend, style='blue')}",
+            f"Keyboard layout: {Text(settings.keyboard_layout, style='blue')}",
+            f"Target speed: {Text(str(settings.target_wpm or 'unpaced'), style='blue')} WPM",
+            f"Adaptive speed: {Text(str(settings.adaptive_pacing), style='blue')}",
+            f"Block images, fonts and trackers: {Text(str(settings.block_resources), style='blue')}",
+            f"Type the whole exercise text at once (needs the exercise text in the page): {Text(str(settings.lookahead), style='blue')}",
             "Reset to defaults",
             "Back",
         ]
@@ -135,9 +177,10 @@ def display_settings(screen: ScreenContext, settings: ConfigLoader.ConfigFile, t
                 delay = Prompt.ask("Typing delay (in ms, leave empty to skip)")
                 if delay.strip():
                     settings.typing_delay = float(delay)
-                    typer.typing_delay = float(delay)
 
             case 2:
+                from tkinter.filedialog import askopenfilename
+
                 browser_executable_path = askopenfilename(
                     title="Select browser executable",
                     defaultextension="*.exe",
@@ -149,20 +192,68 @@ def display_settings(screen: ScreenContext, settings: ConfigLoader.ConfigFile, t
                     screen.console.print("[bold yellow]Restart the program to use the new browser.")
 
             case 3:
-                settings = ConfigLoader.ConfigFile()
+                settings.event_driven = not settings.event_driven
 
             case 4:
+                from src.autotyper.key_dispatch import DISPATCH_BACKENDS
+
+                backend = Prompt.ask("Keystroke backend", choices=list(DISPATCH_BACKENDS), default=settings.dispatch_backend)
+                settings.dispatch_backend = backend
+
+            case 5:
+                layout = Prompt.ask("Keyboard layout", choices=list(LAYOUTS), default=settings.keyboard_layout)
+                settings.keyboard_layout = layout
+
+            case 6:
+                wpm = Prompt.ask("Target speed (in WPM, 0 to disable pacing, leave empty to skip)")
+                if wpm.strip():
+                    settings.target_wpm = float(wpm)
+
+            case 7:
+                settings.adaptive_pacing = not settings.adaptive_pacing
+
+            case 8:
+                settings.block_resources = not settings.block_resources
+                screen.console.print("[bold yellow]Restart the program to apply the change.")
+
+            case 9:
+                settings.lookahead = not settings.lookahead
+
+            case 10:
+                settings = ConfigLoader.ConfigFile()
+
+            case 11:
                 break
 
+    if typer is not None:
+        typer.typing_delay = settings.typing_delay
+        typer.keyboard_settings = keyboard_settings_from_config(settings)
     ConfigLoader.update(settings)
     screen.console.print("[bold green]Settings saved.")
 
 # Main function
 def main():
     config = ConfigLoader.load()
+    # The records would be drawn over the menus, they only go to the log file.
+    setup_logging(LoggingSettings.from_config(config))
+    if config.instrument_calls:
+        from src.utils.instrumentation import INSTRUMENTATION
+
+        INSTRUMENTATION.enable()
+    if config.trace_file:
+        TRACER.enable(config.trace_file)
+    if config.metrics_file or config.metrics_port:
+        from src.utils.metrics import METRICS
+
+        METRICS.start_export(config.metrics_file, config.metrics_port)
+    journal:Optional["ProgressJournal"] = None
+    if config.journal_file:
+        from src.autotyper.progress_journal import ProgressJournal
+
+        journal = ProgressJournal(config.journal_file)
     console = Console()
     console.set_window_title("Autotyper")
-    typer = Autotyper()
+    typer:Optional["Autotyper"] = None
     running = True
 
     while running:
@@ -176,11 +267,33 @@ def main():
 
             match option_choice:
                 case 1:
+                    import playwright.sync_api
+                    from src.autotyper.autotyper import Autotyper
+                    from src.autotyper.catalog_cache import CatalogCache
+                    from src.core.browser_endpoint import BrowserEndpoint
+                    from src.utils.resource_filter import ResourceFilter
+
                     try:
                         with console.status("Opening browser and connecting..."):
-                            typer.start(config.browser_path or get_default_browser(), config.typing_delay)
+                            browser_path = resolve_browser_path(config.browser_path)
+                            if browser_path is None:
+                                raise DefaultBrowserNotFoundError()
+                            if str(browser_path) != config.browser_path:
+                                config.browser_path = str(browser_path)
+                                ConfigLoader.update(config)
+
+                            if typer is None:
+                                resource_filter = ResourceFilter() if config.block_resources else None
+                                typer = Autotyper(CatalogCache(ttl=config.catalog_ttl), resource_filter,
+                                                  BrowserEndpoint.from_config(config))
+                            typer.keyboard_settings = keyboard_settings_from_config(config)
+                            typer.start(browser_path, config.typing_delay)
                     except UserNotLoggedError:
                         console.print("[bold yellow]Please log in and try again.")
+                    except DefaultBrowserNotFoundError:
+                        console.print("[bold red]No chromium based browser was found. Set the browser path in the settings.")
+                    except BrowserStartupError:
+                        console.print("[bold red]The browser could not be started. Check the browser path in the settings.")
                     except playwright.sync_api.TimeoutError:
                         console.print(
                             "[bold yellow]Connection error. Try closing the browser and not reopening it."
@@ -191,7 +304,11 @@ def main():
                         )
 
                 case 2:
-                    display_lessons(screen, typer)
+                    if typer is None:
+                        console.print("[bold yellow]Connect to the browser first.")
+                        time.sleep(1.5)
+                    else:
+                        display_lessons(screen, typer, journal)
 
                 case 3:
                     display_settings(screen, config, typer)
@@ -201,8 +318,9 @@ def main():
                     console.print("[yellow]Closing...")
                     running = False
 
-    with console.status("Closing connection..."):
-        typer.close()
+    if typer is not None:
+        with console.status("Closing connection..."):
+            typer.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Union, Iterable, Protocol, Optional
+import playwright.async_api
+from playwright.async_api import Locator, Page
+from src.autotyper.async_lesson import AsyncLesson
+from src.autotyper.catalog_cache import LessonRecord
+from src.autotyper.lesson import LessonResult, DASHBOARD_LOCATORS, lesson_record_from_dashboard
+from src.autotyper.progress_journal import ProgressJournal
+from src.autotyper.typing_keyboard import KeyboardSettings
+from src.core.async_browser_navigator import AsyncBrowserNavigator
+from src.core.browser_endpoint import BrowserEndpoint
+from src.core.constants import TypingLocators, TYPING_URL
+from src.core.scripts import DASHBOARD_SCRIPT, CATEGORIES_SCRIPT
+from src.core.errors import UserNotLoggedError, CategoryNotFoundError, CategoryError, AutotyperError, LessonNotAvailableError
+from src.utils.browser_utils import async_locator_exists
+from src.utils.logutil import log_context
+from src.utils.resource_filter import ResourceFilter
+
+
+class LessonReference(Protocol):
+    """
+    Anything that identifies a lesson on the dashboard, e.g: ``Lesson`` or ``AsyncLesson``.
+    """
+    @property
+    def category(self) -> str: ...
+
+    @property
+    def title(self) -> str: ...
+
+    @property
+    def button_id(self) -> Optional[str]: ...
+
+    def to_record(self) -> LessonRecord: ...
+
+
+class AsyncAutotyper:
+    def __init__(self, resource_filter:Optional[ResourceFilter]=None, endpoint:Optional[BrowserEndpoint]=None):
+        """
+        Async counterpart of ``Autotyper`` built on ``playwright.async_api``.
+        Every browser facing method is a coroutine so it can be embedded in an existing event loop.
+        :param resource_filter: Blocks the requests that are not needed to type, ``None`` to load everything.
+        :param endpoint: The remote debugging endpoint of the browser, defaults to ``BrowserEndpoint()``
+        """
+        self._browser_path:Union[str, Path] = ""
+        self._browser:AsyncBrowserNavigator = AsyncBrowserNavigator(resource_filter, endpoint)
+        self._lessons_categories:dict[str, Locator] = {}
+        self._typing_delay:float = 0.0
+        self._keyboard_settings:KeyboardSettings = KeyboardSettings()
+
+    @staticmethod
+    async def _get_typing_page(browser:AsyncBrowserNavigator):
+        """
+        Sets the browser active tab to be the typing page.
+        :param browser:
+        :return:
+        """
+        tab_index = await browser.find_tab(TYPING_URL)
+        if tab_index is None:
+            browser.active_tab = await browser.new_tab()
+            await browser.active_tab.goto(TYPING_URL)
+            return
+
+        browser.active_tab = tab_index
+        await browser.active_tab.wait_for_load_state("load")
+
+    async def _is_user_logged(self) -> bool:
+        """
+        Returns ``True`` if the user is logged in.
+        :return:
+        """
+        typing_login_button = (
+            self._browser.active_tab.locator(
+                TypingLocators.LOGIN_BUTTON_CONTAINER
+            ).locator(
+                TypingLocators.LOGIN_BUTTON
+            )
+        )
+        return not await async_locator_exists(typing_login_button)
+
+    async def _get_categories(self):
+        """
+        Retrieves the available categories in the typing dashboard.
+        :return:
+        """
+        page = self._browser.active_tab
+        await page.wait_for_url(TYPING_URL)
+        tabs = page.get_by_role(TypingLocators.TAB_LIST_CONTAINER).get_by_role(TypingLocators.TAB_LIST)
+        roles = {"tabList": TypingLocators.TAB_LIST_CONTAINER, "tab": TypingLocators.TAB_LIST}
+        categories = await page.evaluate(CATEGORIES_SCRIPT, roles)
+        self._lessons_categories = {category:tabs.nth(index) for index, category in enumerate(categories)}
+
+    async def start(self, browser_path:Union[str, Path], typing_delay:float, cookies:Optional[list[dict]]=None):
+        """
+        Starts the connection with the typing website
+        :param browser_path: The browser path
+        :param typing_delay: The delay of the keyboard in milliseconds
+        :param cookies: Added to the browser before the login check. e.g: the session of the main browser for a browser
+        of a ``BrowserPool``, which has its own profile.
+        :raises UserNotLoggedError playwright.async_api.Error, playwright.async_api.TimeOutError:
+        :return:
+        """
+        self._browser_path = browser_path
+        self._typing_delay = typing_delay
+
+        await self._browser.setup(self._browser_path)
+        if cookies:
+            await self._browser.add_cookies(cookies)
+        await self._get_typing_page(self._browser)
+
+        if not await self._is_user_logged():
+            raise UserNotLoggedError(TYPING_URL)
+        await self._get_categories()
+
+    async def close(self):
+        """
+        Closes the browser connection
+        :return:
+        """
+        await self._browser.close()
+
+    async def get_lessons(self, category:str) -> list[AsyncLesson]:
+        """
+        Returns the lessons of the specified category
+        :param category: The category of the lessons.
+        :return:
+        """
+        if self._browser.active_tab.url != TYPING_URL:
+            await self._get_typing_page(self._browser)
+        await self._get_categories()
+        if category not in self._lessons_categories:
+            raise CategoryNotFoundError(category, list(self._lessons_categories.keys()))
+
+        picked_category:Locator = self._lessons_categories[category]
+        if not await async_locator_exists(picked_category):
+            raise CategoryError("Could not get the specified category. Probably the locator doesn't exists anymore")
+
+        await picked_category.click()
+        page = self._browser.active_tab
+        return [
+            AsyncLesson.from_record(category, lesson_record_from_dashboard(lesson), page, self._typing_delay, self._keyboard_settings)
+            for lesson in await page.evaluate(DASHBOARD_SCRIPT, DASHBOARD_LOCATORS)
+        ]
+
+    async def _run_lesson_on(self, page:Page, reference:LessonReference, result:LessonResult,
+                             journal:Optional[ProgressJournal]=None):
+        """
+        Opens the lesson on the given page and types it until the end.
+        :param page: A page of the typing website context, independent from the active tab.
+        :param reference: The lesson to run.
+        :param result: The result of the lesson, its keystrokes are counted even if the lesson fails.
+        :param journal: Resumes the lesson at its first exercise missing from the journal and records the progress.
+        :raises LessonNotAvailableError, URLChangedError, LessonDeadlineError, playwright.async_api.Error:
+        :return:
+        """
+        if not reference.button_id:
+            raise LessonNotAvailableError(reference.title)
+
+        lesson = AsyncLesson.from_record(reference.category, reference.to_record(), page, self._typing_delay,
+                                         self._keyboard_settings)
+        try:
+            with log_context(lesson=lesson.title, category=lesson.category):
+                await page.goto(TYPING_URL)
+                category_tab = page.get_by_role(TypingLocators.TAB_LIST_CONTAINER).get_by_role(TypingLocators.TAB_LIST)
+                await category_tab.filter(has_text=lesson.category).first.click()
+            if journal is None:
+                await lesson.start()
+            else:
+                await lesson.resume(journal)
+        finally:
+            result.keystrokes = lesson.keystrokes
+            result.exercises = lesson.typed_exercises
+
+    async def run_lessons(self, lessons:Iterable[LessonReference], concurrency:int=2,
+                          journal:Optional[ProgressJournal]=None) -> list[LessonResult]:
+        """
+        Runs the lessons concurrently, each worker driving its own tab of the active window.
+        Errors are not raised, they are stored on the ``LessonResult`` of the lesson that failed.
+        :param lessons: The lessons to run.
+        :param concurrency: The number of tabs working at the same time.
+        :param journal: Resumes the lessons at their first exercise missing from the journal and records the progress.
+        :return: The results in the same order as ``lessons``.
+        """
+        lessons = list(lessons)
+        results = [LessonResult(lesson.category, lesson.title) for lesson in lessons]
+        queue:asyncio.Queue[int] = asyncio.Queue()
+        for index in range(len(lessons)):
+            queue.put_nowait(index)
+
+        async def worker(page:Page):
+            while not queue.empty():
+                index = queue.get_nowait()
+                start_time = time.perf_counter()
+                try:
+                    await self._run_lesson_on(page, lessons[index], results[index], journal)
+                except (AutotyperError, playwright.async_api.Error) as error:
+                    results[index].error = error
+                results[index].duration = time.perf_counter() - start_time
+
+        pages = []
+        for _ in range(max(1, min(concurrency, len(lessons)))):
+            tab_index = await self._browser.new_tab()
+            pages.append(self._browser.active_window.pages[tab_index])
+        try:
+            await asyncio.gather(*(worker(page) for page in pages))
+        finally:
+            for page in pages:
+                if not page.is_closed():
+                    await page.close()
+        return results
+
+    @property
+    def typing_delay(self) -> float:
+        return self._typing_delay
+
+    @typing_delay.setter
+    def typing_delay(self, value:float):
+        self._typing_delay = value
+
+    @property
+    def keyboard_settings(self) -> KeyboardSettings:
+        return self._keyboard_settings
+
+    @keyboard_settings.setter
+    def keyboard_settings(self, value:KeyboardSettings):
+        self._keyboard_settings = value
+
+    @property
+    def categories(self) -> list[str]:
+        """
+        Returns a list with the names of the available categories
+        :return:
+        """
+        return list(self._lessons_categories.keys())
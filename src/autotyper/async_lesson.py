@@ -0,0 +1,143 @@
+from logging import getLogger
+from typing import Optional
+from playwright.async_api import Page, Locator
+from src.autotyper.async_typing_keyboard import AsyncTypingKeyboard
+from src.autotyper.progress_journal import ProgressJournal
+from src.autotyper.typing_keyboard import KeyboardSettings
+from src.autotyper.lesson import (LessonState, BaseLesson, BaseLessonExercise, _lesson_state_from_class,
+                                  _exercise_state_from_class)
+from src.core.constants import TypingLocators
+from src.utils.browser_utils import async_locator_exists
+from src.utils.logutil import log_context
+from src.utils.retry_policy import lesson_deadline
+
+logger = getLogger("autotyper")
+
+
+class AsyncLessonExercise(BaseLessonExercise):
+    """
+    Represents a single exercise from a lesson, driven by the Playwright async API.
+    Use ``AsyncLessonExercise.from_box`` to build it from the exercise div.
+    """
+    @classmethod
+    async def from_box(cls, exercise_box:Locator, lesson_title:str) -> "AsyncLessonExercise":
+        """
+        Reads the exercise data from its div.
+        :param exercise_box: The locator representing the exercise div
+        :param lesson_title: The title of the lesson containing this exercise
+        :return:
+        """
+        state = _exercise_state_from_class(await exercise_box.get_attribute("class"))
+        index = int(await exercise_box.get_attribute("data-display-order"))
+        return cls(exercise_box, lesson_title, state, index)
+
+    async def start(self):
+        """
+        Starts the exercise by clicking its box.
+        :return:
+        """
+        await self._exercise_box.click()
+
+
+class AsyncLesson(BaseLesson):
+    exercise_class = AsyncLessonExercise
+
+    def __init__(self, category:str, title:str, button_id:Optional[str], lesson_state:LessonState,
+                 exercises:list[AsyncLessonExercise], typing_page:Page, typing_delay:float,
+                 keyboard_settings:Optional[KeyboardSettings]=None):
+        """
+        Represents a single lesson from the typing website, driven by the Playwright async API.
+        Use ``AsyncLesson.from_container`` to build it from the lesson div or ``AsyncLesson.from_record`` to build it
+        from a scraped record.
+        :param category: The lesson category (beginner, intermediate, advance,...)
+        :param title: The lesson title
+        :param button_id: The "data-id" attribute of the lesson button, ``None`` if the button doesn't exist
+        :param lesson_state: The lesson state
+        :param exercises: The lesson exercises
+        :param typing_page: The async Page containing the typing website.
+        :param typing_delay: The delay of the keyboard in milliseconds
+        :param keyboard_settings: The options of the lesson keyboard
+        """
+        super().__init__(category, title, button_id, lesson_state, exercises, typing_page, typing_delay)
+        self._keyboard = AsyncTypingKeyboard(self._typing_page, keyboard_settings)
+
+    @classmethod
+    async def from_container(cls, category:str, lesson_container:Locator, typing_page:Page, typing_delay:float,
+                             keyboard_settings:Optional[KeyboardSettings]=None) -> "AsyncLesson":
+        """
+        Reads the lesson data from its div.
+        :param category: The lesson category
+        :param lesson_container: The div containing the lesson data
+        :param typing_page: The async Page containing the typing website.
+        :param typing_delay: The delay of the keyboard in milliseconds
+        :param keyboard_settings: The options of the lesson keyboard
+        :return:
+        """
+        title = await lesson_container.locator(TypingLocators.LESSON_TITLE).inner_text()
+        # check if the button exists (Premium lessons might not show the button if the user is on a free plan)
+        button = lesson_container.locator(TypingLocators.LESSON_BUTTON)
+        button_class = None
+        button_id = None
+        if await async_locator_exists(button):
+            button_class = await button.get_attribute("class")
+            button_id = await button.get_attribute("data-id")
+        exercises = [await AsyncLessonExercise.from_box(exercise_box, title) for exercise_box in
+                     await lesson_container.locator("div.chunks div").all()]
+        return cls(category, title, button_id, _lesson_state_from_class(button_class), exercises,
+                   typing_page, typing_delay, keyboard_settings)
+
+    def _finish(self, journal:Optional[ProgressJournal]):
+        if journal is not None:
+            journal.record_lesson(self._category, self._title)
+
+    async def start(self, journal:Optional[ProgressJournal]=None):
+        """
+        Starts the lesson by clicking the active button.
+        :param journal: Records the completed exercises and the lesson, ``None`` to not record the progress.
+        :raises playwright.async_api.TimeOutError, playwright.async_api.Error, LessonNotAvailableError, LessonDeadlineError:
+        :return:
+        """
+        # The lesson button opens the first incomplete exercise, or the first one of a completed lesson.
+        first = self._first_incomplete_exercise() or 1
+        with lesson_deadline(self._keyboard.settings.lesson_deadline), log_context(lesson=self._title, category=self._category):
+            await self._button.click()
+            await self._keyboard.start_typing(self._typing_delay, self._journal_callback(journal, first))
+            self._finish(journal)
+
+    async def _start_at(self, number:int, journal:Optional[ProgressJournal]):
+        with lesson_deadline(self._keyboard.settings.lesson_deadline), log_context(lesson=self._title, category=self._category):
+            await self._typing_page.wait_for_load_state()
+            await self._exercises[number - 1].start()
+            await self._keyboard.start_typing(self._typing_delay, self._journal_callback(journal, number))
+            self._finish(journal)
+
+    async def start_from_exercise(self, number:int, journal:Optional[ProgressJournal]=None):
+        """
+        Starts the lesson by clicking the desired exercise.
+        The exercise must be completed or follow a completed one (the exercise the lesson would continue at).
+        :param number: The exercise number
+        :param journal: Records the completed exercises and the lesson, ``None`` to not record the progress.
+        :raises playwright.async_api.TimeOutError, playwright.async_api.Error, IndexError:
+        :return:
+        """
+        self._exercise_to_start_from(number)
+        await self._start_at(number, journal)
+
+    async def resume(self, journal:ProgressJournal) -> bool:
+        """
+        Continues the lesson at its first exercise that is neither completed on the dashboard nor in the journal,
+        instead of typing the finished exercises again.
+        :param journal: The progress journal.
+        :raises playwright.async_api.TimeOutError, playwright.async_api.Error, LessonNotAvailableError, LessonDeadlineError:
+        :return: ``False`` if there was nothing left to type.
+        """
+        number = self._resume_number(journal)
+        if number is None:
+            return False
+
+        if number == 1:
+            await self.start(journal)
+        else:
+            logger.info(f"Resuming the lesson: {self._title} at exercise {number}")
+            await self._start_at(number, journal)
+        return True
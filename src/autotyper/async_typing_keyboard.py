@@ -0,0 +1,267 @@
+import asyncio
+from typing import Optional, Callable
+from weakref import WeakKeyDictionary
+from playwright.async_api import Page
+from src.autotyper.keyboard_layout import KeyboardLayout, get_layout
+from src.autotyper.pacing import Pacer, get_pacer
+from src.autotyper.overlays import install_async_overlay_handlers, async_dismiss_overlays
+from src.autotyper.typing_keyboard import (KeyboardKey, KeyboardSettings, ExerciseSnapshot, TypingKeyboard, _SNAPSHOT_LOCATORS,
+                                           typing_logger, ENTER_KEY, OBSERVER_BINDING, OBSERVER_TIMEOUT)
+from src.core.constants import TypingLessonLocators, TYPING_URL
+from src.core.errors import URLChangedError
+from src.core.scripts import EXERCISE_SNAPSHOT_SCRIPT, EXERCISE_OBSERVER_SCRIPT
+from src.utils.browser_utils import async_retries
+from src.utils.logutil import log_context, update_log_context
+from src.utils.metrics import KEYSTROKES, EXERCISES, PROBE_LATENCY
+from src.utils.retry_policy import PROBE_POLICY, ACTION_POLICY, NAVIGATION_POLICY
+
+# The binding can only be exposed once per page, the keyboard currently typing on each page receives the snapshots.
+_observed_pages:WeakKeyDictionary = WeakKeyDictionary()
+
+def _on_exercise_changed(source:dict, data:dict, sequence:int):
+    """
+    Binding called by the exercise observer of a page.
+    :param source: The binding source containing the page that called it.
+    :param data: The evaluated snapshot.
+    :param sequence: The number of changes reported by the observer so far.
+    :return:
+    """
+    keyboard = _observed_pages.get(source["page"])
+    if keyboard is not None:
+        keyboard._observed_snapshot = ExerciseSnapshot.from_dict(data)
+        keyboard._observed_sequence = sequence
+        keyboard._observed_change.set()
+
+
+class AsyncTypingKeyboard:
+    def __init__(self, typing_page:Page, settings:Optional[KeyboardSettings]=None):
+        """
+        Represents the typing keyboard of the lessons, driven by the Playwright async API.
+        Follows the same exercise semantics as ``TypingKeyboard``.
+        :param typing_page: The async typing page pointing to the exercise url.
+        :param settings: The keyboard options, defaults to ``KeyboardSettings()``
+        """
+        self._typing_page = typing_page
+        self._settings = settings or KeyboardSettings()
+        self._event_driven = self._settings.event_driven
+        self._layout:KeyboardLayout = get_layout(self._settings.layout)
+        self._pacer:Optional[Pacer] = get_pacer(self._settings.target_wpm, self._settings.adaptive_pacing)
+        self._observed_snapshot:Optional[ExerciseSnapshot] = None
+        self._observed_sequence:int = 0
+        self._observed_change = asyncio.Event()
+        self._keystrokes:int = 0
+        self._exercises:int = 0
+        self._exercise:int = 1
+        self._next_button_shown:bool = False
+
+    async def _type(self, keys: list[KeyboardKey], delay:float):
+        """
+        Presses a list of Keyboard keys on the typing exercise.
+        A failed attempt is retried from the first key that was not sent, the sent keys are not typed again.
+        :param keys: A list of ``KeyboardKeys``
+        :return:
+        """
+        await self._type_remaining(keys, delay, self._keystrokes)
+
+    @async_retries(policy=ACTION_POLICY)
+    async def _type_remaining(self, keys: list[KeyboardKey], delay:float, first:int):
+        """
+        Presses the keys that were not sent since the keystroke count was ``first``.
+        :param keys: A list of ``KeyboardKeys``
+        :param delay: The keyboard delay in milliseconds.
+        :param first: The keystroke count before the first attempt.
+        :return:
+        """
+        await self._typing_page.wait_for_load_state("load")
+        keys = keys[self._keystrokes - first:]
+        page = self._typing_page.locator("html")
+        if self._pacer is None:
+            for key in keys:
+                await page.press(key.key, delay=delay)
+                self._keystrokes += 1
+                KEYSTROKES.inc()
+            return
+
+        hold_time = self._pacer.hold_time(delay)
+        for key in keys:
+            await asyncio.sleep(self._pacer.delay())
+            await page.press(key.key, delay=hold_time)
+            self._keystrokes += 1
+            KEYSTROKES.inc()
+
+    @async_retries(policy=ACTION_POLICY)
+    async def _press(self, key:KeyboardKey):
+        """
+        Presses a single ``KeyboardKey`` into the typing exercise.
+        :param key: A single ``KeyboardKey``
+        :return:
+        """
+        await self._typing_page.wait_for_load_state("load")
+        await self._typing_page.locator("html").press(key.key)
+        self._keystrokes += 1
+        KEYSTROKES.inc()
+
+    @async_retries(policy=PROBE_POLICY)
+    async def get_snapshot(self) -> ExerciseSnapshot:
+        """
+        Returns the current state of the exercise page using a single ``evaluate`` call.
+        :return:
+        """
+        await self._typing_page.wait_for_load_state("load")
+        with PROBE_LATENCY.time(probe="snapshot"):
+            return ExerciseSnapshot.from_dict(await self._typing_page.evaluate(EXERCISE_SNAPSHOT_SCRIPT, _SNAPSHOT_LOCATORS))
+
+    async def _observe(self):
+        """
+        Injects the exercise observer into the typing page and routes its snapshots to this keyboard.
+        :return:
+        """
+        if self._typing_page not in _observed_pages:
+            await self._typing_page.expose_binding(OBSERVER_BINDING, _on_exercise_changed)
+        _observed_pages[self._typing_page] = self
+        self._observed_snapshot = None
+        self._observed_sequence = 0
+        with PROBE_LATENCY.time(probe="observe"):
+            await self._typing_page.evaluate(EXERCISE_OBSERVER_SCRIPT, {"binding": OBSERVER_BINDING, "locators": _SNAPSHOT_LOCATORS})
+
+    async def _wait_for_change(self, sequence:int) -> ExerciseSnapshot:
+        """
+        Waits until the observer reports a change newer than ``sequence``.
+        If nothing is reported in ``OBSERVER_TIMEOUT`` (e.g: the document was reloaded) the observer is
+        injected again and the page is read directly.
+        :param sequence: The observer sequence number before the last actions were performed.
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + OBSERVER_TIMEOUT / 1000
+        while self._observed_sequence <= sequence:
+            self._observed_change.clear()
+            try:
+                await asyncio.wait_for(self._observed_change.wait(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                await self._observe()
+                return await self.get_snapshot()
+
+        return self._observed_snapshot
+
+    def _get_active_keys(self, snapshot:ExerciseSnapshot) -> Optional[list[KeyboardKey]]:
+        """
+        Returns the active keys of the snapshot as ``KeyboardKey`` objects if exists.
+        :param snapshot: The exercise snapshot.
+        :return:
+        """
+        if not snapshot.active_keys:
+            return None
+
+        keyboard_keys = TypingKeyboard._process_raw_keys(snapshot.active_keys, self._layout)
+        return TypingKeyboard._apply_shift_effect(keyboard_keys)
+
+    def _complete_exercise(self):
+        self._exercises += 1
+        EXERCISES.inc()
+
+    @async_retries(policy=NAVIGATION_POLICY)
+    async def _go_back_to_lessons(self):
+        """
+        Returns to the lessons dashboard.
+        :return:
+        """
+        await self._typing_page.goto(TYPING_URL)
+        await self._typing_page.wait_for_load_state()
+
+    async def start_typing(self, delay:float, on_exercise_complete:Optional[Callable[[int], None]]=None):
+        """
+        Waits for the lesson page to load before starting to type until the end of the lesson is found.
+        :param delay: The delay of the keyboard in milliseconds.
+        :param on_exercise_complete: Called with the 1-based number (counted from the first typed exercise) of every
+        exercise once it's completed.
+        :raises playwright.async_api.TimeOutError, playwright.async_api.Error, URLChangedError:
+        :return:
+        """
+        self._exercise = 1
+        self._next_button_shown = False
+        await self._type_lesson(delay, on_exercise_complete)
+
+    # Not retried, the actions and probes of the loop have their own policies and a retried loop would multiply them.
+    async def _type_lesson(self, delay:float, on_exercise_complete:Optional[Callable[[int], None]]):
+        # we assume that the keyboard is started on the exercise page
+        await install_async_overlay_handlers(self._typing_page)
+        await self._typing_page.wait_for_load_state("load")
+        exercise_page_url = self._typing_page.url
+        if self._event_driven:
+            await self._observe()
+        else:
+            await self._typing_page.wait_for_load_state("networkidle")
+        snapshot = await self.get_snapshot()
+        with log_context(exercise=self._exercise):
+            while not snapshot.is_complete:
+                sequence = self._observed_sequence
+
+                if snapshot.url != exercise_page_url:
+                    message = f"URL: {exercise_page_url} changed while performing an exercise."
+                    raise URLChangedError(message)
+                if snapshot.has_next_button and not self._next_button_shown:
+                    # The button can still be shown after the click, the exercise is only counted once.
+                    self._next_button_shown = True
+                    if self._pacer is not None:
+                        self._pacer.lift_ceiling()
+                    self._complete_exercise()
+                    if on_exercise_complete is not None:
+                        on_exercise_complete(self._exercise)
+                    self._exercise += 1
+                    update_log_context(exercise=self._exercise)
+                    typing_logger.debug("Exercise %d completed", self._exercise - 1)
+                elif not snapshot.has_next_button:
+                    self._next_button_shown = False
+                if snapshot.has_next_button:
+                    next_exercise_button = self._typing_page.locator(TypingLessonLocators.NEXT_EXERCISE_BUTTON)
+                    await next_exercise_button.wait_for(timeout=30000.0)
+                    await next_exercise_button.click(force=True)
+                if snapshot.main_key:
+                    await self._press(KeyboardKey.get(snapshot.main_key, layout=self._layout))
+                    await self._press(ENTER_KEY)
+                exercise_active_keys = self._get_active_keys(snapshot)
+                if exercise_active_keys:
+                    typing_logger.debug("Typing %s", exercise_active_keys, extra={"typed": snapshot.typed})
+                    await self._type(exercise_active_keys, delay)
+
+                previous = snapshot
+                if self._event_driven:
+                    snapshot = await self._wait_for_change(sequence)
+                else:
+                    await self._typing_page.wait_for_load_state("networkidle")
+                    snapshot = await self.get_snapshot()
+                if exercise_active_keys and snapshot == previous:
+                    # Nothing reacted to the keystrokes, an overlay might be covering the exercise.
+                    typing_logger.debug("The page didn't react to %s", exercise_active_keys)
+                    await async_dismiss_overlays(self._typing_page)
+                if self._pacer is not None and exercise_active_keys:
+                    TypingKeyboard._record_progress(self._pacer, previous, snapshot)
+        self._complete_exercise()
+        if on_exercise_complete is not None:
+            on_exercise_complete(self._exercise)
+
+        if self._event_driven:
+            # The binding stays exposed on the page, the next keyboard will take it over.
+            _observed_pages[self._typing_page] = None
+        await self._go_back_to_lessons()
+
+    @property
+    def settings(self) -> KeyboardSettings:
+        return self._settings
+
+    @property
+    def keystrokes(self) -> int:
+        """
+        Returns the number of keystrokes sent since the keyboard was created.
+        :return:
+        """
+        return self._keystrokes
+
+    @property
+    def exercises(self) -> int:
+        """
+        Returns the number of exercises completed since the keyboard was created.
+        :return:
+        """
+        return self._exercises
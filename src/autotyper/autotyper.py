@@ -1,20 +1,60 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
 from pathlib import Path
-from typing import Union
-from playwright.sync_api import Locator
+from typing import Union, Iterable, Optional
+import greenlet
+import playwright.sync_api
+from playwright.sync_api import Locator, Page
+from src.core.browser_endpoint import BrowserEndpoint
 from src.core.browser_navigator import BrowserNavigator
-from src.core.errors import UserNotLoggedError, CategoryNotFoundError, CategoryError
-from src.autotyper.lesson import Lesson
+from src.core.browser_pool import BrowserPool
+from src.core.errors import UserNotLoggedError, CategoryNotFoundError, CategoryError, AutotyperError, LessonNotAvailableError
+from src.autotyper.catalog_cache import CatalogCache
+from src.autotyper.catalog_cache import LessonRecord
+from src.autotyper.overlays import install_overlay_handlers
+from src.autotyper.progress_journal import ProgressJournal
+from src.autotyper.lesson import (Lesson, LessonResult, CategoryState, ExerciseState, DASHBOARD_LOCATORS, lesson_record_from_dashboard,
+                                  _lesson_state_from_class, _exercise_state_from_class)
+from src.autotyper.typing_keyboard import KeyboardSettings
 from src.utils.browser_utils import locator_exists
+from src.utils.instrumentation import INSTRUMENTATION
+from src.utils.logutil import log_context
+from src.utils.metrics import (METRICS, LESSONS, LESSON_ERRORS, LESSON_DURATION, KEYSTROKES_PER_SECOND,
+                               EXERCISES_PER_SECOND)
+from src.utils.resource_filter import ResourceFilter
+from src.utils.tracing import TRACER
 from src.core.constants import TypingLocators, TYPING_URL
+from src.core.scripts import LESSON_STATES_SCRIPT, LESSONS_BY_ID_SCRIPT, DASHBOARD_SCRIPT, CATEGORIES_SCRIPT
+
+logger = getLogger("autotyper")
+
+# Milliseconds the main greenlet waits between two checks of the tabs of a concurrent run.
+CONCURRENT_POLL_INTERVAL = 100.0
 
 
 class Autotyper:
-    def __init__(self):
+    def __init__(self, catalog:Optional[CatalogCache]=None, resource_filter:Optional[ResourceFilter]=None,
+                 endpoint:Optional[BrowserEndpoint]=None):
+        """
+        Automatically completes the typing website lessons.
+        :param catalog: The on-disk lessons catalog cache, the lessons are scraped on every visit if it's ``None``.
+        :param resource_filter: Blocks the requests that are not needed to type (images, fonts, trackers, ...),
+        ``None`` to load everything.
+        :param endpoint: The remote debugging endpoint of the browser, defaults to ``BrowserEndpoint()`` (localhost:9222)
+        """
         self._browser_path:Union[str, Path] = ""
-        self._browser:BrowserNavigator = BrowserNavigator()
+        self._browser:BrowserNavigator = BrowserNavigator(resource_filter, endpoint)
+        self._browser_pool:Optional[BrowserPool] = None
+        self._resource_filter:Optional[ResourceFilter] = resource_filter
         self._lessons_categories:dict[str, Locator] = {}
         self._lessons:dict[str,list[Lesson]] = {}
         self._typing_delay:float = 0.0
+        self._keyboard_settings:KeyboardSettings = KeyboardSettings()
+        self._catalog:Optional[CatalogCache] = catalog
+        if resource_filter is not None:
+            METRICS.register_collector("resources", resource_filter.stats.metric_families)
 
     @staticmethod
     def _get_typing_page(browser:BrowserNavigator):
@@ -26,10 +66,12 @@ class Autotyper:
         tab_index = browser.find_tab(TYPING_URL)
         if tab_index is None:
             browser.active_tab = browser.new_tab()
+            install_overlay_handlers(browser.active_tab)
             browser.active_tab.goto(TYPING_URL)
             return
 
         browser.active_tab = tab_index
+        install_overlay_handlers(browser.active_tab)
         browser.active_tab.wait_for_load_state("load")
 
     def _is_user_logged(self) -> bool:
@@ -49,11 +91,20 @@ class Autotyper:
     def _get_categories(self):
         """
         Retrieves the available categories in the typing dashboard.
+        The category names are taken from the catalog cache when it's fresh.
         :return:
         """
-        self._browser.active_tab.wait_for_url(TYPING_URL)
-        lessons_categories_tabs = self._browser.active_tab.get_by_role(TypingLocators.TAB_LIST_CONTAINER).get_by_role(TypingLocators.TAB_LIST).all()
-        self._lessons_categories = {category.inner_text().split("\n\n")[0]:category for category in lessons_categories_tabs}
+        page = self._browser.active_tab
+        page.wait_for_url(TYPING_URL)
+        tabs = page.get_by_role(TypingLocators.TAB_LIST_CONTAINER).get_by_role(TypingLocators.TAB_LIST)
+        categories = self._catalog.get_categories() if self._catalog else None
+        if not categories:
+            roles = {"tabList": TypingLocators.TAB_LIST_CONTAINER, "tab": TypingLocators.TAB_LIST}
+            categories = page.evaluate(CATEGORIES_SCRIPT, roles)
+            if self._catalog:
+                self._catalog.put_categories(categories)
+
+        self._lessons_categories = {category:tabs.nth(index) for index, category in enumerate(categories)}
 
     def start(self, browser_path:Union[str, Path], typing_delay:float):
         """
@@ -86,9 +137,9 @@ class Autotyper:
         :param category: The category of the lessons.
         :return:
         """
-        self._get_categories()
         if self._browser.active_tab.url != TYPING_URL:
             self._get_typing_page(self._browser)
+        self._get_categories()
         if category not in self._lessons_categories:
             raise CategoryNotFoundError(category, list(self._lessons_categories.keys()))
 
@@ -97,14 +148,269 @@ class Autotyper:
             raise CategoryError("Could not get the specified category. Probably the locator doesn't exists anymore")
 
         picked_category.click()
-        lessons:list[Lesson] = []
-        lessons_containers = self._browser.active_tab.locator(TypingLocators.LESSON_CONTAINER)
+        records = self._get_cached_lessons(category) if self._catalog else None
+        if records is None:
+            records = self._scrape_lessons()
+            if self._catalog:
+                self._catalog.put_lessons(category, records)
 
-        for container in lessons_containers.all():
-            new_lesson = Lesson(category, container, self._browser.active_tab, self._typing_delay)
-            lessons.append(new_lesson)
+        on_update = (lambda updates: self._catalog.update_lessons(category, updates)) if self._catalog else None
+        category_state = CategoryState(category, records, self._browser.active_tab, picked_category, on_update)
+        lessons:list[Lesson] = []
+        for position, record in enumerate(records):
+            lesson = Lesson.from_record(category, record, self._browser.active_tab, self._typing_delay, self._keyboard_settings)
+            lesson.bind(category_state, position)
+            lessons.append(lesson)
         return lessons
 
+    def _scrape_lessons(self) -> list[LessonRecord]:
+        """
+        Reads every lesson and exercise of the selected category with a single ``evaluate`` call.
+        :return:
+        """
+        return [lesson_record_from_dashboard(lesson) for lesson in self._browser.active_tab.evaluate(DASHBOARD_SCRIPT, DASHBOARD_LOCATORS)]
+
+    def _get_cached_lessons(self, category:str) -> Optional[list[LessonRecord]]:
+        """
+        Returns the lessons of the category from the catalog cache, reading again only the lessons whose state
+        or exercises changed.
+        Returns ``None`` if the category must be scraped again.
+        :param category: The category of the lessons, its tab must be selected.
+        :return:
+        """
+        page = self._browser.active_tab
+        states = [(button_id, _lesson_state_from_class(button_class).name,
+                   [_exercise_state_from_class(exercise_class) == ExerciseState.COMPLETE for exercise_class in exercises])
+                  for button_id, button_class, exercises in page.evaluate(LESSON_STATES_SCRIPT, DASHBOARD_LOCATORS)]
+
+        changed_lessons = self._catalog.changed_lessons(category, states)
+        if changed_lessons is None:
+            return None
+        if changed_lessons:
+            ids = [states[index][0] for index in changed_lessons]
+            if not all(ids):
+                return None
+            lessons = page.evaluate(LESSONS_BY_ID_SCRIPT, {"locators": DASHBOARD_LOCATORS, "ids": ids})
+            if not all(lessons):
+                return None
+            self._catalog.update_lessons(category, {index: lesson_record_from_dashboard(lesson)
+                                                    for index, lesson in zip(changed_lessons, lessons)})
+
+        return self._catalog.get_lessons(category)
+
+    def _run_lesson_on(self, page:Page, reference:Lesson, result:LessonResult, journal:Optional[ProgressJournal]=None):
+        """
+        Opens the lesson on the given page and types it until the end.
+        :param page: A tab of the active window, independent from the active tab.
+        :param reference: The lesson to run, it's built again on ``page``.
+        :param result: The result of the lesson, its keystrokes are counted even if the lesson fails.
+        :param journal: Resumes the lesson at its first exercise missing from the journal and records the progress.
+        :raises LessonNotAvailableError, URLChangedError, LessonDeadlineError, playwright.sync_api.Error:
+        :return:
+        """
+        if not reference.button_id:
+            raise LessonNotAvailableError(reference.title)
+
+        lesson = Lesson.from_record(reference.category, reference.to_record(), page, self._typing_delay,
+                                    self._keyboard_settings)
+        try:
+            with log_context(lesson=lesson.title, category=lesson.category):
+                page.goto(TYPING_URL)
+                category_tab = page.get_by_role(TypingLocators.TAB_LIST_CONTAINER).get_by_role(TypingLocators.TAB_LIST)
+                category_tab.filter(has_text=lesson.category).first.click()
+            if journal is None:
+                lesson.start()
+            else:
+                lesson.resume(journal)
+        finally:
+            result.keystrokes = lesson.keystrokes
+            result.exercises = lesson.typed_exercises
+
+    def _run_lessons_concurrently(self, lessons:list[Lesson], concurrency:int,
+                                  journal:Optional[ProgressJournal]=None) -> list[LessonResult]:
+        """
+        Runs the lessons on up to ``concurrency`` new tabs of the active window, or on the browsers of the pool.
+
+        Every tab is driven by a greenlet of the Playwright dispatcher, the same way Playwright runs the event
+        handlers of the sync API: a tab waiting for the browser hands over to the others, so the lessons are typed
+        by the same ``TypingKeyboard`` as the sequential run, on the same connection.
+        :param lessons: The lessons to run.
+        :param concurrency: The number of tabs working at the same time.
+        :param journal: Resumes the lessons at their first exercise missing from the journal and records the progress.
+        :return:
+        """
+        if self._browser_pool is not None:
+            return self._run_lessons_on_pool(lessons, concurrency, journal)
+
+        results = [LessonResult(lesson.category, lesson.title) for lesson in lessons]
+        pending = iter(range(len(lessons)))
+        finished:list[Optional[BaseException]] = []
+
+        def work(page:Page):
+            try:
+                for index in pending:
+                    start_time = time.perf_counter()
+                    try:
+                        self._run_lesson_on(page, lessons[index], results[index], journal)
+                    except (AutotyperError, playwright.sync_api.Error) as error:
+                        results[index].error = error
+                    results[index].duration = time.perf_counter() - start_time
+            except BaseException as error:
+                # Raised again by the main greenlet, an error leaving the greenlet would stop the dispatcher.
+                finished.append(error)
+            else:
+                finished.append(None)
+
+        pages:list[Page] = []
+        try:
+            for _ in range(max(1, min(concurrency, len(lessons)))):
+                page = self._browser.get_tab(self._browser.new_tab())
+                install_overlay_handlers(page)
+                pages.append(page)
+
+            with INSTRUMENTATION.section(f"{len(lessons)} lessons on {len(pages)} tabs"):
+                # Created inside a callback of the Playwright loop so the dispatcher is their parent greenlet.
+                loop = asyncio.get_running_loop()
+                for page in pages:
+                    loop.call_soon(lambda page=page: greenlet.greenlet(work).switch(page))
+                while len(finished) < len(pages):
+                    self._browser.active_tab.wait_for_timeout(CONCURRENT_POLL_INTERVAL)
+        finally:
+            for page in pages:
+                if not page.is_closed():
+                    page.close()
+            TRACER.flush()
+
+        for error in finished:
+            if error is not None:
+                raise error
+        return results
+
+    def _run_lessons_on_pool(self, lessons:list[Lesson], concurrency:int,
+                             journal:Optional[ProgressJournal]=None) -> list[LessonResult]:
+        """
+        Spreads the lessons over the idle browsers of the pool (round-robin), each one driven by its own
+        ``AsyncAutotyper`` with up to ``concurrency / browsers`` tabs.
+        The pooled browsers have their own profiles, they get the cookies of the main browser to share its session.
+        The sync API is bound to the connection of the main browser, so the pool runs on a dedicated thread and
+        types with the async engine.
+        :param lessons: The lessons to run.
+        :param concurrency: The number of tabs working at the same time over all the browsers.
+        :param journal: Resumes the lessons at their first exercise missing from the journal and records the progress.
+        :return:
+        """
+        import playwright.async_api
+        from src.autotyper.async_autotyper import AsyncAutotyper
+
+        cookies = self._browser.cookies()
+        results = [LessonResult(lesson.category, lesson.title) for lesson in lessons]
+
+        async def run_on(endpoint:BrowserEndpoint, indexes:list[int], tabs:int):
+            engine = AsyncAutotyper(self._resource_filter, endpoint)
+            engine.keyboard_settings = self._keyboard_settings
+            try:
+                await engine.start(self._browser_path, self._typing_delay, cookies)
+                share = await engine.run_lessons([lessons[index] for index in indexes], tabs, journal)
+                for index, result in zip(indexes, share):
+                    results[index] = result
+            except (AutotyperError, playwright.async_api.Error) as error:
+                # The browser could not be used, none of its lessons were run.
+                for index in indexes:
+                    results[index].error = error
+            finally:
+                await engine.close()
+
+        async def run(endpoints:list[BrowserEndpoint]):
+            tabs = max(1, concurrency // len(endpoints))
+            shares = [list(range(offset, len(lessons), len(endpoints))) for offset in range(len(endpoints))]
+            await asyncio.gather(*(run_on(endpoint, share, tabs) for endpoint, share in zip(endpoints, shares) if share))
+
+        with self._browser_pool.lease(len(lessons)) as endpoints, ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(asyncio.run, run(endpoints)).result()
+        return results
+
+    def run_lessons(self, lessons:Iterable[Lesson], concurrency:int=1,
+                    journal:Optional[ProgressJournal]=None) -> list[LessonResult]:
+        """
+        Runs the given lessons and returns a ``LessonResult`` for each of them.
+        Errors (``URLChangedError``, timeouts, closed tabs) are stored per lesson instead of being raised.
+
+        With a ``concurrency`` greater than 1 each lesson is run on its own tab of the same window,
+        up to ``concurrency`` tabs at the same time. With a ``browser_pool`` the lessons are spread over its browsers.
+        :param lessons: The lessons to run.
+        :param concurrency: The number of tabs working at the same time.
+        :param journal: Resumes the lessons at their first exercise missing from the journal and records the progress.
+        :return: The results in the same order as ``lessons``.
+        """
+        lessons = list(lessons)
+        if (concurrency > 1 or self._browser_pool is not None) and len(lessons) > 1:
+            results = self._run_lessons_concurrently(lessons, concurrency, journal)
+            self._record_metrics(results)
+            # The lessons ran on other tabs, the dashboard of the active tab is read again for their new state.
+            try:
+                if self._browser.active_tab.url != TYPING_URL:
+                    self._get_typing_page(self._browser)
+                for lesson in lessons:
+                    lesson.refresh_state()
+            except playwright.sync_api.Error as error:
+                logger.warning(f"Could not refresh the state of the lessons -> {error}")
+            return results
+
+        results:list[LessonResult] = []
+        for lesson in lessons:
+            result = LessonResult(lesson.category, lesson.title)
+            start_time = time.perf_counter()
+            start_keystrokes = lesson.keystrokes
+            start_exercises = lesson.typed_exercises
+            try:
+                if self._browser.active_tab.url != TYPING_URL:
+                    self._get_typing_page(self._browser)
+                if journal is None:
+                    lesson.start()
+                else:
+                    lesson.resume(journal)
+            except (AutotyperError, playwright.sync_api.Error) as error:
+                result.error = error
+            result.duration = time.perf_counter() - start_time
+            result.keystrokes = lesson.keystrokes - start_keystrokes
+            result.exercises = lesson.typed_exercises - start_exercises
+            self._record_metrics([result])
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _record_metrics(results:list[LessonResult]):
+        """
+        Updates the lesson metrics with the results of finished lessons.
+        :param results: The lesson results.
+        :return:
+        """
+        for result in results:
+            LESSONS.inc(outcome="completed" if result.succeeded else "failed")
+            if not result.succeeded:
+                LESSON_ERRORS.inc(error=type(result.error).__name__)
+            LESSON_DURATION.observe(result.duration)
+            if result.duration > 0:
+                KEYSTROKES_PER_SECOND.set(result.keystrokes / result.duration)
+                EXERCISES_PER_SECOND.set(result.exercises / result.duration)
+
+    @property
+    def resource_filter(self) -> Optional[ResourceFilter]:
+        return self._resource_filter
+
+    @property
+    def browser_pool(self) -> Optional[BrowserPool]:
+        return self._browser_pool
+
+    @browser_pool.setter
+    def browser_pool(self, pool:Optional[BrowserPool]):
+        """
+        Sets the started pool the lessons are spread over by ``run_lessons``, ``None`` to type on the main browser only.
+        :param pool: The browser pool.
+        :return:
+        """
+        self._browser_pool = pool
+
     @property
     def typing_delay(self) -> float:
         return self._typing_delay
@@ -113,6 +419,14 @@ class Autotyper:
     def typing_delay(self, value:float):
         self._typing_delay = value
 
+    @property
+    def keyboard_settings(self) -> KeyboardSettings:
+        return self._keyboard_settings
+
+    @keyboard_settings.setter
+    def keyboard_settings(self, value:KeyboardSettings):
+        self._keyboard_settings = value
+
     @property
     def categories(self) -> list[str]:
         """
@@ -0,0 +1,198 @@
+import json
+import time
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Optional, Callable
+
+# Stored next to the ``config.conf`` file
+CATALOG_FILE_PATH = Path("catalog.json")
+DEFAULT_TTL = 3600.0
+
+
+@dataclass
+class ExerciseRecord:
+    index: int
+    complete: bool
+
+
+@dataclass
+class LessonRecord:
+    """
+    The cached data of a single lesson. ``state`` is the name of its ``LessonState``.
+    """
+    title: str
+    button_id: Optional[str]
+    state: str
+    exercises: list[ExerciseRecord] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "LessonRecord":
+        exercises = [ExerciseRecord(**exercise) for exercise in data.get("exercises", [])]
+        return cls(data["title"], data["button_id"], data["state"], exercises)
+
+    @property
+    def completed_exercises(self) -> int:
+        return sum(1 for exercise in self.exercises if exercise.complete)
+
+
+@dataclass
+class CategoryRecord:
+    lessons: list[LessonRecord]
+    updated_at: float
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "CategoryRecord":
+        return cls([LessonRecord.from_dict(lesson) for lesson in data["lessons"]], data["updated_at"])
+
+
+class CatalogCache:
+    def __init__(self, path:Path = CATALOG_FILE_PATH, ttl:float = DEFAULT_TTL, clock:Callable[[], float] = time.time):
+        """
+        On-disk cache of the lessons catalog, keyed by category.
+        The file is lazily loaded on first access and written on every update.
+        :param path: The json file storing the catalog.
+        :param ttl: Seconds after which a cached category must be scraped again.
+        :param clock: Function returning the current time in seconds, ``time.time`` by default.
+        """
+        self._path:Path = path
+        self._ttl:float = ttl
+        self._clock = clock
+        self._categories:list[str] = []
+        self._categories_updated_at:float = 0.0
+        self._lessons:dict[str, CategoryRecord] = {}
+        self._loaded:bool = False
+
+    def _is_fresh(self, updated_at:float) -> bool:
+        return self._clock() - updated_at < self._ttl
+
+    def load(self):
+        """
+        Loads the catalog file if it exists. A corrupted file is treated as an empty catalog.
+        :return:
+        """
+        self._loaded = True
+        if not self._path.is_file():
+            return
+
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            self._categories = list(data.get("categories", []))
+            self._categories_updated_at = float(data.get("categories_updated_at", 0.0))
+            self._lessons = {category: CategoryRecord.from_dict(record) for category, record in data.get("lessons", {}).items()}
+        except (ValueError, KeyError, TypeError):
+            self._categories, self._categories_updated_at, self._lessons = [], 0.0, {}
+
+    def save(self):
+        """
+        Writes the catalog file.
+        :return:
+        """
+        data = {
+            "categories": self._categories,
+            "categories_updated_at": self._categories_updated_at,
+            "lessons": {category: asdict(record) for category, record in self._lessons.items()},
+        }
+        self._path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def get_categories(self) -> Optional[list[str]]:
+        """
+        Returns the cached category names, ``None`` if they are missing or expired.
+        :return:
+        """
+        self._ensure_loaded()
+        if not self._categories or not self._is_fresh(self._categories_updated_at):
+            return None
+        return list(self._categories)
+
+    def put_categories(self, categories:list[str]):
+        """
+        Stores the category names.
+        :param categories: The names of the available categories.
+        :return:
+        """
+        self._ensure_loaded()
+        self._categories = list(categories)
+        self._categories_updated_at = self._clock()
+        self.save()
+
+    def get_lessons(self, category:str) -> Optional[list[LessonRecord]]:
+        """
+        Returns the cached lessons of the category, ``None`` if they are missing or expired.
+        :param category: The category of the lessons.
+        :return:
+        """
+        self._ensure_loaded()
+        record = self._lessons.get(category)
+        if record is None or not self._is_fresh(record.updated_at):
+            return None
+        return record.lessons
+
+    def put_lessons(self, category:str, lessons:list[LessonRecord]):
+        """
+        Stores every lesson of the category, resetting its TTL.
+        :param category: The category of the lessons.
+        :param lessons: The lesson records in dashboard order.
+        :return:
+        """
+        self._ensure_loaded()
+        self._lessons[category] = CategoryRecord(list(lessons), self._clock())
+        self.save()
+
+    def changed_lessons(self, category:str, states:list[tuple[Optional[str], str, list[bool]]]) -> Optional[list[int]]:
+        """
+        Compares the cached lessons against the ``(button id, state name, exercises complete)`` tuples read from
+        the dashboard.
+        Returns the positions of the lessons whose state or exercises progress changed, or ``None`` if the cached
+        category doesn't match the dashboard anymore (missing, expired or with different lessons) and must be
+        scraped again.
+        :param category: The category of the lessons.
+        :param states: The button id, state name and completion of every exercise of every lesson in dashboard order.
+        :return:
+        """
+        lessons = self.get_lessons(category)
+        if lessons is None or len(lessons) != len(states):
+            return None
+        if any(lesson.button_id != button_id for lesson, (button_id, _, _) in zip(lessons, states)):
+            return None
+        return [index for index, (lesson, (_, state, exercises)) in enumerate(zip(lessons, states))
+                if lesson.state != state or [exercise.complete for exercise in lesson.exercises] != exercises]
+
+    def update_lessons(self, category:str, updates:dict[int, LessonRecord]):
+        """
+        Replaces some lessons of a cached category without resetting its TTL.
+        :param category: The category of the lessons.
+        :param updates: The new records keyed by their position in the category.
+        :return:
+        """
+        self._ensure_loaded()
+        record = self._lessons.get(category)
+        if record is None:
+            return
+        for index, lesson in updates.items():
+            record.lessons[index] = lesson
+        self.save()
+
+    def invalidate(self, category:Optional[str] = None):
+        """
+        Removes a category from the cache, or the whole catalog if no category is given.
+        :param category: The category to remove.
+        :return:
+        """
+        self._ensure_loaded()
+        if category is None:
+            self._categories, self._categories_updated_at, self._lessons = [], 0.0, {}
+        else:
+            self._lessons.pop(category, None)
+        self.save()
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @ttl.setter
+    def ttl(self, value:float):
+        self._ttl = value
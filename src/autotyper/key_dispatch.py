@@ -0,0 +1,138 @@
+from typing import Optional, TYPE_CHECKING
+from playwright.sync_api import Page
+
+if TYPE_CHECKING:
+    from src.autotyper.typing_keyboard import KeyboardKey
+
+
+def _text_of(key:"KeyboardKey") -> Optional[str]:
+    """
+    Returns the character typed by a key, ``None`` for the keys that don't type one. e.g: "a", " ", None for "Enter"
+    :param key: The key.
+    :return:
+    """
+    if key.key == "Space":
+        return " "
+    return key.key if len(key.key) == 1 else None
+
+
+class KeyDispatcher:
+    def __init__(self, page:Page):
+        """
+        Base class of the keystroke dispatch backends used by the ``TypingKeyboard``.
+        :param page: The typing page receiving the keystrokes.
+        """
+        self._page = page
+        self._sent:int = 0
+
+    def press(self, key:"KeyboardKey", delay:float = 0.0):
+        """
+        Presses a single key.
+        :param key: The key to press.
+        :param delay: Time in milliseconds to hold the key.
+        :return:
+        """
+        raise NotImplementedError
+
+    def type(self, keys:list["KeyboardKey"], delay:float = 0.0):
+        """
+        Presses a sequence of keys.
+        :param keys: The keys to press in order.
+        :param delay: The keyboard delay in milliseconds.
+        :return:
+        """
+        self._sent = 0
+        for key in keys:
+            self.press(key, delay)
+            self._sent += 1
+
+    @property
+    def sent(self) -> int:
+        """
+        Returns the number of keys of the last ``type`` call that were sent, even if the call failed.
+        :return:
+        """
+        return self._sent
+
+
+class LocatorDispatcher(KeyDispatcher):
+    def __init__(self, page:Page):
+        """
+        Presses the keys through ``Locator.press`` on the html element.
+        Performs the locator actionability checks on every keystroke.
+        :param page: The typing page receiving the keystrokes.
+        """
+        super().__init__(page)
+        self._html = page.locator("html")
+
+    def press(self, key:"KeyboardKey", delay:float = 0.0):
+        self._html.press(key.key, delay=delay)
+
+
+class KeyboardDispatcher(KeyDispatcher):
+    """
+    Presses the keys through ``page.keyboard.press`` skipping the locator resolution.
+    """
+    def press(self, key:"KeyboardKey", delay:float = 0.0):
+        self._page.keyboard.press(key.key, delay=delay)
+
+
+class BulkTypeDispatcher(KeyDispatcher):
+    """
+    Sends consecutive printable keys (spaces included) with a single ``page.keyboard.type`` call.
+    Special keys (Enter, Tab, ...) are pressed one by one.
+    """
+    def _send_text(self, text:str, delay:float):
+        self._page.keyboard.type(text, delay=delay)
+
+    def press(self, key:"KeyboardKey", delay:float = 0.0):
+        self._page.keyboard.press(key.key, delay=delay)
+
+    def type(self, keys:list["KeyboardKey"], delay:float = 0.0):
+        self._sent = 0
+        text = ""
+        for key in keys:
+            character = _text_of(key)
+            if character is not None:
+                text += character
+                continue
+            if text:
+                self._send_text(text, delay)
+                self._sent += len(text)
+                text = ""
+            self.press(key, delay)
+            self._sent += 1
+
+        if text:
+            self._send_text(text, delay)
+            self._sent += len(text)
+
+
+class InsertTextDispatcher(BulkTypeDispatcher):
+    """
+    Sends consecutive printable keys with a single ``page.keyboard.insert_text`` call.
+    **Note** that ``insert_text`` only emits the ``input`` event, no keydown/keyup events are dispatched.
+    """
+    def _send_text(self, text:str, delay:float):
+        self._page.keyboard.insert_text(text)
+
+
+DISPATCH_BACKENDS:dict[str, type[KeyDispatcher]] = {
+    "locator": LocatorDispatcher,
+    "keyboard": KeyboardDispatcher,
+    "type": BulkTypeDispatcher,
+    "insert_text": InsertTextDispatcher,
+}
+
+def get_dispatcher(backend:str, page:Page) -> KeyDispatcher:
+    """
+    Returns a new dispatcher of the given backend for the page.
+    Raises a ``ValueError`` if the backend is not registered on ``DISPATCH_BACKENDS``.
+    :param backend: The backend name. e.g: "locator", "type"
+    :param page: The typing page receiving the keystrokes.
+    :raise ValueError:
+    :return:
+    """
+    if backend not in DISPATCH_BACKENDS:
+        raise ValueError(f"The dispatch backend: {backend} is not valid. expected one of these: {list(DISPATCH_BACKENDS)}")
+    return DISPATCH_BACKENDS[backend](page)
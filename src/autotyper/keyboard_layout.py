@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+from src.core.constants import SPECIAL_KEYS
+
+# Immutable lookup tables shared by every layout.
+SPECIAL_KEYS_TABLE:Mapping[str, str] = MappingProxyType(dict(SPECIAL_KEYS))
+# Reverse lookup (key name -> label), the first label registered for a key name wins.
+SPECIAL_LABELS_TABLE:Mapping[str, str] = MappingProxyType(
+    {name: label for label, name in reversed(list(SPECIAL_KEYS.items()))}
+)
+SHIFT_KEYS = frozenset({"shift", "capslock"})
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+@dataclass(frozen=True)
+class KeyboardLayout:
+    """
+    Precomputed immutable tables of a physical keyboard layout.
+
+    ``main_keys`` maps the labels shown on the keyboard keys to the character typed without modifiers. e.g: "Z" -> "z"
+    ``shift_keys`` maps every unshifted character to the one typed alongside `Shift`. e.g: "1" -> "!"
+    ``special_keys`` maps the special labels to the key names. e.g: "⏎" -> "Enter"
+    """
+    name: str
+    main_keys: Mapping[str, str]
+    shift_keys: Mapping[str, str]
+    special_keys: Mapping[str, str] = field(default_factory=lambda: SPECIAL_KEYS_TABLE)
+
+    @classmethod
+    def from_symbols(cls, name:str, symbols:dict[str, str], letters:str = _LETTERS) -> "KeyboardLayout":
+        """
+        Builds the layout tables from its letters and the shifted pairs of its symbols.
+        :param name: The layout name.
+        :param symbols: The non letter characters mapped to the character typed alongside `Shift`.
+        :param letters: The letters of the layout.
+        :return:
+        """
+        shift_keys = {letter: letter.upper() for letter in letters}
+        shift_keys.update(symbols)
+        main_keys = {character: character for character in shift_keys}
+        main_keys.update({letter.upper(): letter for letter in letters})
+        return cls(name, MappingProxyType(main_keys), MappingProxyType(shift_keys))
+
+    def is_special(self, label:str) -> bool:
+        return label in self.special_keys
+
+    def main(self, label:str) -> str:
+        """
+        Returns the character typed when the key with the given label is pressed without modifiers.
+        :param label: The character shown on the key label.
+        :return:
+        """
+        return self.main_keys.get(label, label.lower())
+
+    def shifted(self, label:str) -> str:
+        """
+        Returns the character typed when the key with the given label is pressed alongside `Shift`.
+        :param label: The character shown on the key label.
+        :return:
+        """
+        return self.shift_keys.get(self.main(label), label.capitalize())
+
+
+US_QWERTY = KeyboardLayout.from_symbols(
+    "us",
+    {
+        "`": "~", "1": "!", "2": "@", "3": "#", "4": "$", "5": "%", "6": "^", "7": "&", "8": "*", "9": "(", "0": ")",
+        "-": "_", "=": "+", "[": "{", "]": "}", "\\": "|", ";": ":", "'": "\"", ",": "<", ".": ">", "/": "?",
+    },
+)
+
+FRENCH_AZERTY = KeyboardLayout.from_symbols(
+    "azerty",
+    {
+        "&": "1", "é": "2", "\"": "3", "'": "4", "(": "5", "-": "6", "è": "7", "_": "8", "ç": "9", "à": "0",
+        ")": "°", "=": "+", "^": "¨", "$": "£", "ù": "%", "*": "µ", ",": "?", ";": ".", ":": "/", "!": "§", "<": ">",
+    },
+)
+
+LAYOUTS:Mapping[str, KeyboardLayout] = MappingProxyType({layout.name: layout for layout in (US_QWERTY, FRENCH_AZERTY)})
+
+def get_layout(name:str) -> KeyboardLayout:
+    """
+    Returns the registered layout with the given name.
+    Raises a ``ValueError`` if the layout is not registered on ``LAYOUTS``.
+    :param name: The layout name. e.g: "us", "azerty"
+    :raise ValueError:
+    :return:
+    """
+    if name not in LAYOUTS:
+        raise ValueError(f"The keyboard layout: {name} is not valid. expected one of these: {list(LAYOUTS)}")
+    return LAYOUTS[name]
@@ -1,9 +1,27 @@
+import re
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from logging import getLogger
+from typing import Optional, Callable, Union, TYPE_CHECKING
+import playwright.sync_api
+from playwright.async_api import Page as AsyncPage
 from src.core.constants import TypingLocators
-from src.autotyper.typing_keyboard import TypingKeyboard
+from src.core.scripts import LESSONS_BY_ID_SCRIPT
+from src.autotyper.typing_keyboard import TypingKeyboard, KeyboardSettings
+from src.autotyper.catalog_cache import LessonRecord, ExerciseRecord
+from src.autotyper.progress_journal import ProgressJournal
+from src.core.errors import LessonNotAvailableError, LessonNotFoundError
 from playwright.sync_api import Page, Locator
 from src.utils.browser_utils import locator_exists
+from src.utils.instrumentation import INSTRUMENTATION
+from src.utils.logutil import log_context
+from src.utils.retry_policy import lesson_deadline
+from src.utils.tracing import TRACER
+
+if TYPE_CHECKING:
+    from src.autotyper.async_typing_keyboard import AsyncTypingKeyboard
+
+logger = getLogger("autotyper")
 
 
 class LessonState(Enum):
@@ -16,40 +34,184 @@ class ExerciseState(Enum):
     INCOMPLETE = 0
     COMPLETE = 1
 
-class LessonExercise:
-    def __init__(self, exercise_box:Locator, lesson_title:str):
+def _exercise_state_from_class(class_attribute:str) -> ExerciseState:
+    """
+    Returns the exercise state represented by the class attribute of the exercise div.
+    :param class_attribute: The value of the "class" attribute.
+    :return:
+    """
+    if "is-complete" in class_attribute.split():
+        return ExerciseState.COMPLETE
+    return ExerciseState.INCOMPLETE
+
+def _lesson_state_from_class(class_attribute:Optional[str]) -> LessonState:
+    """
+    Returns the lesson state represented by the class attribute of the lesson button.
+    :param class_attribute: The value of the "class" attribute, ``None`` if the button doesn't exist.
+    :return:
+    """
+    if not class_attribute:
+        return LessonState.UNKNOWN
+
+    result = LessonState.UNKNOWN
+    button_state = class_attribute.split()
+    if "btn--c" in button_state:
+        result = LessonState.COMPLETE
+    if "btn--a" in button_state:
+        result = LessonState.ACTIVE
+    if "btn--b" in button_state:
+        result = LessonState.BLOCKED
+
+    return result
+
+
+@dataclass
+class LessonResult:
+    """
+    The outcome of running a single lesson.
+    ``error`` holds the exception that stopped the lesson, ``None`` if it was completed.
+    """
+    category: str
+    title: str
+    duration: float = 0.0
+    error: Optional[BaseException] = None
+    keystrokes: int = 0
+    exercises: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
         """
-        Represents a single exercise from a lesson.
-        :param exercise_box: The locator representing the exercise div
-        :param lesson_title: The title of the lesson containing this exercise
+        Returns the json representation of the result.
+        :return:
         """
-        self._lesson_title:str = lesson_title
-        self._exercise_box:Locator = exercise_box
-        self._state:ExerciseState = self._get_exercise_state(exercise_box)
-        self._index:int = int(exercise_box.get_attribute("data-display-order"))
+        return {
+            "category": self.category,
+            "title": self.title,
+            "duration": round(self.duration, 3),
+            "keystrokes": self.keystrokes,
+            "exercises": self.exercises,
+            "succeeded": self.succeeded,
+            "error": None if self.error is None else f"{type(self.error).__name__}: {self.error}",
+        }
+
+
+def lesson_button_selector(button_id:str) -> str:
+    """
+    Returns the selector of the lesson button with the given "data-id" attribute.
+    :param button_id: The lesson button id.
+    :return:
+    """
+    return f"{TypingLocators.LESSON_BUTTON}[data-id='{button_id}']"
+
+
+# Selectors handed to ``DASHBOARD_SCRIPT``
+DASHBOARD_LOCATORS = {
+    "container": TypingLocators.LESSON_CONTAINER,
+    "title": TypingLocators.LESSON_TITLE,
+    "button": TypingLocators.LESSON_BUTTON,
+    "exercise": "div.chunks div",
+}
+
+def lesson_record_from_dashboard(data:dict) -> LessonRecord:
+    """
+    Converts a lesson read by ``DASHBOARD_SCRIPT`` into a ``LessonRecord``.
+    :param data: A single lesson of the evaluated script result.
+    :return:
+    """
+    exercises = [ExerciseRecord(exercise["index"], _exercise_state_from_class(exercise["class"]) == ExerciseState.COMPLETE)
+                 for exercise in data["exercises"]]
+    return LessonRecord(data["title"], data["button_id"], _lesson_state_from_class(data["button_class"]).name, exercises)
 
-    def __repr__(self):
-        return f"exercise of lesson: [{self._lesson_title}] -> index: [{self._index}], state: [{self._state.name}]"
 
-    @staticmethod
-    def _get_exercise_state(exercise_box:Locator):
+class CategoryState:
+    def __init__(self, category:str, records:list[LessonRecord], typing_page:Page, category_tab:Optional[Locator]=None,
+                 on_update:Optional[Callable[[dict[int, LessonRecord]], None]]=None):
         """
-        Helper method that returns the exercise state.
-        :param exercise_box: The locator representing the exercise div.
+        The live records of the lessons of a category, shared by its ``Lesson`` objects.
+        Every refresh that changes a record increases ``version`` so the lessons update their state lazily.
+        :param category: The category of the lessons.
+        :param records: The lesson records in dashboard order.
+        :param typing_page: The Page class containing the typing website.
+        :param category_tab: The category tab, clicked before reading the dashboard.
+        :param on_update: Called with the updated records keyed by their position (e.g: to update the catalog cache).
+        """
+        self._category:str = category
+        self._records:list[LessonRecord] = list(records)
+        self._typing_page:Page = typing_page
+        self._category_tab:Optional[Locator] = category_tab
+        self._on_update = on_update
+        self._version:int = 0
+
+    def refresh(self, positions:list[int]):
+        """
+        Reads again the lessons at the given positions with a single ``evaluate`` call.
+        The typing page must be on the lessons dashboard.
+        :param positions: The positions of the lessons to refresh.
         :return:
         """
-        exercise_state = exercise_box.get_attribute("class").split()
-        result = ExerciseState.INCOMPLETE
-        if "is-complete" in exercise_state:
-            result = ExerciseState.COMPLETE
-        return result
+        positions = [position for position in positions if self._records[position].button_id]
+        if not positions:
+            return
 
-    def start(self):
+        if self._category_tab:
+            self._category_tab.click()
+        arguments = {"locators": DASHBOARD_LOCATORS, "ids": [self._records[position].button_id for position in positions]}
+        lessons = self._typing_page.evaluate(LESSONS_BY_ID_SCRIPT, arguments)
+
+        updates = {position: lesson_record_from_dashboard(lesson) for position, lesson in zip(positions, lessons) if lesson}
+        updates = {position: record for position, record in updates.items() if record != self._records[position]}
+        if not updates:
+            return
+
+        for position, record in updates.items():
+            self._records[position] = record
+        self._version += 1
+        if self._on_update:
+            self._on_update(updates)
+
+    def refresh_after(self, position:int):
         """
-        Starts the exercise by clicking its box.
+        Refreshes the lesson that just ran and every ``BLOCKED`` lesson that might have been unlocked by it.
+        :param position: The position of the lesson that ran.
         :return:
         """
-        self._exercise_box.click()
+        blocked = [index for index, record in enumerate(self._records)
+                   if record.state == LessonState.BLOCKED.name and index != position]
+        self.refresh([position] + blocked)
+
+    @property
+    def category(self) -> str:
+        return self._category
+
+    @property
+    def records(self) -> list[LessonRecord]:
+        return self._records
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+
+class BaseLessonExercise:
+    def __init__(self, exercise_box:Locator, lesson_title:str, state:ExerciseState, index:int):
+        """
+        The data of a single exercise shared by ``LessonExercise`` and ``AsyncLessonExercise``.
+        :param exercise_box: The locator representing the exercise div
+        :param lesson_title: The title of the lesson containing this exercise
+        :param state: The exercise state
+        :param index: The exercise display order
+        """
+        self._lesson_title:str = lesson_title
+        self._exercise_box = exercise_box
+        self._state:ExerciseState = state
+        self._index:int = index
+        self._lesson:Optional["BaseLesson"] = None
+
+    def __repr__(self):
+        return f"exercise of lesson: [{self._lesson_title}] -> index: [{self._index}], state: [{self.state.name}]"
 
     @property
     def lesson_title(self) -> str:
@@ -57,6 +219,8 @@ class LessonExercise:
 
     @property
     def state(self) -> ExerciseState:
+        if self._lesson:
+            self._lesson._sync()
         return self._state
 
     @property
@@ -64,80 +228,211 @@ class LessonExercise:
         return self._index
 
 
-class Lesson:
-    def __init__(self,category:str, lesson_container:Locator, typing_page:Page, typing_delay:float):
+class LessonExercise(BaseLessonExercise):
+    """
+    Represents a single exercise from a lesson.
+    Use ``LessonExercise.from_box`` to build it from the exercise div.
+    """
+    @classmethod
+    def from_box(cls, exercise_box:Locator, lesson_title:str) -> "LessonExercise":
         """
-        Represents a single lesson from the typing website.
+        Reads the exercise data from its div.
+        :param exercise_box: The locator representing the exercise div
+        :param lesson_title: The title of the lesson containing this exercise
+        :return:
+        """
+        state = _exercise_state_from_class(exercise_box.get_attribute("class"))
+        index = int(exercise_box.get_attribute("data-display-order"))
+        return cls(exercise_box, lesson_title, state, index)
+
+    def start(self):
+        """
+        Starts the exercise by clicking its box.
+        :return:
+        """
+        self._exercise_box.click()
+
+
+class BaseLesson:
+    # The exercise class built by ``from_record``
+    exercise_class:type[BaseLessonExercise] = BaseLessonExercise
+
+    def __init__(self, category:str, title:str, button_id:Optional[str], lesson_state:LessonState,
+                 exercises:list[BaseLessonExercise], typing_page:Union[Page, AsyncPage], typing_delay:float):
+        """
+        The data and progress logic of a lesson shared by ``Lesson`` and ``AsyncLesson``, which add the keyboard and
+        the browser facing methods of their Playwright API.
         :param category: The lesson category (beginner, intermediate, advance,...)
-        :param lesson_container: The div containing the lesson data
-        :param typing_page: The Page class containing the typing website.
+        :param title: The lesson title
+        :param button_id: The "data-id" attribute of the lesson button, ``None`` if the button doesn't exist
+        :param lesson_state: The lesson state
+        :param exercises: The lesson exercises
+        :param typing_page: The Page containing the typing website.
+        :param typing_delay: The delay of the keyboard in milliseconds
         """
-        self._typing_page:Page = typing_page
+        self._typing_page = typing_page
         self._category:str = category
-        self._title:str = lesson_container.locator(TypingLocators.LESSON_TITLE).inner_text()
+        self._title:str = title
         self._typing_delay = typing_delay
-        # check if the button exists (Premium lessons might not show the button if the user is on a free plan)
-        button = lesson_container.locator(TypingLocators.LESSON_BUTTON)
-        self._button:Optional[Locator] = button if locator_exists(button) else None
-        self._lesson_state:LessonState = self._get_button_state(self._button)
-        self._exercises = [LessonExercise(exercise_box, self.title) for exercise_box in
-                           lesson_container.locator("div.chunks div").all()]
-
-        self._keyboard = TypingKeyboard(self._typing_page)
+        self._button_id:Optional[str] = button_id
+        self._lesson_state:LessonState = lesson_state
+        self._exercises:list[BaseLessonExercise] = exercises
+        self._keyboard:Union[TypingKeyboard, "AsyncTypingKeyboard"]
+        self._category_state:Optional[CategoryState] = None
+        self._position:int = 0
+        self._version:int = 0
+        for exercise in self._exercises:
+            exercise._lesson = self
 
     def __repr__(self):
-        button_id = self._button.get_attribute('data-id') if self._button else "Unknown"
-        return f"{self.category} -> {self.title} state: [{self._lesson_state.name}], button id: [{button_id}]"
+        return f"{self.category} -> {self.title} state: [{self.state.name}], button id: [{self._button_id or 'Unknown'}]"
 
-    @staticmethod
-    def _get_button_state(button:Locator) -> LessonState:
+    def bind(self, category_state:CategoryState, position:int):
         """
-        Helper method that returns the lesson button state.
-        :param button:
+        Binds the lesson to the live records of its category so its state follows the dashboard.
+        :param category_state: The live records of the lesson category.
+        :param position: The position of the lesson in the category.
         :return:
         """
-        if not button:
-            return LessonState.UNKNOWN
+        self._category_state = category_state
+        self._position = position
+        self._version = category_state.version
 
-        result = LessonState.UNKNOWN
-        button_state = button.get_attribute("class").split()
-        if "btn--c" in button_state:
-            result = LessonState.COMPLETE
-        if "btn--a" in button_state:
-            result = LessonState.ACTIVE
-        if "btn--b" in button_state:
-            result = LessonState.BLOCKED
+    def _sync(self):
+        """
+        Updates the lesson and exercises states if its category record changed since the last access.
+        :return:
+        """
+        if self._category_state is None or self._version == self._category_state.version:
+            return
 
-        return result
+        self._version = self._category_state.version
+        record = self._category_state.records[self._position]
+        self._lesson_state = LessonState[record.state]
+        completed = {exercise.index: exercise.complete for exercise in record.exercises}
+        for exercise in self._exercises:
+            if exercise.index in completed:
+                exercise._state = ExerciseState.COMPLETE if completed[exercise.index] else ExerciseState.INCOMPLETE
 
-    def start(self):
+    @classmethod
+    def from_record(cls, category:str, record:LessonRecord, typing_page:Union[Page, AsyncPage], typing_delay:float,
+                    keyboard_settings:Optional[KeyboardSettings]=None) -> "BaseLesson":
         """
-        Starts the lesson by clicking the active button.
-        :raises playwright.sync_api.TimeOutError, playwright.sync_api.Error:
+        Builds the lesson from its scraped or cached record without reading the page.
+        The locators are resolved by playwright when the lesson is started.
+        :param category: The lesson category
+        :param record: The lesson data
+        :param typing_page: The Page containing the typing website.
+        :param typing_delay: The delay of the keyboard in milliseconds
+        :param keyboard_settings: The options of the lesson keyboard
+        :return:
+        """
+        container = typing_page.locator(TypingLocators.LESSON_CONTAINER)
+        if record.button_id:
+            container = container.filter(has=typing_page.locator(lesson_button_selector(record.button_id)))
+        else:
+            container = container.filter(has=typing_page.locator(TypingLocators.LESSON_TITLE, has_text=record.title))
+
+        exercises = [
+            cls.exercise_class(
+                container.locator(f"div.chunks div[data-display-order='{exercise.index}']"),
+                record.title,
+                ExerciseState.COMPLETE if exercise.complete else ExerciseState.INCOMPLETE,
+                exercise.index,
+            )
+            for exercise in record.exercises
+        ]
+        return cls(category, record.title, record.button_id, LessonState[record.state], exercises,
+                   typing_page, typing_delay, keyboard_settings)
+
+    def to_record(self) -> LessonRecord:
+        """
+        Returns the cacheable data of the lesson.
+        :return:
+        """
+        self._sync()
+        exercises = [ExerciseRecord(exercise.index, exercise.state == ExerciseState.COMPLETE) for exercise in self._exercises]
+        return LessonRecord(self._title, self._button_id, self._lesson_state.name, exercises)
+
+    @property
+    def _button(self):
+        """
+        Returns the lesson button locator.
+        :raises LessonNotAvailableError: If the lesson doesn't have a button.
+        :return:
+        """
+        if not self._button_id:
+            raise LessonNotAvailableError(self._title)
+        return self._typing_page.locator(lesson_button_selector(self._button_id))
+
+    def _first_incomplete_exercise(self, done:Optional[set[int]]=None) -> Optional[int]:
+        """
+        Returns the 1-based number of the first exercise that is not complete, ``None`` if every exercise is.
+        :param done: Indexes of exercises known to be complete besides the dashboard state. e.g: the journaled ones
         :return:
         """
-        self._button.click()
-        self._keyboard.start_typing(self._typing_delay)
+        done = done or set()
+        for number, exercise in enumerate(self._exercises, 1):
+            if exercise.state != ExerciseState.COMPLETE and exercise.index not in done:
+                return number
+        return None
 
-    def start_from_exercise(self, number:int):
+    def _exercise_to_start_from(self, number:int) -> BaseLessonExercise:
         """
-        Starts the lesson by clicking the desired exercise
+        Returns the exercise ``start_from_exercise`` clicks.
+        The exercise must be completed or follow a completed one (the exercise the lesson would continue at).
         :param number: The exercise number
-        :raises playwright.sync_api.TimeOutError, playwright.sync_api.Error:
+        :raises IndexError:
         :return:
         """
         exercise = self._exercises[number - 1]
-        if exercise.state.value != ExerciseState.COMPLETE.value:
-            raise IndexError(f"The Lesson exercise must be Completed to start from it. Lesson title [{exercise.lesson_title}], exercise number: [{exercise.index}]")
+        previous_complete = number == 1 or self._exercises[number - 2].state == ExerciseState.COMPLETE
+        if exercise.state != ExerciseState.COMPLETE and not previous_complete:
+            raise IndexError(f"The Lesson exercise must be Completed or follow a Completed one to start from it. Lesson title [{exercise.lesson_title}], exercise number: [{exercise.index}]")
+        return exercise
 
-        self._typing_page.wait_for_load_state()
-        self._exercises[number - 1].start()
-        self._keyboard.start_typing(self._typing_delay)
+    def _resume_number(self, journal:ProgressJournal) -> Optional[int]:
+        """
+        Returns the 1-based number of the first exercise that is neither completed on the dashboard nor in the journal,
+        ``None`` if there is nothing left to type.
+        :param journal: The progress journal.
+        :return:
+        """
+        if self.state == LessonState.COMPLETE or journal.is_lesson_complete(self._category, self._title):
+            return None
+
+        number = self._first_incomplete_exercise(journal.completed_exercises(self._category, self._title))
+        if number is None:
+            logger.info(f"Every exercise of the lesson: {self._title} is in the journal, marking it as complete")
+            journal.record_lesson(self._category, self._title)
+        return number
+
+    def _journal_callback(self, journal:Optional[ProgressJournal], first:int) -> Optional[Callable[[int], None]]:
+        """
+        Returns the keyboard callback recording the completed exercises of a run started at the given exercise.
+        :param journal: The progress journal, ``None`` to not record the progress.
+        :param first: The 1-based number of the exercise the run starts at.
+        :return:
+        """
+        if journal is None:
+            return None
+
+        def record(number:int):
+            position = first + number - 2
+            if position < len(self._exercises):
+                journal.record_exercise(self._category, self._title, self._exercises[position].index)
+
+        return record
 
     @property
     def state(self) -> LessonState:
+        self._sync()
         return self._lesson_state
 
+    @property
+    def button_id(self) -> Optional[str]:
+        return self._button_id
+
     @property
     def category(self) -> str:
         return self._category
@@ -159,4 +454,180 @@ class Lesson:
     def title(self) -> str:
         return self._title
 
+    @property
+    def keystrokes(self) -> int:
+        """
+        Returns the number of keystrokes sent to the lesson so far.
+        :return:
+        """
+        return self._keyboard.keystrokes
+
+    @property
+    def typed_exercises(self) -> int:
+        """
+        Returns the number of exercises typed to the end by the lesson keyboard so far.
+        :return:
+        """
+        return self._keyboard.exercises
+
+
+class Lesson(BaseLesson):
+    exercise_class = LessonExercise
+
+    def __init__(self, category:str, title:str, button_id:Optional[str], lesson_state:LessonState,
+                 exercises:list[LessonExercise], typing_page:Page, typing_delay:float,
+                 keyboard_settings:Optional[KeyboardSettings]=None):
+        """
+        Represents a single lesson from the typing website.
+        Use ``Lesson.from_container`` to build it from the lesson div or ``Lesson.from_record`` to build it
+        from the cached catalog.
+        :param category: The lesson category (beginner, intermediate, advance,...)
+        :param title: The lesson title
+        :param button_id: The "data-id" attribute of the lesson button, ``None`` if the button doesn't exist
+        :param lesson_state: The lesson state
+        :param exercises: The lesson exercises
+        :param typing_page: The Page class containing the typing website.
+        :param typing_delay: The delay of the keyboard in milliseconds
+        :param keyboard_settings: The options of the lesson keyboard
+        """
+        super().__init__(category, title, button_id, lesson_state, exercises, typing_page, typing_delay)
+        self._keyboard = TypingKeyboard(self._typing_page, keyboard_settings)
+
+    def refresh_state(self):
+        """
+        Refreshes the category records after the lesson returned to the dashboard.
+        A failed refresh doesn't fail the lesson, the state is refreshed on the next category scrape.
+        :return:
+        """
+        if self._category_state is None:
+            return
+        try:
+            self._category_state.refresh_after(self._position)
+        except playwright.sync_api.Error as error:
+            logger.warning(f"Could not refresh the state of lesson: {self._title} -> {error}")
+
+    @classmethod
+    def from_container(cls, category:str, lesson_container:Locator, typing_page:Page, typing_delay:float,
+                       keyboard_settings:Optional[KeyboardSettings]=None) -> "Lesson":
+        """
+        Reads the lesson data from its div.
+        :param category: The lesson category
+        :param lesson_container: The div containing the lesson data
+        :param typing_page: The Page class containing the typing website.
+        :param typing_delay: The delay of the keyboard in milliseconds
+        :param keyboard_settings: The options of the lesson keyboard
+        :return:
+        """
+        title = lesson_container.locator(TypingLocators.LESSON_TITLE).inner_text()
+        # check if the button exists (Premium lessons might not show the button if the user is on a free plan)
+        button = lesson_container.locator(TypingLocators.LESSON_BUTTON)
+        button_class = None
+        button_id = None
+        if locator_exists(button):
+            button_class = button.get_attribute("class")
+            button_id = button.get_attribute("data-id")
+        exercises = [LessonExercise.from_box(exercise_box, title) for exercise_box in
+                     lesson_container.locator("div.chunks div").all()]
+        return cls(category, title, button_id, _lesson_state_from_class(button_class), exercises,
+                   typing_page, typing_delay, keyboard_settings)
+
+    def _finish(self, journal:Optional[ProgressJournal]):
+        self.refresh_state()
+        if journal is not None:
+            journal.record_lesson(self._category, self._title)
+
+    def start(self, journal:Optional[ProgressJournal]=None):
+        """
+        Starts the lesson by clicking the active button.
+        :param journal: Records the completed exercises and the lesson, ``None`` to not record the progress.
+        :raises playwright.sync_api.TimeOutError, playwright.sync_api.Error, LessonNotAvailableError, LessonDeadlineError, CircuitOpenError:
+        :return:
+        """
+        # The lesson button opens the first incomplete exercise, or the first one of a completed lesson.
+        first = self._first_incomplete_exercise() or 1
+        try:
+            with (INSTRUMENTATION.section(f"lesson: {self._title}"), TRACER.span(self._title, "lesson", lesson_category=self._category),
+                  lesson_deadline(self._keyboard.settings.lesson_deadline), log_context(lesson=self._title, category=self._category)):
+                with TRACER.span("lesson button", "input"):
+                    self._button.click()
+                self._keyboard.start_typing(self._typing_delay, self._journal_callback(journal, first))
+                self._finish(journal)
+        finally:
+            TRACER.flush()
+
+    def _start_at(self, number:int, journal:Optional[ProgressJournal]):
+        try:
+            with (INSTRUMENTATION.section(f"lesson: {self._title} (from exercise {number})"),
+                  TRACER.span(self._title, "lesson", lesson_category=self._category, exercise=number),
+                  lesson_deadline(self._keyboard.settings.lesson_deadline), log_context(lesson=self._title, category=self._category)):
+                self._typing_page.wait_for_load_state()
+                self._exercises[number - 1].start()
+                self._keyboard.start_typing(self._typing_delay, self._journal_callback(journal, number))
+                self._finish(journal)
+        finally:
+            TRACER.flush()
+
+    def start_from_exercise(self, number:int, journal:Optional[ProgressJournal]=None):
+        """
+        Starts the lesson by clicking the desired exercise.
+        The exercise must be completed or follow a completed one (the exercise the lesson would continue at).
+        :param number: The exercise number
+        :param journal: Records the completed exercises and the lesson, ``None`` to not record the progress.
+        :raises playwright.sync_api.TimeOutError, playwright.sync_api.Error, IndexError:
+        :return:
+        """
+        self._exercise_to_start_from(number)
+        self._start_at(number, journal)
+
+    def resume(self, journal:ProgressJournal) -> bool:
+        """
+        Continues the lesson at its first exercise that is neither completed on the dashboard nor in the journal,
+        instead of typing the finished exercises again.
+        :param journal: The progress journal.
+        :raises playwright.sync_api.TimeOutError, playwright.sync_api.Error, LessonNotAvailableError, LessonDeadlineError, CircuitOpenError:
+        :return: ``False`` if there was nothing left to type.
+        """
+        number = self._resume_number(journal)
+        if number is None:
+            return False
+
+        if number == 1:
+            self.start(journal)
+        else:
+            logger.info(f"Resuming the lesson: {self._title} at exercise {number}")
+            self._start_at(number, journal)
+        return True
+
+
+_POSITION_RANGE = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+
+
+def select_lessons(lessons:list[Lesson], selection:list[Union[int, str]]) -> list[Lesson]:
+    """
+    Returns the lessons picked by their 1-based position, position range or title, every lesson if the selection
+    is empty.
+    :param lessons: The lessons of the category.
+    :param selection: The positions, ranges or titles of the lessons. e.g: [1, "3-5", "Shift Keys"]
+    :raises LessonNotFoundError: If a lesson is not found.
+    :return:
+    """
+    if not selection:
+        return list(lessons)
+
+    selected = []
+    titles = {lesson.title: lesson for lesson in lessons}
+    for item in selection:
+        if isinstance(item, int) or str(item).strip().isdigit():
+            first = last = int(item)
+        elif match := _POSITION_RANGE.match(str(item)):
+            first, last = int(match[1]), int(match[2])
+        elif item in titles:
+            selected.append(titles[item])
+            continue
+        else:
+            raise LessonNotFoundError(str(item), f"expected a position, a range or one of these: {list(titles)}")
 
+        if not 1 <= first <= last <= len(lessons):
+            raise LessonNotFoundError(str(item), f"the positions must be between 1 and {len(lessons)}")
+        selected.extend(lessons[first - 1:last])
+    return selected
@@ -0,0 +1,170 @@
+"""
+Dismissal of the popups covering the typing website (survey cards, achievement growls and goal screens).
+
+Playwright calls the locator handlers registered by ``install_overlay_handlers`` before every action once the overlay
+is visible, so the action runs on the uncovered page instead of timing out. Keystrokes that are not sent through a
+locator action (e.g: the "type" backend) don't trigger the handlers, ``dismiss_overlays`` is called by the keyboards
+when the page stops reacting to cover that case.
+"""
+import threading
+from dataclasses import dataclass
+from logging import getLogger
+from weakref import WeakSet
+import playwright.sync_api
+import playwright.async_api
+from src.core.constants import TypingLocators
+from src.utils.metrics import METRICS, MetricFamily
+from src.utils.tracing import TRACER
+
+logger = getLogger("autotyper")
+
+# Milliseconds the dismiss button has to become clickable.
+OVERLAY_DISMISS_TIMEOUT = 2000.0
+
+
+@dataclass(frozen=True)
+class Overlay:
+    """
+    A popup covering the typing website.
+
+    ``name``: The name the dismissals are counted under.
+    ``container``: The selector of the popup.
+    ``dismiss``: The selector of the button closing the popup, relative to ``container``.
+    """
+    name: str
+    container: str
+    dismiss: str
+
+
+OVERLAYS = (
+    Overlay("survey", TypingLocators.CARD_SURVEY_CONTAINER, TypingLocators.CONTAINERS_CLOSE_BUTTON),
+    Overlay("achievement", TypingLocators.ACHIEVEMENT_CONTAINER, TypingLocators.CONTAINERS_CLOSE_BUTTON),
+    Overlay("goal", TypingLocators.GOAL_SCREEN_CONTAINER, TypingLocators.GOAL_CONTINUE_BUTTON),
+)
+
+
+class OverlayMetrics:
+    def __init__(self):
+        """
+        Number of dismissals of every overlay, keyed by overlay name.
+        """
+        self._lock = threading.Lock()
+        self._counters:dict[str, int] = {}
+
+    def increment(self, name:str):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+    def metric_families(self) -> list[MetricFamily]:
+        family = MetricFamily("autotyper_overlays_dismissed", "counter", "Dismissed overlays, by overlay.")
+        for name, value in self.snapshot().items():
+            family.samples.append(("_total", {"overlay": name}, value))
+        return [family]
+
+
+OVERLAY_METRICS = OverlayMetrics()
+METRICS.register_collector("overlays", OVERLAY_METRICS.metric_families)
+# Pages the handlers are registered on, Playwright keeps them for the lifetime of the page.
+_guarded_pages:WeakSet = WeakSet()
+
+
+def _record(overlay:Overlay):
+    """
+    Counts a dismissal once its button was clicked, the failed attempts are only logged.
+    :param overlay: The dismissed overlay.
+    :return:
+    """
+    OVERLAY_METRICS.increment(overlay.name)
+    TRACER.instant("overlay", "overlay", overlay=overlay.name)
+    logger.info(f"Dismissed the {overlay.name} overlay")
+
+
+def install_overlay_handlers(page:playwright.sync_api.Page):
+    """
+    Registers a locator handler dismissing every overlay of ``OVERLAYS`` on the page, once per page.
+    :param page: The typing page.
+    :return:
+    """
+    if page in _guarded_pages:
+        return
+
+    for overlay in OVERLAYS:
+        def dismiss(locator:playwright.sync_api.Locator, overlay:Overlay = overlay):
+            try:
+                locator.locator(overlay.dismiss).first.click(timeout=OVERLAY_DISMISS_TIMEOUT)
+                _record(overlay)
+            except playwright.sync_api.Error as error:
+                # Playwright waits for the overlay to hide after the handler, some of them hide by themselves.
+                logger.warning(f"The {overlay.name} overlay could not be dismissed: {error}")
+
+        page.add_locator_handler(page.locator(overlay.container), dismiss)
+    _guarded_pages.add(page)
+
+
+async def install_async_overlay_handlers(page:playwright.async_api.Page):
+    """
+    Registers a locator handler dismissing every overlay of ``OVERLAYS`` on the page, once per page.
+    :param page: The typing page.
+    :return:
+    """
+    if page in _guarded_pages:
+        return
+
+    for overlay in OVERLAYS:
+        async def dismiss(locator:playwright.async_api.Locator, overlay:Overlay = overlay):
+            try:
+                await locator.locator(overlay.dismiss).first.click(timeout=OVERLAY_DISMISS_TIMEOUT)
+                _record(overlay)
+            except playwright.async_api.Error as error:
+                logger.warning(f"The {overlay.name} overlay could not be dismissed: {error}")
+
+        await page.add_locator_handler(page.locator(overlay.container), dismiss)
+    _guarded_pages.add(page)
+
+
+def dismiss_overlays(page:playwright.sync_api.Page) -> int:
+    """
+    Dismisses the visible overlays without waiting for a locator action.
+    :param page: The typing page.
+    :return: The number of dismissed overlays.
+    """
+    dismissed = 0
+    for overlay in OVERLAYS:
+        container = page.locator(overlay.container).first
+        if not container.is_visible():
+            continue
+        try:
+            container.locator(overlay.dismiss).first.click(timeout=OVERLAY_DISMISS_TIMEOUT)
+            _record(overlay)
+            dismissed += 1
+        except playwright.sync_api.Error as error:
+            logger.warning(f"The {overlay.name} overlay could not be dismissed: {error}")
+    return dismissed
+
+
+async def async_dismiss_overlays(page:playwright.async_api.Page) -> int:
+    """
+    Dismisses the visible overlays without waiting for a locator action.
+    :param page: The typing page.
+    :return: The number of dismissed overlays.
+    """
+    dismissed = 0
+    for overlay in OVERLAYS:
+        container = page.locator(overlay.container).first
+        if not await container.is_visible():
+            continue
+        try:
+            await container.locator(overlay.dismiss).first.click(timeout=OVERLAY_DISMISS_TIMEOUT)
+            _record(overlay)
+            dismissed += 1
+        except playwright.async_api.Error as error:
+            logger.warning(f"The {overlay.name} overlay could not be dismissed: {error}")
+    return dismissed
@@ -0,0 +1,139 @@
+import time
+from typing import Callable, Optional
+
+# Characters per word used by the WPM convention.
+CHARACTERS_PER_WORD = 5
+
+
+def wpm_to_interval(wpm:float) -> float:
+    """
+    Returns the seconds between two keystrokes typed at the given rate.
+    :param wpm: Words per minute, a word being ``CHARACTERS_PER_WORD`` keystrokes.
+    :return:
+    """
+    return 60.0 / (wpm * CHARACTERS_PER_WORD)
+
+
+class Pacer:
+    def __init__(self, wpm:float, clock:Callable[[], float] = time.monotonic):
+        """
+        Schedules the keystrokes at a fixed rate using the monotonic clock.
+        Every keystroke gets a slot ``interval`` seconds after the previous one, so the time spent sending a
+        keystroke is part of the interval instead of being added to it.
+        If the typing loop falls behind (e.g: while waiting for the page) the schedule restarts from now
+        instead of sending a burst of late keystrokes.
+        :param wpm: The target rate in words per minute.
+        :param clock: Function returning the current time in seconds, ``time.monotonic`` by default.
+        """
+        self._wpm:float = wpm
+        self._interval:float = wpm_to_interval(wpm)
+        self._clock = clock
+        self._next_slot:Optional[float] = None
+
+    def delay(self) -> float:
+        """
+        Books the slot of the next keystroke and returns the seconds to wait until it.
+        :return:
+        """
+        now = self._clock()
+        if self._next_slot is None or self._next_slot < now:
+            self._next_slot = now
+        wait = self._next_slot - now
+        self._next_slot += self._interval
+        return wait
+
+    def wait(self):
+        """
+        Sleeps until the slot of the next keystroke.
+        :return:
+        """
+        wait = self.delay()
+        if wait > 0:
+            time.sleep(wait)
+
+    def hold_time(self, delay:float) -> float:
+        """
+        Returns the keydown -> keyup hold time in milliseconds that fits the interval.
+        :param delay: The configured hold time in milliseconds.
+        :return:
+        """
+        return min(delay, self._interval * 1000 / 2)
+
+    def record(self, accepted:bool):
+        """
+        Reports whether the last keystrokes were accepted by the page. Ignored by the fixed rate pacer.
+        :param accepted: ``False`` if the page didn't advance after the keystrokes.
+        :return:
+        """
+        pass
+
+    def lift_ceiling(self):
+        """
+        Called once per exercise. Ignored by the fixed rate pacer.
+        :return:
+        """
+        pass
+
+    def _set_wpm(self, wpm:float):
+        self._wpm = wpm
+        self._interval = wpm_to_interval(wpm)
+
+    @property
+    def wpm(self) -> float:
+        return self._wpm
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+
+class AdaptivePacer(Pacer):
+    def __init__(self, wpm:float, min_wpm:float = 20.0, max_wpm:float = 600.0, step:float = 5.0,
+                 backoff:float = 0.8, clock:Callable[[], float] = time.monotonic):
+        """
+        Pacer that searches the highest rate accepted by the page.
+        The rate grows by ``step`` after every accepted keystroke and is multiplied by ``backoff`` when the page
+        doesn't advance. After a back off the rate is capped below the rejected one so the search settles instead
+        of oscillating.
+        :param wpm: The initial rate in words per minute.
+        :param min_wpm: The lowest rate.
+        :param max_wpm: The highest rate.
+        :param step: The words per minute added after every accepted keystroke.
+        :param backoff: The factor applied to the rate when the page rejects keystrokes.
+        :param clock: Function returning the current time in seconds, ``time.monotonic`` by default.
+        """
+        super().__init__(min(max(wpm, min_wpm), max_wpm), clock)
+        self._min_wpm = min_wpm
+        self._max_wpm = max_wpm
+        self._step = step
+        self._backoff = backoff
+        self._ceiling = max_wpm
+
+    def record(self, accepted:bool):
+        if accepted:
+            self._set_wpm(min(self._wpm + self._step, self._ceiling))
+            return
+
+        # The rejected rate becomes the new ceiling, slowly lifted again in case the page was just busy.
+        self._ceiling = max(self._min_wpm, self._wpm - self._step)
+        self._set_wpm(max(self._min_wpm, self._wpm * self._backoff))
+        self._next_slot = None
+
+    def lift_ceiling(self):
+        """
+        Lets the rate grow past the last rejected rate again.
+        :return:
+        """
+        self._ceiling = min(self._max_wpm, self._ceiling + self._step)
+
+
+def get_pacer(target_wpm:float, adaptive:bool) -> Optional[Pacer]:
+    """
+    Returns the pacer of the keyboard settings, ``None`` if the keystrokes are not paced (``target_wpm`` is 0).
+    :param target_wpm: The target (or initial, for the adaptive mode) rate in words per minute.
+    :param adaptive: Searches the highest rate accepted by the page starting at ``target_wpm``.
+    :return:
+    """
+    if target_wpm <= 0:
+        return None
+    return AdaptivePacer(target_wpm) if adaptive else Pacer(target_wpm)
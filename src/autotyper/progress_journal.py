@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import Union
+
+logger = getLogger("autotyper")
+
+
+class ProgressJournal:
+    def __init__(self, path:Union[str, Path]):
+        """
+        Append-only record of the completed lessons and exercises, used to resume a lesson after a crash.
+        Every entry is a json line flushed to disk before the call returns, so a crash loses at most the entry being
+        written. A truncated last line (the process died mid-write) is ignored when the journal is loaded.
+
+        Entries: ``{"event": "exercise", "category": ..., "lesson": ..., "exercise": <LessonExercise.index>, "time": ...}``
+        and ``{"event": "lesson", "category": ..., "lesson": ..., "time": ...}``
+        :param path: The journal file, created on the first entry.
+        """
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._exercises:dict[tuple[str, str], set[int]] = {}
+        self._lessons:set[tuple[str, str]] = set()
+        self._load()
+
+    def _load(self):
+        if not self._path.is_file():
+            return
+
+        with open(self._path, "r", encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                try:
+                    entry = json.loads(line)
+                    key = (entry["category"], entry["lesson"])
+                    if entry["event"] == "exercise":
+                        self._exercises.setdefault(key, set()).add(int(entry["exercise"]))
+                    elif entry["event"] == "lesson":
+                        self._lessons.add(key)
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping the malformed line {number} of the journal: {self._path}")
+
+    def _append(self, entry:dict):
+        entry["time"] = round(time.time(), 3)
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def record_exercise(self, category:str, title:str, index:int):
+        """
+        Records a completed exercise.
+        :param category: The lesson category.
+        :param title: The lesson title.
+        :param index: The display order of the exercise (``LessonExercise.index``).
+        :return:
+        """
+        with self._lock:
+            self._append({"event": "exercise", "category": category, "lesson": title, "exercise": index})
+            self._exercises.setdefault((category, title), set()).add(index)
+
+    def record_lesson(self, category:str, title:str):
+        """
+        Records a completed lesson.
+        :param category: The lesson category.
+        :param title: The lesson title.
+        :return:
+        """
+        with self._lock:
+            self._append({"event": "lesson", "category": category, "lesson": title})
+            self._lessons.add((category, title))
+
+    def completed_exercises(self, category:str, title:str) -> set[int]:
+        """
+        Returns the indexes of the journaled exercises of a lesson.
+        :param category: The lesson category.
+        :param title: The lesson title.
+        :return:
+        """
+        with self._lock:
+            return set(self._exercises.get((category, title), ()))
+
+    def is_lesson_complete(self, category:str, title:str) -> bool:
+        with self._lock:
+            return (category, title) in self._lessons
+
+    @property
+    def path(self) -> Path:
+        return self._path
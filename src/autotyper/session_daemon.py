@@ -0,0 +1,323 @@
+"""
+Long-lived session daemon keeping an ``Autotyper`` connected to the browser, and its client.
+
+The daemon accepts one JSON request line per connection on a Unix socket, answers with one JSON line and closes the
+connection: ``{"ok": true, "result": ...}`` or ``{"ok": false, "error": "..."}``
+
+The socket lives in ``$XDG_RUNTIME_DIR``, or in a directory only the user can access under the temporary directory.
+
+Commands:
+    ``{"command": "status"}``
+    ``{"command": "categories"}``
+    ``{"command": "lessons", "category": "Beginner"}``
+    ``{"command": "run", "category": "Beginner", "lessons": [1, "3-5", "Shift Keys"], "concurrency": 1}``
+    ``{"command": "shutdown"}``
+
+Usage:
+    ``python -m src.autotyper.session_daemon serve``
+    ``python -m src.autotyper.session_daemon run Beginner 1,2``
+"""
+import argparse
+import getpass
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import Optional, Any, Union
+import playwright.sync_api
+from src.autotyper.autotyper import Autotyper
+from src.autotyper.catalog_cache import CatalogCache
+from src.autotyper.lesson import Lesson, select_lessons
+from src.autotyper.progress_journal import ProgressJournal
+from src.autotyper.typing_keyboard import KeyboardSettings
+from src.core.browser_endpoint import BrowserEndpoint
+from src.core.browser_pool import BrowserPool
+from src.core.config_loader import ConfigLoader
+from src.core.errors import AutotyperError, DaemonError, DefaultBrowserNotFoundError
+from src.utils.browser_discovery import resolve_browser_path
+from src.utils.instrumentation import INSTRUMENTATION
+from src.utils.logutil import setup_logging, LoggingSettings
+from src.utils.metrics import METRICS
+from src.utils.resource_filter import ResourceFilter
+
+logger = getLogger("autotyper")
+
+# Per user directory of the socket when ``$XDG_RUNTIME_DIR`` is not set, created with mode 0700.
+DAEMON_FALLBACK_DIRECTORY = Path(tempfile.gettempdir()) / f"autotyper-{getpass.getuser()}"
+DAEMON_SOCKET_PATH = Path(os.environ.get("XDG_RUNTIME_DIR") or DAEMON_FALLBACK_DIRECTORY) / "autotyper.sock"
+# Seconds a client has to send its request line, so a stalled client doesn't block the daemon.
+DAEMON_REQUEST_TIMEOUT = 10.0
+
+
+def _ensure_private_directory(directory:Path):
+    """
+    Creates the directory with mode 0700, or checks that an existing one belongs to the user and that nobody else
+    can access it.
+    :param directory: The directory.
+    :raises DaemonError: If the directory belongs to another user or other users can access it.
+    :return:
+    """
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    status = directory.stat()
+    if hasattr(os, "getuid") and status.st_uid != os.getuid():
+        raise DaemonError(f"The daemon directory: {directory} belongs to another user")
+    if status.st_mode & 0o077:
+        raise DaemonError(f"The daemon directory: {directory} can be accessed by other users, expected mode 0700")
+
+
+def lesson_summary(lesson:Lesson, position:int) -> dict:
+    """
+    Returns the json representation of a lesson.
+    :param lesson: The lesson.
+    :param position: The 1-based position of the lesson in its category.
+    :return:
+    """
+    return {
+        "position": position,
+        "title": lesson.title,
+        "state": lesson.state.name,
+        "exercises": lesson.exercises,
+        "completed_exercises": lesson.completed_exercises,
+    }
+
+
+class SessionDaemon:
+    def __init__(self, typer:Autotyper, browser_path:Union[str, Path], typing_delay:float,
+                 socket_path:Path = DAEMON_SOCKET_PATH, journal:Optional[ProgressJournal] = None):
+        """
+        Serves the commands of the ``DaemonClient`` with a connected ``Autotyper``.
+        The requests are handled one at a time on the thread that calls ``serve_forever``, since the Playwright
+        sync API can only be used from the thread that started it. Every connection is closed after its answer so
+        a client can't hold the daemon.
+        :param typer: The Autotyper kept connected between the requests.
+        :param browser_path: The browser path used to (re)connect.
+        :param typing_delay: The delay of the keyboard in milliseconds.
+        :param socket_path: The Unix socket path.
+        :param journal: Resumes the lessons from the journal and records their progress, ``None`` to start them over.
+        """
+        self._typer = typer
+        self._browser_path = browser_path
+        self._typing_delay = typing_delay
+        self._socket_path = socket_path
+        self._connected:bool = False
+        self._started_at:float = time.time()
+        self._lessons_run:int = 0
+        self._running:bool = False
+        self._journal = journal
+
+    def _ensure_connected(self):
+        """
+        Connects the Autotyper on the first request and after a browser error.
+        :return:
+        """
+        if not self._connected:
+            self._typer.start(self._browser_path, self._typing_delay)
+            self._connected = True
+
+    def _lessons(self, category:str) -> list[Lesson]:
+        self._ensure_connected()
+        return self._typer.get_lessons(category)
+
+    def handle(self, request:dict) -> Any:
+        """
+        Runs a single command and returns its result.
+        :param request: The decoded request.
+        :raises DaemonError, AutotyperError, playwright.sync_api.Error:
+        :return:
+        """
+        command = request.get("command")
+        match command:
+            case "status":
+                return {
+                    "connected": self._connected,
+                    "uptime": round(time.time() - self._started_at, 1),
+                    "lessons_run": self._lessons_run,
+                    "categories": self._typer.categories,
+                }
+            case "categories":
+                self._ensure_connected()
+                return self._typer.categories
+            case "lessons":
+                lessons = self._lessons(request["category"])
+                return [lesson_summary(lesson, position) for position, lesson in enumerate(lessons, 1)]
+            case "run":
+                lessons = select_lessons(self._lessons(request["category"]), request.get("lessons", []))
+                results = self._typer.run_lessons(lessons, int(request.get("concurrency", 1)), self._journal)
+                self._lessons_run += len(results)
+                return [result.to_dict() for result in results]
+            case "shutdown":
+                self._running = False
+                return None
+            case _:
+                raise DaemonError(f"Unknown command: {command}")
+
+    def _respond(self, line:bytes) -> dict:
+        try:
+            return {"ok": True, "result": self.handle(json.loads(line))}
+        except (DaemonError, AutotyperError, KeyError, ValueError) as error:
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        except playwright.sync_api.Error as error:
+            # The browser or the typing tab might be gone, reconnect on the next request.
+            self._connected = False
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+    def serve_forever(self):
+        """
+        Listens on the Unix socket until a "shutdown" command is received.
+        :raises DaemonError: If the platform doesn't support Unix sockets, a daemon is already running or the socket
+        directory is not private.
+        :return:
+        """
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise DaemonError("Unix sockets are not supported on this platform")
+        if self._socket_path.parent == DAEMON_FALLBACK_DIRECTORY:
+            _ensure_private_directory(DAEMON_FALLBACK_DIRECTORY)
+        if self._socket_path.exists():
+            try:
+                DaemonClient(self._socket_path).request("status")
+                raise DaemonError(f"A daemon is already listening on: {self._socket_path}")
+            except OSError:
+                # stale socket file of a daemon that didn't exit cleanly
+                self._socket_path.unlink()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            timeout = DAEMON_REQUEST_TIMEOUT
+
+            def handle(self):
+                try:
+                    line = self.rfile.readline()
+                except OSError:
+                    logger.warning("A daemon client didn't send its request in time")
+                    return
+                if line.strip():
+                    self.wfile.write(json.dumps(daemon._respond(line)).encode("utf-8") + b"\n")
+
+        with socketserver.UnixStreamServer(str(self._socket_path), Handler) as server:
+            os.chmod(self._socket_path, 0o600)
+            logger.info(f"Session daemon listening on {self._socket_path}")
+            self._running = True
+            try:
+                while self._running:
+                    server.handle_request()
+            finally:
+                self._socket_path.unlink(missing_ok=True)
+                if self._connected:
+                    self._typer.close()
+
+
+class DaemonClient:
+    def __init__(self, socket_path:Path = DAEMON_SOCKET_PATH, timeout:Optional[float] = None):
+        """
+        Sends commands to a running ``SessionDaemon``.
+        :param socket_path: The Unix socket path of the daemon.
+        :param timeout: Seconds to wait for an answer, ``None`` waits forever (lessons can take minutes).
+        """
+        self._socket_path = socket_path
+        self._timeout = timeout
+
+    def request(self, command:str, **arguments) -> Any:
+        """
+        Sends a command and returns its result.
+        :param command: The command name. e.g: "status", "run"
+        :param arguments: The command arguments. e.g: category="Beginner"
+        :raises OSError: If the daemon is not running.
+        :raises DaemonError: If the command failed.
+        :return:
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(self._timeout)
+            connection.connect(str(self._socket_path))
+            connection.sendall(json.dumps({"command": command, **arguments}).encode("utf-8") + b"\n")
+            with connection.makefile("rb") as stream:
+                response = json.loads(stream.readline() or b'{"ok": false, "error": "The daemon closed the connection"}')
+
+        if not response["ok"]:
+            raise DaemonError(response["error"])
+        return response["result"]
+
+
+def serve(socket_path:Path = DAEMON_SOCKET_PATH):
+    """
+    Starts a daemon with the settings of the config file.
+    :param socket_path: The Unix socket path.
+    :return:
+    """
+    config = ConfigLoader.load()
+    setup_logging(LoggingSettings.from_config(config, console_level="INFO"))
+    if config.instrument_calls:
+        INSTRUMENTATION.enable()
+    METRICS.start_export(config.metrics_file, config.metrics_port)
+    endpoint = BrowserEndpoint.from_config(config)
+    typer = Autotyper(CatalogCache(ttl=config.catalog_ttl), ResourceFilter() if config.block_resources else None,
+                      endpoint)
+    typer.keyboard_settings = KeyboardSettings.from_config(config)
+    browser_path = resolve_browser_path(config.browser_path)
+    if browser_path is None:
+        raise DefaultBrowserNotFoundError()
+    if str(browser_path) != config.browser_path:
+        config.browser_path = str(browser_path)
+        ConfigLoader.update(config)
+    journal = ProgressJournal(config.journal_file) if config.journal_file else None
+    pool:Optional[BrowserPool] = None
+    try:
+        if config.browser_pool_size > 0:
+            pool = BrowserPool(browser_path, config.browser_pool_size, endpoint.port + 1, endpoint.host)
+            pool.start()
+            typer.browser_pool = pool
+        SessionDaemon(typer, browser_path, config.typing_delay, socket_path, journal).serve_forever()
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keeps the Autotyper connected between invocations.")
+    parser.add_argument("--socket", type=Path, default=DAEMON_SOCKET_PATH, help="the daemon Unix socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="start the daemon")
+    commands.add_parser("status", help="show the daemon status")
+    commands.add_parser("categories", help="list the lesson categories")
+    lessons_parser = commands.add_parser("lessons", help="list the lessons of a category")
+    lessons_parser.add_argument("category")
+    run_parser = commands.add_parser("run", help="run lessons of a category")
+    run_parser.add_argument("category")
+    run_parser.add_argument("lessons", nargs="?", default="", help="comma separated positions, ranges or titles, all by default")
+    run_parser.add_argument("--concurrency", type=int, default=1)
+    commands.add_parser("stop", help="stop the daemon")
+    arguments = parser.parse_args()
+
+    if arguments.command == "serve":
+        serve(arguments.socket)
+        return
+
+    client = DaemonClient(arguments.socket)
+    try:
+        match arguments.command:
+            case "status" | "categories":
+                result = client.request(arguments.command)
+            case "lessons":
+                result = client.request("lessons", category=arguments.category)
+            case "run":
+                selection = [item.strip() for item in arguments.lessons.split(",") if item.strip()]
+                result = client.request("run", category=arguments.category, lessons=selection,
+                                        concurrency=arguments.concurrency)
+            case _:
+                result = client.request("shutdown")
+    except OSError:
+        print(f"No daemon is listening on: {arguments.socket}", file=sys.stderr)
+        sys.exit(2)
+    except DaemonError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,70 @@
-from typing import Optional
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Optional, Callable, TYPE_CHECKING
+from weakref import WeakKeyDictionary
+import playwright.sync_api
 from playwright.sync_api import Page, Locator
 from src.core.constants import TypingLessonLocators, TYPING_URL
 from src.core.errors import URLChangedError
-from src.utils.browser_utils import locator_exists, retries
-from src.core.constants import SPECIAL_KEYS
-
-def _is_special_key(key:str) -> bool:
+from src.core.scripts import EXERCISE_SNAPSHOT_SCRIPT, EXERCISE_OBSERVER_SCRIPT, LOOKAHEAD_SETTLED_SCRIPT
+from src.autotyper.key_dispatch import KeyDispatcher, DISPATCH_BACKENDS, get_dispatcher
+from src.autotyper.pacing import Pacer, get_pacer
+from src.autotyper.overlays import install_overlay_handlers, dismiss_overlays
+from src.autotyper.keyboard_layout import KeyboardLayout, US_QWERTY, SPECIAL_LABELS_TABLE, SHIFT_KEYS, get_layout
+from src.utils.browser_utils import locator_exists, retries, pause
+from src.utils.logutil import TYPING_LOGGER, log_context, update_log_context
+from src.utils.metrics import KEYSTROKES, EXERCISES, PROBE_LATENCY
+from src.utils.retry_policy import PROBE_POLICY, ACTION_POLICY, NAVIGATION_POLICY
+from src.utils.tracing import TRACER
+
+if TYPE_CHECKING:
+    from src.core.config_loader import ConfigLoader
+
+logger = getLogger("autotyper")
+# Debug records of the typing loop, sample them with ``LoggingSettings.sampling``.
+typing_logger = getLogger(TYPING_LOGGER)
+
+# Selectors handed to ``EXERCISE_SNAPSHOT_SCRIPT``
+_SNAPSHOT_LOCATORS = {
+    "badge": TypingLessonLocators.BADGE,
+    "nextButton": TypingLessonLocators.NEXT_EXERCISE_BUTTON,
+    "mainKeyRole": TypingLessonLocators.MAIN_KEY_CONTAINER_ROLE,
+    "keyLabel": TypingLessonLocators.KEY_LABEL,
+    "keyboard": TypingLessonLocators.KEYBOARD_CONTAINER,
+    "activeKey": TypingLessonLocators.ACTIVE_KEY,
+    "typedLetter": TypingLessonLocators.TYPED_LETTER,
+    "letter": TypingLessonLocators.LETTER,
+}
+# Selectors handed to ``LOOKAHEAD_SETTLED_SCRIPT``
+_SETTLED_LOCATORS = {
+    "typedLetter": TypingLessonLocators.TYPED_LETTER,
+    "nextButton": TypingLessonLocators.NEXT_EXERCISE_BUTTON,
+    "badge": TypingLessonLocators.BADGE,
+}
+# Time the page has to accept the streamed exercise text before falling back to the active keys.
+LOOKAHEAD_SETTLE_TIMEOUT = 5000.0
+# Characters of the exercise text typed with a special key.
+_TEXT_SPECIAL_CHARACTERS = {" ": "␣", "\u00a0": "␣", "\n": "⏎", "⏎": "⏎", "↵": "⏎"}
+# Name of the binding called by ``EXERCISE_OBSERVER_SCRIPT``
+OBSERVER_BINDING = "__autotyperExerciseChanged"
+# Time waited for the observer to report a change before reading the page directly.
+OBSERVER_TIMEOUT = 5000.0
+OBSERVER_POLL_INTERVAL = 10.0
+# The binding can only be exposed once per page, the keyboard currently typing on each page receives the snapshots.
+_observed_pages:WeakKeyDictionary = WeakKeyDictionary()
+# The messages already logged by ``_warn_once``
+_warnings:set[str] = set()
+
+def _warn_once(message:str):
     """
-    Returns ``True`` if the key is special.
-    :param key: The string representing the keyboard key.
+    Logs a warning the first time it's given, e.g: a page layout issue found on every keystroke.
+    :param message: The warning message.
     :return:
     """
-    return key in SPECIAL_KEYS
-
-def _get_actual_key(key:str) -> str:
-    """
-    Returns the actual key that the special keyboard key represents.
-
-    Raises a ``ValueError`` if the key doesn't match a special keyboard key.
-    :param key: The string representing the keyboard key.
-    :raise ValueError:
-    :return:
-    """
-    if key not in SPECIAL_KEYS:
-        message = "The key: " + key, " is not a special key or is not registered as it."
-        raise ValueError(message)
-    return SPECIAL_KEYS[key]
+    if message not in _warnings:
+        _warnings.add(message)
+        logger.warning(message)
 
 def _get_special_key(key:str) -> str:
     """
@@ -35,29 +74,69 @@ def _get_special_key(key:str) -> str:
     :raise ValueError:
     :return:
     """
-    if key not in SPECIAL_KEYS.values():
-        message = "The key: " + key, " doesn't contain a special key."
+    if key not in SPECIAL_LABELS_TABLE:
+        message = f"The key: {key} doesn't contain a special key."
         raise ValueError(message)
-
-    special_key_values = list(SPECIAL_KEYS.values())
-    special_key_keys = list(SPECIAL_KEYS.keys())
-    return special_key_keys[special_key_values.index(key)]
+    return SPECIAL_LABELS_TABLE[key]
 
 
 class KeyboardKey:
-    def __init__(self, *, main_key:str, secondary_key:Optional[str]):
+    __slots__ = ("_label", "_main_key", "_secondary_key", "_is_special", "_shifted", "_layout", "_key")
+
+    # Interned instances, keyed by (main label, secondary label, shifted, layout name)
+    _interned:dict[tuple, "KeyboardKey"] = {}
+
+    def __init__(self, *, main_key:str, secondary_key:Optional[str], shifted:bool=False, layout:KeyboardLayout=US_QWERTY):
         """
-        Represents a single key from the typing keyboard.
+        Represents a single immutable key from the typing keyboard.
+        Prefer ``KeyboardKey.get`` which returns a shared instance instead of building a new one.
         :param main_key: The character that is displayed when the keyboard key is pressed. e.g: `0`
         :param secondary_key: The character that is displayed when the keyboard key is pressed alongside with `Shift`. e.g `)`
+        :param shifted: If the key is pressed alongside with `Shift`.
+        :param layout: The keyboard layout used to resolve the typed character.
         """
-        self._is_special:bool = _is_special_key(main_key)
-        self._main_key:str = main_key if not self._is_special else _get_actual_key(main_key)
+        self._label:str = main_key
+        self._is_special:bool = layout.is_special(main_key)
+        self._main_key:str = main_key if not self._is_special else layout.special_keys[main_key]
         self._secondary_key:Optional[str] = secondary_key
-        self._shifted = False
+        self._shifted:bool = shifted
+        self._layout:KeyboardLayout = layout
+        self._key:str = self._resolve_key()
+
+    @classmethod
+    def get(cls, main_key:str, secondary_key:Optional[str]=None, shifted:bool=False, layout:KeyboardLayout=US_QWERTY) -> "KeyboardKey":
+        """
+        Returns the shared ``KeyboardKey`` instance of the given labels, creating it the first time.
+        :param main_key: The character that is displayed when the keyboard key is pressed. e.g: `0`
+        :param secondary_key: The character that is displayed when the keyboard key is pressed alongside with `Shift`. e.g `)`
+        :param shifted: If the key is pressed alongside with `Shift`.
+        :param layout: The keyboard layout used to resolve the typed character.
+        :return:
+        """
+        interned_key = (main_key, secondary_key, shifted, layout.name)
+        key = cls._interned.get(interned_key)
+        if key is None:
+            key = cls._interned[interned_key] = cls(main_key=main_key, secondary_key=secondary_key, shifted=shifted, layout=layout)
+        return key
+
+    def _resolve_key(self) -> str:
+        """
+        Returns the key name sent to the typing page.
+        :return:
+        """
+        if self._is_special:
+            return self._main_key
+
+        elif self._shifted and self._secondary_key:
+            return self._secondary_key.capitalize()
+
+        elif self._shifted:
+            return self._layout.shifted(self._main_key)
+
+        return self._layout.main(self._main_key)
 
     def __str__(self):
-        return self.key
+        return self._key
 
     def __repr__(self):
         return (
@@ -65,26 +144,33 @@ class KeyboardKey:
                 f" is special: [{self._is_special}], is shifted -> [{self.shift}]"
         )
 
+    @classmethod
+    def from_character(cls, character:str, layout:KeyboardLayout=US_QWERTY) -> "KeyboardKey":
+        """
+        Returns the shared ``KeyboardKey`` instance that types the given character of the exercise text.
+        :param character: A character of the exercise text. e.g: "J", " "
+        :param layout: The keyboard layout used to resolve the typed character.
+        :return:
+        """
+        if character in _TEXT_SPECIAL_CHARACTERS:
+            return cls.get(_TEXT_SPECIAL_CHARACTERS[character], layout=layout)
+        # The labels of the letter keys are uppercase, the lowercase letter is typed without `Shift`.
+        return cls.get(character, shifted=character != character.lower(), layout=layout)
+
+    def with_shift(self) -> "KeyboardKey":
+        """
+        Returns the shared instance of this key pressed alongside with `Shift`.
+        :return:
+        """
+        return KeyboardKey.get(self._label, self._secondary_key, True, self._layout)
+
     @property
     def shift(self) -> bool:
         return self._shifted
 
-    @shift.setter
-    def shift(self, value:bool):
-        self._shifted = value
-
     @property
     def key(self) -> str:
-        if self._shifted and self._secondary_key:
-            return self._secondary_key.capitalize()
-
-        elif self._shifted and not self._secondary_key:
-            return self._main_key.capitalize()
-
-        elif self._is_special:
-            return self._main_key
-
-        return self._main_key.lower()
+        return self._key
 
     @property
     def is_special(self) -> bool:
@@ -98,71 +184,130 @@ class KeyboardKey:
     def secondary(self) -> str:
         return self._secondary_key
 
-class TypingKeyboard:
-    def __init__(self, typing_page:Page):
+
+ENTER_KEY = KeyboardKey.get(_get_special_key("Enter"))
+
+@dataclass
+class KeyboardSettings:
+    """
+    Options of the typing keyboard.
+
+    ``event_driven``: Reacts to the changes reported by a ``MutationObserver`` injected in the page
+    instead of polling the page after every action.
+    ``dispatch_backend``: The keystroke backend registered on ``DISPATCH_BACKENDS`` ("locator", "keyboard", "type" or
+    "insert_text"). Only used by ``TypingKeyboard``, the async keyboard always presses through the locator.
+    ``layout``: The name of the keyboard layout registered on ``LAYOUTS`` ("us" or "azerty").
+    ``lesson_deadline``: Seconds a lesson has to complete before its retries are aborted, 0 disables it.
+    ``target_wpm``: Rate in words per minute the keystrokes are scheduled at, 0 sends them as fast as possible and
+    only applies the typing delay as the hold time of every key.
+    ``adaptive_pacing``: Starts at ``target_wpm`` and searches the highest rate accepted by the page.
+    ``lookahead``: Types the whole remaining exercise text read from the page at once instead of one active key per
+    page read, the active keys are still used when the page disagrees with the text or the text is not in the page
+    (``TypingLessonLocators.LETTER``). Only used by ``TypingKeyboard``.
+    """
+    event_driven: bool = False
+    dispatch_backend: str = "locator"
+    layout: str = US_QWERTY.name
+    lesson_deadline: float = 600.0
+    target_wpm: float = 0.0
+    adaptive_pacing: bool = False
+    lookahead: bool = False
+
+    @classmethod
+    def from_config(cls, config:"ConfigLoader.ConfigFile") -> "KeyboardSettings":
         """
-        Represents the typing keyboard of the lessons.
-        :param typing_page: The typing page pointing to the exercise url.
+        Builds the keyboard settings from the config file.
+        :param config: The loaded config file.
+        :return:
         """
-        self._typing_page = typing_page
+        dispatch_backend = config.dispatch_backend
+        if dispatch_backend not in DISPATCH_BACKENDS:
+            # e.g: the removed "cdp" backend saved by an older version
+            logger.warning(f"The dispatch backend: {dispatch_backend} is not available anymore, using: {cls.dispatch_backend}")
+            dispatch_backend = cls.dispatch_backend
+        return cls(config.event_driven, dispatch_backend, config.keyboard_layout, config.lesson_deadline,
+                   config.target_wpm, config.adaptive_pacing, config.lookahead)
 
-    @staticmethod
-    def _extract_key_labels(active_keys_locator: Locator) -> Optional[list[list[str]]]:
-        """
-        Helper method that extract every active key on the typing website
-        And returns them as a list of lists containing the raw keyboard key representation.
 
-        Example:
-            html keyboard keys:
+@dataclass(frozen=True)
+class ExerciseSnapshot:
+    """
+    The state of the exercise page read in a single round trip.
 
-                [SHIFT] KEY:
-                <div class="keyboard-key ...">
-                  <div class="key-label">
-                    <span class="key-label--0">Shift</span>
-                    <span class="key-label--1">⇧</span>
-                  </div>
-                </div>
+    ``active_keys`` holds the raw labels of every active keyboard key, e.g: [["Shift", "⇧"], ["Z"]]
+    and is ``None`` if no active key contains a label.
+    ``typed`` is the number of letters of the exercise text already typed.
+    ``remaining`` is the exercise text not typed yet, ``None`` if the text is not in the page.
+    """
+    is_complete: bool
+    has_next_button: bool
+    main_key: Optional[str]
+    active_keys: Optional[list[list[str]]]
+    url: str
+    typed: int = 0
+    remaining: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data:dict) -> "ExerciseSnapshot":
+        """
+        Builds the snapshot from the object returned by ``EXERCISE_SNAPSHOT_SCRIPT``.
+        :param data: The evaluated script result.
+        :return:
+        """
+        active_keys = data["active_keys"]
+        return cls(
+            is_complete=data["is_complete"],
+            has_next_button=data["has_next_button"],
+            main_key=data["main_key"],
+            active_keys=active_keys if any(active_keys) else None,
+            url=data["url"],
+            typed=data.get("typed", 0),
+            remaining=data.get("remaining"),
+        )
 
-                [Z] KEY:
-                <div class="keyboard-key ...">
-                  <div class="key-label">z</div>
-                </div>
 
-            This method extract the string inside the spans and convert them into a list like ["Shift", "⇧"]
-            and the string inside the key-label div is converted into: ["Z"] and append both list into a single list
-            outputting something like this: [["Shift", "⇧"], ["Z"]]
+def _on_exercise_changed(source:dict, data:dict, sequence:int):
+    """
+    Binding called by the exercise observer of a page.
+    :param source: The binding source containing the page that called it.
+    :param data: The evaluated snapshot.
+    :param sequence: The number of changes reported by the observer so far.
+    :return:
+    """
+    keyboard = _observed_pages.get(source["page"])
+    if keyboard is not None:
+        keyboard._observed_snapshot = ExerciseSnapshot.from_dict(data)
+        keyboard._observed_sequence = sequence
+
 
-        :param active_keys_locator: The playwright locator containing the list of divs of class "keyboard-key"
-        :return:
+class TypingKeyboard:
+    def __init__(self, typing_page:Page, settings:Optional[KeyboardSettings]=None):
+        """
+        Represents the typing keyboard of the lessons.
+        :param typing_page: The typing page pointing to the exercise url.
+        :param settings: The keyboard options, defaults to ``KeyboardSettings()``
         """
-        raw_keys: list[list[str]] = []
-        # Iterates through the list of divs containing the keyboard key characters
-        for key in active_keys_locator.all():
-            keys = []
-
-            # Iterates over every character inside the keyboard key.
-            for characters in key.locator(TypingLessonLocators.KEY_LABEL).all():
-                # checks if there are spans inside the keyboard key and extract each character.
-                # If no spans are found then it will extract every string inside the divs with the class "keyboard-key"
-                # In any case the resulting characters will be appended into a list like this: ["main key", "secondary"]
-                inner_keys = characters.locator("span")
-                if locator_exists(inner_keys):
-                    keys.extend(
-                        character.inner_text() for character in inner_keys.all())
-                else:
-                    keys.extend(
-                        character.inner_text() for character in characters.all())
-            raw_keys.append(keys)
-
-        out_keys = raw_keys if any(inner_list for inner_list in raw_keys) else None
-        return out_keys
+        self._typing_page = typing_page
+        self._settings = settings or KeyboardSettings()
+        self._event_driven = self._settings.event_driven
+        self._layout:KeyboardLayout = get_layout(self._settings.layout)
+        self._dispatcher:KeyDispatcher = get_dispatcher(self._settings.dispatch_backend, typing_page)
+        self._pacer:Optional[Pacer] = get_pacer(self._settings.target_wpm, self._settings.adaptive_pacing)
+        self._observed_snapshot:Optional[ExerciseSnapshot] = None
+        self._observed_sequence:int = 0
+        self._keystrokes:int = 0
+        self._exercises:int = 0
+        # The exercise being typed, counted from the first typed exercise of the lesson.
+        self._exercise:int = 1
+        self._next_button_shown:bool = False
 
     @staticmethod
-    def _process_raw_keys(raw_keys:list[list[str]]) -> list[KeyboardKey]:
+    def _process_raw_keys(raw_keys:list[list[str]], layout:KeyboardLayout=US_QWERTY) -> list[KeyboardKey]:
         """
         Helper method used to process the list of raw keys [[str, str], [str, str] [...]] and convert them
         into a list of ``KeyboardKey`` objects.
         :param raw_keys: A list of lists containing strings representing a character of a keyboard key. e.g: [["Shift", "⇧"], ["A"]]
+        :param layout: The keyboard layout used to resolve the typed characters.
         :return:
         """
 
@@ -211,7 +356,7 @@ class TypingKeyboard:
                 # [idx=0 ,idx=1]                   [idx=0 ,idx=1] <- index on the list
                 # [shift,  [⇧]] [][][][][][][][][] [[⇧],   shift] <- Keyboard representation
                 #
-                main_key = key_group[1] if not _is_special_key(key_group[0]) else key_group[0]
+                main_key = key_group[1] if not layout.is_special(key_group[0]) else key_group[0]
                 secondary_key = key_group[0]
 
             elif len(key_group) == 1:
@@ -222,7 +367,7 @@ class TypingKeyboard:
                 main_key = key_group[0]
 
 
-            processed_keys.append(KeyboardKey(main_key=main_key, secondary_key=secondary_key))
+            processed_keys.append(KeyboardKey.get(main_key, secondary_key, layout=layout))
         return processed_keys
 
     @staticmethod
@@ -236,29 +381,59 @@ class TypingKeyboard:
         """
 
         # Check if Shift or CapsLock is active
-        shift_active = any(key.main_key.lower() in {"shift", "capslock"} for key in keys)
+        shift_active = any(key.main_key.lower() in SHIFT_KEYS for key in keys)
 
         if shift_active:
             # Remove Shift and CapsLock keys from the list
-            keys = [key for key in keys if key.main_key.lower() not in {"shift", "capslock"}]
-            for key in keys:
-                key.shift = True  # Apply shift effect to remaining keys
+            # Apply shift effect to remaining keys
+            keys = [key.with_shift() for key in keys if key.main_key.lower() not in SHIFT_KEYS]
 
         return keys
 
-    @retries()
     def _type(self, keys: list[KeyboardKey], delay:float):
         """
         Presses a list of Keyboard keys on the typing exercise.
+        A failed attempt is retried from the first key that was not sent, the sent keys are not typed again.
         :param keys: A list of ``KeyboardKeys``
         :return:
         """
+        self._type_remaining(keys, delay, self._keystrokes)
+
+    @retries(policy=ACTION_POLICY)
+    def _type_remaining(self, keys: list[KeyboardKey], delay:float, first:int):
+        """
+        Presses the keys that were not sent since the keystroke count was ``first``.
+        :param keys: A list of ``KeyboardKeys``
+        :param delay: The keyboard delay in milliseconds.
+        :param first: The keystroke count before the first attempt.
+        :return:
+        """
         self._typing_page.wait_for_load_state("load")
-        page = self._typing_page.locator("html")
+        self._send(keys[self._keystrokes - first:], delay)
+
+    def _send(self, keys: list[KeyboardKey], delay:float):
+        """
+        Sends the keys through the dispatcher at the pace of the keyboard.
+        :param keys: A list of ``KeyboardKeys``
+        :param delay: The keyboard delay in milliseconds.
+        :return:
+        """
+        if self._pacer is None:
+            try:
+                self._dispatcher.type(keys, delay)
+            finally:
+                self._keystrokes += self._dispatcher.sent
+                KEYSTROKES.inc(self._dispatcher.sent)
+            return
+
+        hold_time = self._pacer.hold_time(delay)
         for key in keys:
-            page.press(key.key, delay=delay)
+            pause(self._typing_page, self._pacer.delay())
+            self._dispatcher.press(key, hold_time)
+            self._keystrokes += 1
+            KEYSTROKES.inc()
 
-    @retries()
+    @retries(policy=ACTION_POLICY)
     def _press(self, key:KeyboardKey):
         """
         Presses a single ``KeyboardKey`` into the typing exercise.
@@ -266,71 +441,141 @@ class TypingKeyboard:
         :return:
         """
         self._typing_page.wait_for_load_state("load")
-        page = self._typing_page.locator("html")
-        page.press(key.key)
+        self._dispatcher.press(key)
+        self._keystrokes += 1
+        KEYSTROKES.inc()
 
-    @retries()
-    def _get_exercise_main_key(self) -> Optional[KeyboardKey]:
+    @retries(policy=PROBE_POLICY)
+    def get_snapshot(self) -> ExerciseSnapshot:
         """
-        Returns the exercise's main key (if exists)
+        Returns the current state of the exercise page using a single ``evaluate`` call.
 
-        The main key is the one that appears first at the beginning of every exercise.
-        It looks something like this:
-            "Press the key [A] on your keyboard" <- [A] is the main key.
+        The active keys labels are extracted the same way as they are shown on the keyboard.
+        Example:
+            html keyboard keys:
+
+                [SHIFT] KEY:
+                <div class="keyboard-key ...">
+                  <div class="key-label">
+                    <span class="key-label--0">Shift</span>
+                    <span class="key-label--1">⇧</span>
+                  </div>
+                </div>
+
+                [Z] KEY:
+                <div class="keyboard-key ...">
+                  <div class="key-label">z</div>
+                </div>
+
+            The strings inside the spans are converted into a list like ["Shift", "⇧"]
+            and the string inside the key-label div is converted into: ["z"], outputting: [["Shift", "⇧"], ["z"]]
         :return:
         """
         self._typing_page.wait_for_load_state("load")
-        main_key = self._typing_page.get_by_role(TypingLessonLocators.MAIN_KEY_CONTAINER_ROLE).locator(TypingLessonLocators.KEY_LABEL)
-        result:Optional[KeyboardKey] = None
+        with PROBE_LATENCY.time(probe="snapshot"):
+            return ExerciseSnapshot.from_dict(self._typing_page.evaluate(EXERCISE_SNAPSHOT_SCRIPT, _SNAPSHOT_LOCATORS))
 
-        if locator_exists(main_key):
-            result = KeyboardKey(main_key=main_key.inner_text(), secondary_key=None)
+    def _observe(self):
+        """
+        Injects the exercise observer into the typing page and routes its snapshots to this keyboard.
+        :return:
+        """
+        if self._typing_page not in _observed_pages:
+            self._typing_page.expose_binding(OBSERVER_BINDING, _on_exercise_changed)
+        _observed_pages[self._typing_page] = self
+        self._observed_snapshot = None
+        self._observed_sequence = 0
+        with PROBE_LATENCY.time(probe="observe"):
+            self._typing_page.evaluate(EXERCISE_OBSERVER_SCRIPT, {"binding": OBSERVER_BINDING, "locators": _SNAPSHOT_LOCATORS})
+
+    def _wait_for_change(self, sequence:int) -> ExerciseSnapshot:
+        """
+        Waits until the observer reports a change newer than ``sequence``.
+        If nothing is reported in ``OBSERVER_TIMEOUT`` (e.g: the document was reloaded) the observer is
+        injected again and the page is read directly.
+        :param sequence: The observer sequence number before the last actions were performed.
+        :return:
+        """
+        deadline = time.monotonic() + OBSERVER_TIMEOUT / 1000
+        while time.monotonic() < deadline:
+            if self._observed_sequence > sequence:
+                return self._observed_snapshot
+            # Blocking on playwright lets it dispatch the binding calls.
+            self._typing_page.wait_for_timeout(OBSERVER_POLL_INTERVAL)
 
-        return result
+        self._observe()
+        return self.get_snapshot()
 
-    @retries()
-    def _is_lesson_complete(self) -> bool:
+    def _get_active_keys(self, snapshot:ExerciseSnapshot) -> Optional[list[KeyboardKey]]:
         """
-        Returns ``True`` if the end of the lesson is reached.
+        Returns the active keys of the snapshot as ``KeyboardKey`` objects if exists.
+        :param snapshot: The exercise snapshot.
         :return:
         """
-        self._typing_page.wait_for_load_state("load")
-        return locator_exists(self._typing_page.locator(TypingLessonLocators.BADGE))
+        if not snapshot.active_keys:
+            return None
+
+        keyboard_keys: list[KeyboardKey] = self._process_raw_keys(snapshot.active_keys, self._layout)
+        return self._apply_shift_effect(keyboard_keys)
 
-    @retries()
-    def _get_active_keys(self) -> Optional[list[KeyboardKey]]:
+    def _get_lookahead_keys(self, snapshot:ExerciseSnapshot) -> Optional[list[KeyboardKey]]:
         """
-        Returns the active keys on the typing keyboard if exists.
+        Returns the keys typing the remaining exercise text of the snapshot,
+        ``None`` if there is no text or its next character is not the active key of the page.
+        :param snapshot: The exercise snapshot.
         :return:
         """
-        # Locate all active keys
-        self._typing_page.wait_for_load_state("load")
-        active_keys = (self._typing_page.locator(TypingLessonLocators.KEYBOARD_CONTAINER)
-                       .locator(TypingLessonLocators.ACTIVE_KEY))
+        if not snapshot.remaining:
+            return None
 
-        if not locator_exists(active_keys):
-            return
-        raw_keys = self._extract_key_labels(active_keys)
-        if not raw_keys:
+        keys = [KeyboardKey.from_character(character, self._layout) for character in snapshot.remaining]
+        active_keys = self._get_active_keys(snapshot)
+        if active_keys and keys[0].key not in {key.key for key in active_keys}:
             return None
+        return keys
 
-        keyboard_keys: list[KeyboardKey] = self._process_raw_keys(raw_keys)
-        return self._apply_shift_effect(keyboard_keys)
+    def _stream(self, keys:list[KeyboardKey], delay:float, expected_typed:int) -> bool:
+        """
+        Types the whole remaining exercise text and waits inside the page until it's accepted.
+        Not retried, typing the text twice would only produce wrong letters.
+        :param keys: The keys of the remaining text.
+        :param delay: The keyboard delay in milliseconds.
+        :param expected_typed: The number of typed letters once the text is accepted.
+        :return: ``False`` if the page didn't accept the text in time.
+        """
+        try:
+            self._send(keys, delay)
+            self._typing_page.wait_for_function(LOOKAHEAD_SETTLED_SCRIPT, arg={**_SETTLED_LOCATORS, "expected": expected_typed},
+                                                timeout=LOOKAHEAD_SETTLE_TIMEOUT)
+            return True
+        except playwright.sync_api.TimeoutError:
+            logger.info("The page didn't accept the exercise text, typing the active keys instead")
+            return False
+
+    def _complete_exercise(self):
+        self._exercises += 1
+        EXERCISES.inc()
 
-    @retries()
-    def _get_next_exercise_button(self) -> Optional[Locator]:
+    @staticmethod
+    def _record_progress(pacer:Pacer, previous:ExerciseSnapshot, snapshot:ExerciseSnapshot):
         """
-        Returns the "Continue" button of the typing page if exists.
+        Reports to the pacer whether the keys typed on ``previous`` were accepted by the page.
+        The progress is only measured inside an exercise. The keys are accepted if the active keys moved on,
+        or if more letters are typed when the exercise text is in the page (the active keys stay the same
+        on a repeated letter).
+        :param pacer: The keyboard pacer.
+        :param previous: The snapshot the keys were typed on.
+        :param snapshot: The snapshot read after typing them.
         :return:
         """
-        self._typing_page.wait_for_load_state("load")
-        button:Locator = self._typing_page.locator(TypingLessonLocators.NEXT_EXERCISE_BUTTON)
-
-        if locator_exists(button):
-            return button
-        return None
+        if snapshot.is_complete or snapshot.has_next_button or snapshot.main_key or previous.main_key:
+            return
+        if snapshot.remaining is None:
+            _warn_once("The exercise text was not found in the page (see ``TypingLessonLocators.LETTER``), "
+                       "the adaptive pacing only sees the active keys and might slow down on repeated letters")
+        pacer.record(snapshot.active_keys != previous.active_keys or snapshot.typed > previous.typed)
 
-    @retries()
+    @retries(policy=PROBE_POLICY)
     def _get_next_lesson_button(self) -> Optional[Locator]:
         """
         Returns the "Continue to next lesson" button at the end of the lesson if exists.
@@ -342,7 +587,7 @@ class TypingKeyboard:
 
         return None
 
-    @retries()
+    @retries(policy=NAVIGATION_POLICY)
     def _go_back_to_lessons(self):
         """
         Returns to the lessons dashboard.
@@ -351,39 +596,138 @@ class TypingKeyboard:
         self._typing_page.goto(TYPING_URL)
         self._typing_page.wait_for_load_state()
 
-    @retries
-    def _get_lesson_achievement_button(self) -> Optional[Locator]:
-        # TODO: This must return the goal button "Continue" when the goal screens appears
-        ...
-
-    @retries()
-    def start_typing(self, delay:float):
+    def start_typing(self, delay:float, on_exercise_complete:Optional[Callable[[int], None]]=None):
         """
         Waits for the lesson page to load before starting to type until the end of the lesson is found.
+        :param delay: The delay of the keyboard in milliseconds.
+        :param on_exercise_complete: Called with the 1-based number (counted from the first typed exercise) of every
+        exercise once it's completed.
         :raises playwright.sync_api.TimeOutError, playwright.sync_api.Error:
         :return:
         """
+        self._exercise = 1
+        self._next_button_shown = False
+        self._type_lesson(delay, on_exercise_complete)
+
+    # Not retried, the actions and probes of the loop have their own policies and a retried loop would multiply them.
+    def _type_lesson(self, delay:float, on_exercise_complete:Optional[Callable[[int], None]]):
         # we assume that the keyboard is started on the exercise page
-        self._typing_page.wait_for_load_state("load")
+        install_overlay_handlers(self._typing_page)
+        with TRACER.span("wait load", "wait"):
+            self._typing_page.wait_for_load_state("load")
         exercise_page_url = self._typing_page.url
-        while not self._is_lesson_complete():
-            # Gets each element after every loop
-            self._typing_page.wait_for_load_state("networkidle")
-            next_exercise_button = self._get_next_exercise_button()
-            exercise_main_key = self._get_exercise_main_key()
-            exercise_active_keys = self._get_active_keys()
-
-            # checks if the current url is the same as the exercise page.
-            if self._typing_page.url != exercise_page_url:
-                message = f"URL: {exercise_page_url} changed while performing an exercise."
-                raise URLChangedError(message)
-            if next_exercise_button:
-                next_exercise_button.wait_for(timeout=30000.0)
-                next_exercise_button.click(force=True)
-            if exercise_main_key:
-                self._press(exercise_main_key)
-                self._press(KeyboardKey(main_key=_get_special_key("Enter"), secondary_key=None))
-            if exercise_active_keys:
-                self._type(exercise_active_keys, delay)
-
-        self._go_back_to_lessons()
+        if self._event_driven:
+            with TRACER.span("observe", "probe"):
+                self._observe()
+        else:
+            with TRACER.span("wait networkidle", "wait"):
+                self._typing_page.wait_for_load_state("networkidle")
+        with TRACER.span("snapshot", "probe"):
+            snapshot = self.get_snapshot()
+
+        lookahead = self._settings.lookahead
+        with log_context(exercise=self._exercise):
+            TRACER.begin("exercise", "exercise", number=self._exercise)
+            try:
+                while not snapshot.is_complete:
+                    sequence = self._observed_sequence
+
+                    # checks if the current url is the same as the exercise page.
+                    if snapshot.url != exercise_page_url:
+                        message = f"URL: {exercise_page_url} changed while performing an exercise."
+                        raise URLChangedError(message)
+                    if snapshot.has_next_button and not self._next_button_shown:
+                        # The button can still be shown after the click, the exercise is only counted once.
+                        self._next_button_shown = True
+                        if self._pacer is not None:
+                            self._pacer.lift_ceiling()
+                        TRACER.end()
+                        self._complete_exercise()
+                        if on_exercise_complete is not None:
+                            on_exercise_complete(self._exercise)
+                        self._exercise += 1
+                        lookahead = self._settings.lookahead
+                        update_log_context(exercise=self._exercise)
+                        typing_logger.debug("Exercise %d completed", self._exercise - 1)
+                        TRACER.begin("exercise", "exercise", number=self._exercise)
+                    elif not snapshot.has_next_button:
+                        self._next_button_shown = False
+                    if snapshot.has_next_button:
+                        with TRACER.span("continue button", "input"):
+                            next_exercise_button = self._typing_page.locator(TypingLessonLocators.NEXT_EXERCISE_BUTTON)
+                            next_exercise_button.wait_for(timeout=30000.0)
+                            next_exercise_button.click(force=True)
+                    if snapshot.main_key:
+                        with TRACER.span("main key", "input", key=snapshot.main_key):
+                            self._press(KeyboardKey.get(snapshot.main_key, layout=self._layout))
+                            self._press(ENTER_KEY)
+                    elif lookahead and not snapshot.has_next_button and snapshot.remaining is None:
+                        _warn_once("The exercise text was not found in the page (see ``TypingLessonLocators.LETTER``), "
+                                   "typing the active keys instead of the whole text")
+                        lookahead = False
+                    elif lookahead and not snapshot.has_next_button:
+                        lookahead_keys = self._get_lookahead_keys(snapshot)
+                        if lookahead_keys:
+                            typing_logger.debug("Streaming %d keys", len(lookahead_keys), extra={"typed": snapshot.typed})
+                            previous = snapshot
+                            with TRACER.span("stream text", "input", keys=len(lookahead_keys)):
+                                lookahead = self._stream(lookahead_keys, delay, snapshot.typed + len(lookahead_keys))
+                            with TRACER.span("snapshot", "probe"):
+                                snapshot = self.get_snapshot()
+                            if self._pacer is not None:
+                                self._record_progress(self._pacer, previous, snapshot)
+                            continue
+                    exercise_active_keys = self._get_active_keys(snapshot)
+                    if exercise_active_keys:
+                        typing_logger.debug("Typing %s", exercise_active_keys, extra={"typed": snapshot.typed})
+                        with TRACER.span("type keys", "input", keys=len(exercise_active_keys)):
+                            self._type(exercise_active_keys, delay)
+
+                    # Reads the whole exercise state after every loop
+                    previous = snapshot
+                    if self._event_driven:
+                        with TRACER.span("wait for change", "wait"):
+                            snapshot = self._wait_for_change(sequence)
+                    else:
+                        with TRACER.span("wait networkidle", "wait"):
+                            self._typing_page.wait_for_load_state("networkidle")
+                        with TRACER.span("snapshot", "probe"):
+                            snapshot = self.get_snapshot()
+                    if exercise_active_keys and snapshot == previous:
+                        # Nothing reacted to the keystrokes, an overlay might be covering the exercise.
+                        typing_logger.debug("The page didn't react to %s", exercise_active_keys)
+                        with TRACER.span("dismiss overlays", "probe"):
+                            dismiss_overlays(self._typing_page)
+                    if self._pacer is not None and exercise_active_keys:
+                        self._record_progress(self._pacer, previous, snapshot)
+            finally:
+                TRACER.end()
+        self._complete_exercise()
+        if on_exercise_complete is not None:
+            on_exercise_complete(self._exercise)
+
+        if self._event_driven:
+            # The binding stays exposed on the page, the next keyboard will take it over.
+            _observed_pages[self._typing_page] = None
+        with TRACER.span("go back to lessons", "navigation"):
+            self._go_back_to_lessons()
+
+    @property
+    def settings(self) -> KeyboardSettings:
+        return self._settings
+
+    @property
+    def keystrokes(self) -> int:
+        """
+        Returns the number of keystrokes sent since the keyboard was created.
+        :return:
+        """
+        return self._keystrokes
+
+    @property
+    def exercises(self) -> int:
+        """
+        Returns the number of exercises completed since the keyboard was created.
+        :return:
+        """
+        return self._exercises
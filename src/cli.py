@@ -0,0 +1,231 @@
+"""
+Non-interactive command line of the Autotyper, for scripts.
+
+Usage:
+    ``python main.py run --category Beginner --lessons 1-20 --skip-complete``
+    ``python main.py run --category Beginner --lessons "1,3-5,Shift Keys" --output summary.json``
+    ``python main.py run --category Beginner --journal progress.jsonl`` (run it again after a crash to resume)
+
+``run`` queues the selected lessons, types them back to back and prints a JSON summary:
+``{"category": ..., "duration": ..., "keystrokes": ..., "completed": ..., "failed": ..., "lessons": [...], ...}``
+
+Exit status: 0 if every lesson was completed, 1 if a lesson failed, 2 if the lessons could not be started.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from logging import getLogger
+from pathlib import Path
+from typing import Optional, Any
+import playwright.sync_api
+from src.autotyper.autotyper import Autotyper
+from src.autotyper.catalog_cache import CatalogCache
+from src.autotyper.lesson import Lesson, LessonResult, LessonState, select_lessons
+from src.autotyper.overlays import OVERLAY_METRICS
+from src.autotyper.progress_journal import ProgressJournal
+from src.autotyper.typing_keyboard import KeyboardSettings
+from src.core.browser_endpoint import BrowserEndpoint
+from src.core.browser_pool import BrowserPool
+from src.core.config_loader import ConfigLoader
+from src.core.errors import AutotyperError, DefaultBrowserNotFoundError
+from src.utils.browser_discovery import resolve_browser_path
+from src.utils.instrumentation import INSTRUMENTATION
+from src.utils.logutil import setup_logging, LoggingSettings
+from src.utils.metrics import METRICS
+from src.utils.resource_filter import ResourceFilter
+from src.utils.tracing import TRACER
+
+logger = getLogger("autotyper")
+
+EXIT_OK = 0
+EXIT_LESSON_FAILED = 1
+EXIT_NOT_STARTED = 2
+
+
+def _progress(message:str):
+    print(message, file=sys.stderr, flush=True)
+
+
+def run_queue(typer:Autotyper, lessons:list[Lesson], concurrency:int = 1, fail_fast:bool = False,
+              journal:Optional[ProgressJournal] = None) -> tuple[list[LessonResult], list[Lesson]]:
+    """
+    Runs the queued lessons back to back, reporting every finished lesson on stderr.
+    :param typer: A connected Autotyper.
+    :param lessons: The lessons to run, in order.
+    :param concurrency: The number of tabs working at the same time, the queue is run on concurrent tabs if > 1
+    or if the Autotyper has a browser pool.
+    :param fail_fast: Stops at the first failed lesson. Ignored when the queue is run on concurrent tabs.
+    :param journal: Resumes the lessons from the journal and records their progress, ``None`` to start them over.
+    :return: The results and the lessons left in the queue.
+    """
+    queue = deque(lessons)
+    if concurrency > 1 or typer.browser_pool is not None:
+        results = typer.run_lessons(queue, concurrency, journal)
+        for result in results:
+            _progress(f"{'done' if result.succeeded else 'failed'}: {result.title} ({result.duration:.1f}s)")
+        return results, []
+
+    results:list[LessonResult] = []
+    while queue:
+        lesson = queue.popleft()
+        result = typer.run_lessons([lesson], journal=journal)[0]
+        results.append(result)
+        _progress(f"[{len(results)}/{len(lessons)}] {'done' if result.succeeded else 'failed'}: {result.title} "
+                  f"({result.duration:.1f}s, {result.keystrokes} keystrokes)")
+        if fail_fast and not result.succeeded:
+            break
+    return results, list(queue)
+
+
+def run_summary(category:str, results:list[LessonResult], skipped:list[Lesson], not_run:list[Lesson],
+                duration:float) -> dict[str, Any]:
+    """
+    Returns the json summary of a ``run`` command.
+    :param category: The category of the lessons.
+    :param results: The results of the lessons that were run.
+    :param skipped: The lessons skipped because they were already complete.
+    :param not_run: The lessons left in the queue after a failure.
+    :param duration: The wall time of the run in seconds.
+    :return:
+    """
+    keystrokes = sum(result.keystrokes for result in results)
+    return {
+        "category": category,
+        "duration": round(duration, 3),
+        "keystrokes": keystrokes,
+        "keystrokes_per_second": round(keystrokes / duration, 2) if duration > 0 else 0.0,
+        "completed": sum(result.succeeded for result in results),
+        "failed": sum(not result.succeeded for result in results),
+        "lessons": [result.to_dict() for result in results],
+        "skipped": [lesson.title for lesson in skipped],
+        "not_run": [lesson.title for lesson in not_run],
+        "overlays_dismissed": OVERLAY_METRICS.snapshot(),
+    }
+
+
+def _connect(config:ConfigLoader.ConfigFile, typing_delay:Optional[float], block_resources:bool) -> Autotyper:
+    """
+    Returns an Autotyper connected with the settings of the config file.
+    :param config: The loaded config file.
+    :param typing_delay: Overrides the typing delay of the config file, ``None`` to keep it.
+    :param block_resources: Blocks the images, fonts and trackers of the typing pages.
+    :raises DefaultBrowserNotFoundError, UserNotLoggedError, BrowserStartupError, playwright.sync_api.Error:
+    :return:
+    """
+    browser_path = resolve_browser_path(config.browser_path)
+    if browser_path is None:
+        raise DefaultBrowserNotFoundError()
+    if str(browser_path) != config.browser_path:
+        config.browser_path = str(browser_path)
+        ConfigLoader.update(config)
+
+    typer = Autotyper(CatalogCache(ttl=config.catalog_ttl), ResourceFilter() if block_resources else None,
+                      BrowserEndpoint.from_config(config))
+    typer.keyboard_settings = KeyboardSettings.from_config(config)
+    typer.start(browser_path, config.typing_delay if typing_delay is None else typing_delay)
+    return typer
+
+
+def run(arguments:argparse.Namespace) -> tuple[dict[str, Any], int]:
+    """
+    Runs the ``run`` command.
+    :param arguments: The parsed arguments.
+    :return: The json summary and the exit status.
+    """
+    config = ConfigLoader.load()
+    setup_logging(LoggingSettings.from_config(config, console_level="WARNING"))
+    if config.instrument_calls:
+        INSTRUMENTATION.enable()
+    if config.trace_file:
+        TRACER.enable(config.trace_file)
+    metrics_file = config.metrics_file if arguments.metrics_file is None else arguments.metrics_file
+    METRICS.start_export(metrics_file, config.metrics_port if arguments.metrics_port is None else arguments.metrics_port)
+    selection = [item.strip() for item in arguments.lessons.split(",") if item.strip()]
+    journal_file = config.journal_file if arguments.journal is None else arguments.journal
+    journal = ProgressJournal(journal_file) if journal_file else None
+
+    browsers = config.browser_pool_size if arguments.browsers is None else arguments.browsers
+    typer:Optional[Autotyper] = None
+    pool:Optional[BrowserPool] = None
+    try:
+        typer = _connect(config, arguments.delay, config.block_resources or arguments.block_resources)
+        if browsers > 0:
+            endpoint = BrowserEndpoint.from_config(config)
+            pool = BrowserPool(config.browser_path, browsers, endpoint.port + 1, endpoint.host)
+            _progress(f"Starting {browsers} pooled browser(s)")
+            pool.start()
+            typer.browser_pool = pool
+        lessons = select_lessons(typer.get_lessons(arguments.category), selection)
+        skipped = []
+        if arguments.skip_complete:
+            def is_complete(lesson:Lesson) -> bool:
+                return lesson.state == LessonState.COMPLETE or \
+                    (journal is not None and journal.is_lesson_complete(lesson.category, lesson.title))
+
+            skipped = [lesson for lesson in lessons if is_complete(lesson)]
+            lessons = [lesson for lesson in lessons if not is_complete(lesson)]
+
+        _progress(f"Running {len(lessons)} lesson(s) of {arguments.category}, {len(skipped)} already complete")
+        start_time = time.perf_counter()
+        results, not_run = run_queue(typer, lessons, arguments.concurrency, arguments.fail_fast, journal)
+        summary = run_summary(arguments.category, results, skipped, not_run, time.perf_counter() - start_time)
+        if typer.resource_filter is not None:
+            summary["resources"] = typer.resource_filter.stats.snapshot()
+    except (AutotyperError, playwright.sync_api.Error) as error:
+        logger.exception("The lessons could not be started")
+        return {"category": arguments.category, "error": f"{type(error).__name__}: {error}"}, EXIT_NOT_STARTED
+    finally:
+        if typer is not None:
+            typer.close()
+        if pool is not None:
+            pool.close()
+        METRICS.stop_export()
+        if metrics_file:
+            METRICS.write(metrics_file)
+
+    return summary, EXIT_LESSON_FAILED if summary["failed"] else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="autotyper", description="Runs typing lessons without the interactive menus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the lessons of a category and print a JSON summary")
+    run_parser.add_argument("--category", required=True, help="the lesson category. e.g: Beginner")
+    run_parser.add_argument("--lessons", default="",
+                            help="comma separated positions, ranges or titles. e.g: 1-20,25 (all by default)")
+    run_parser.add_argument("--skip-complete", action="store_true", help="skip the lessons that are already complete")
+    run_parser.add_argument("--fail-fast", action="store_true", help="stop at the first failed lesson")
+    run_parser.add_argument("--concurrency", type=int, default=1, help="the number of tabs typing at the same time")
+    run_parser.add_argument("--browsers", type=int, default=None,
+                            help="spread the lessons over this many extra browsers, each one with its own profile "
+                                 "(config file by default)")
+    run_parser.add_argument("--delay", type=float, default=None, help="the typing delay in ms (config file by default)")
+    run_parser.add_argument("--block-resources", action="store_true",
+                            help="block the images, fonts and trackers of the typing pages (config file by default)")
+    run_parser.add_argument("--journal", default=None,
+                            help="the progress journal used to resume the lessons (config file by default, \"\" disables it)")
+    run_parser.add_argument("--metrics-file", default=None,
+                            help="write the OpenMetrics text file while running (config file by default, \"\" disables it)")
+    run_parser.add_argument("--metrics-port", type=int, default=None,
+                            help="serve the metrics on http://127.0.0.1:<port>/metrics while running (config file by default)")
+    run_parser.add_argument("--output", type=Path, default=None, help="write the summary to a file instead of stdout")
+    return parser
+
+
+def main(argv:Optional[list[str]] = None) -> int:
+    """
+    Parses the arguments, runs the command and writes its JSON summary.
+    :param argv: The arguments, ``sys.argv[1:]`` by default.
+    :return: The exit status.
+    """
+    arguments = build_parser().parse_args(argv)
+    summary, status = run(arguments)
+
+    output = json.dumps(summary, indent=2, ensure_ascii=False)
+    if arguments.output is None:
+        print(output)
+    else:
+        arguments.output.write_text(output + "\n", encoding="utf-8")
+    return status
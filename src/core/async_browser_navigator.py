@@ -0,0 +1,170 @@
+import asyncio
+import subprocess
+from logging import getLogger
+from pathlib import Path
+from typing import Optional, Union
+import playwright.async_api
+from playwright.async_api import async_playwright, Playwright, Page, Browser, BrowserContext
+from src.core.browser_endpoint import BrowserEndpoint
+from src.core.constants import BROWSER_STARTUP_TIMEOUT
+from src.utils.browser_utils import wait_for_devtools, terminate_process
+from src.utils.resource_filter import ResourceFilter
+
+logger = getLogger("autotyper")
+
+
+class AsyncBrowserNavigator:
+    def __init__(self, resource_filter:Optional[ResourceFilter]=None, endpoint:Optional[BrowserEndpoint]=None):
+        """
+        A wrapper around the Playwright async Browser class.
+
+        Unlike ``BrowserNavigator`` the Playwright connection is started on ``setup`` since it must be awaited.
+        :param resource_filter: Blocks the unneeded requests of the active tab and the new tabs, ``None`` to load everything.
+        :param endpoint: The remote debugging endpoint of the browser, defaults to ``BrowserEndpoint()`` (localhost:9222)
+        """
+        self._endpoint: BrowserEndpoint = endpoint or BrowserEndpoint()
+        self._connection: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._active_window: Optional[BrowserContext] = None
+        self._active_tab: Optional[Page] = None
+        self._browser_process: Optional[subprocess.Popen] = None
+        self._resource_filter: Optional[ResourceFilter] = resource_filter
+        self._startup_time: Optional[float] = None
+
+    async def _connect(self):
+        """
+        Connects to the browser listening on the remote debugging endpoint.
+        :raises playwright.async_api.Error:
+        :return:
+        """
+        self._browser = await self._connection.chromium.connect_over_cdp(self._endpoint.url)
+        self._active_window = self._browser.contexts[0]
+        self._active_tab = await self._active_window.new_page() if not self._active_window.pages else self._active_window.pages[0]
+        if self._resource_filter is not None:
+            await self._resource_filter.attach_async(self._active_tab)
+
+    async def setup(self, browser_path: Union[str, Path] = ""):
+        """
+        Sets up or connects to a new browser session.
+        If no browser is listening on the remote debugging endpoint a new one is started (local endpoints only)
+        and the DevTools endpoint is polled until it answers.
+        :param browser_path: The path to the browser (optional)
+        :raises playwright.async_api.TimeoutError, playwright.async_api.Error, BrowserStartupError:
+        :return:
+        """
+        if self._connection is None:
+            self._connection = await async_playwright().start()
+
+        try:
+            await self._connect()
+
+        except playwright.async_api.Error:
+            if not self._endpoint.is_local:
+                raise
+            self._browser_process = self._endpoint.launch(browser_path)
+            self._startup_time = await asyncio.to_thread(wait_for_devtools, self._endpoint.url, BROWSER_STARTUP_TIMEOUT,
+                                                         self._browser_process)
+            logger.info(f"Browser started in {self._startup_time:.2f}s")
+            await self._connect()
+
+    async def close(self):
+        """
+        Closes the browser session.
+        The browser started by ``setup`` is shut down as well.
+        :return:
+        """
+        if self._browser:
+            await self._browser.close()
+        if self._connection:
+            await self._connection.stop()
+            self._connection = None
+        if self._browser_process is not None:
+            await asyncio.to_thread(terminate_process, self._browser_process)
+            self._browser_process = None
+
+    async def add_cookies(self, cookies:list[dict]):
+        """
+        Adds the cookies to the active window. e.g: the session of another browser.
+        :param cookies: The cookies, as returned by ``BrowserNavigator.cookies``
+        :return:
+        """
+        await self._active_window.add_cookies(cookies)
+
+    async def find_tab(self, value:str) -> Optional[int]:
+        """
+        Finds a tab from the current active window based on its url or page title.
+        Returns ``None`` if no tab was found.
+        :param value: The url or page title of the tab to search.
+        :return:
+        """
+        for index, page in enumerate(self._active_window.pages):
+            if page.url == value or await page.title() == value:
+                return index
+
+        return None
+
+    async def new_tab(self) -> int:
+        """
+        Creates a new tab for the active window and returns its index.
+
+        **NOTE**: The new tab is not automatically focused!
+        :return:
+        """
+        page = await self._active_window.new_page()
+        if self._resource_filter is not None:
+            await self._resource_filter.attach_async(page)
+        return self._active_window.pages.index(page)
+
+    @property
+    def active_tab(self) -> Page:
+        """
+        Returns the active tab
+        :return:
+        """
+        return self._active_tab
+
+    @active_tab.setter
+    def active_tab(self, tab_index: int):
+        """
+        Sets the new active tab.
+        :param tab_index: The index of the tab to set active.
+        :return:
+        """
+        self._active_tab = self._active_window.pages[tab_index]
+
+    @property
+    def endpoint(self) -> BrowserEndpoint:
+        return self._endpoint
+
+    @property
+    def startup_time(self) -> Optional[float]:
+        """
+        Returns the seconds the browser started by ``setup`` took to open its DevTools endpoint,
+        ``None`` if ``setup`` connected to a running browser.
+        :return:
+        """
+        return self._startup_time
+
+    @property
+    def active_window_tabs_count(self) -> int:
+        """
+        Returns the total opened tabs on the active window.
+        :return:
+        """
+        return len(self._active_window.pages)
+
+    @property
+    def windows_count(self) -> int:
+        """
+        Returns the total opened windows.
+        :return:
+        """
+        return len(self._browser.contexts)
+
+    @property
+    def active_window(self) -> BrowserContext:
+        """
+        Returns the current active window,
+        :return:
+        """
+        return self._active_window
@@ -0,0 +1,68 @@
+import subprocess
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union, Iterable, TYPE_CHECKING
+from src.core.constants import REMOTE_DEBUGGING_HOST, REMOTE_DEBUGGING_PORT
+
+if TYPE_CHECKING:
+    from src.core.config_loader import ConfigLoader
+
+# Hosts a browser can be started for, a browser on another machine can only be attached to.
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+@dataclass(frozen=True)
+class BrowserEndpoint:
+    """
+    The remote debugging endpoint of a browser driven through CDP.
+
+    ``host``, ``port``: Where the browser listens. e.g: "localhost", 9222
+    ``user_data_dir``: The profile directory of a started browser, "" for the default profile. A browser already
+    running with the same profile ignores the remote debugging port, every browser of a ``BrowserPool`` gets its own.
+    """
+    port: int = REMOTE_DEBUGGING_PORT
+    host: str = REMOTE_DEBUGGING_HOST
+    user_data_dir: str = ""
+
+    @classmethod
+    def from_config(cls, config:"ConfigLoader.ConfigFile") -> "BrowserEndpoint":
+        """
+        Builds the endpoint from the config file.
+        :param config: The loaded config file.
+        :return:
+        """
+        return cls(config.remote_debugging_port, config.remote_debugging_host)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def is_local(self) -> bool:
+        return self.host in LOCAL_HOSTS
+
+    def is_listening(self, timeout:float = 0.5) -> bool:
+        """
+        Returns ``True`` if a browser answers on the endpoint.
+        :param timeout: Seconds the browser has to answer.
+        :return:
+        """
+        try:
+            with urllib.request.urlopen(f"{self.url}/json/version", timeout=timeout) as response:
+                response.read()
+            return True
+        except OSError:
+            return False
+
+    def launch(self, browser_path:Union[str, Path], arguments:Iterable[str] = ()) -> subprocess.Popen:
+        """
+        Starts a browser listening on the endpoint, without waiting for it.
+        :param browser_path: The path to the browser.
+        :param arguments: Extra command line arguments. e.g: "--headless=new"
+        :return: The browser process.
+        """
+        command = [str(browser_path), "--disable-logging", f"--remote-debugging-port={self.port}"]
+        if self.user_data_dir:
+            command += [f"--user-data-dir={self.user_data_dir}", "--no-first-run", "--no-default-browser-check"]
+        return subprocess.Popen(command + list(arguments))
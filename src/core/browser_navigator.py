@@ -1,47 +1,90 @@
 import subprocess
-import time
+from logging import getLogger
 from pathlib import Path
 from typing import Optional, Union
 import playwright.sync_api
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from playwright.sync_api import sync_playwright, Playwright, Page, Browser, BrowserContext
+from src.core.browser_endpoint import BrowserEndpoint
+from src.core.constants import BROWSER_STARTUP_TIMEOUT
+from src.utils.browser_utils import wait_for_devtools, terminate_process
+from src.utils.resource_filter import ResourceFilter
+
+logger = getLogger("autotyper")
 
 
 class BrowserNavigator:
-    def __init__(self):
+    def __init__(self, resource_filter:Optional[ResourceFilter]=None, endpoint:Optional[BrowserEndpoint]=None):
         """
         A wrapper around the Playwright Browser class.
+        The Playwright connection is started on the first ``setup`` call.
+        :param resource_filter: Blocks the unneeded requests of the active tab, ``None`` to load everything.
+        :param endpoint: The remote debugging endpoint of the browser, defaults to ``BrowserEndpoint()`` (localhost:9222)
         """
-        self._connection = sync_playwright().start()
+        self._endpoint: BrowserEndpoint = endpoint or BrowserEndpoint()
+        self._connection: Optional[Playwright] = None
         self._browser: Optional[Browser] = None
         self._active_window: Optional[BrowserContext] = None
         self._active_tab: Optional[Page] = None
+        self._browser_process: Optional[subprocess.Popen] = None
+        self._startup_time: Optional[float] = None
+        self._resource_filter: Optional[ResourceFilter] = resource_filter
+
+    def _connect(self):
+        """
+        Connects to the browser listening on the remote debugging endpoint.
+        :raises playwright.sync_api.Error:
+        :return:
+        """
+        self._browser = self._connection.chromium.connect_over_cdp(self._endpoint.url)
+        self._active_window = self._browser.contexts[0]
+        self._active_tab = self._active_window.new_page() if not self.active_window.pages else self.active_window.pages[0]
+        if self._resource_filter is not None:
+            self._resource_filter.attach(self._active_tab)
 
     def setup(self, browser_path: Union[str, Path] = ""):
         """
-        Sets up or connects to a new browser session
+        Sets up or connects to a new browser session.
+        If no browser is listening on the remote debugging endpoint a new one is started (local endpoints only)
+        and the DevTools endpoint is polled until it answers.
         :param browser_path: The path to the browser (optional)
-        :raises playwright.sync_api.TimeoutError, playwright.sync_api.Error:
+        :raises playwright.sync_api.TimeoutError, playwright.sync_api.Error, BrowserStartupError:
         :return:
         """
+        if self._connection is None:
+            self._connection = sync_playwright().start()
+
         try:
-            self._browser = self._connection.chromium.connect_over_cdp("http://localhost:9222")
-            self._active_window = self._browser.contexts[0]
-            self._active_tab = self._active_window.new_page() if not self.active_window.pages else self.active_window.pages[0]
+            self._connect()
 
         except playwright.sync_api.Error:
-            subprocess.Popen([browser_path, "--disable-logging", "--remote-debugging-port=9222"])
-            time.sleep(4)
-            self._browser = self._connection.chromium.connect_over_cdp("http://localhost:9222")
-            self._active_window = self._browser.contexts[0]
-            self._active_tab = self._active_window.new_page() if not self.active_window.pages else self.active_window.pages[0]
+            if not self._endpoint.is_local:
+                raise
+            self._browser_process = self._endpoint.launch(browser_path)
+            self._startup_time = wait_for_devtools(self._endpoint.url, BROWSER_STARTUP_TIMEOUT, self._browser_process)
+            logger.info(f"Browser started in {self._startup_time:.2f}s")
+            self._connect()
 
     def close(self):
         """
-        Closes the browser session
+        Closes the browser session.
+        The browser started by ``setup`` is shut down as well.
         :return:
         """
-        self._browser.close()
-        self._connection.stop()
+        if self._browser:
+            self._browser.close()
+        if self._connection:
+            self._connection.stop()
+            self._connection = None
+        if self._browser_process is not None:
+            terminate_process(self._browser_process)
+            self._browser_process = None
+
+    def cookies(self) -> list[dict]:
+        """
+        Returns the cookies of the active window. e.g: to log in the browsers of a ``BrowserPool``
+        :return:
+        """
+        return self._active_window.cookies()
 
     def find_tab(self, value:str) -> Optional[int]:
         """
@@ -74,6 +117,18 @@ class BrowserNavigator:
         page = self._active_window.new_page()
         return self._active_window.pages.index(page)
 
+    def get_tab(self, tab_index:int) -> Page:
+        """
+        Returns a tab of the active window without making it the active tab. e.g: to type on several tabs at once.
+        Its requests are filtered like the ones of the active tab.
+        :param tab_index: The index of the tab.
+        :return:
+        """
+        page = self._active_window.pages[tab_index]
+        if self._resource_filter is not None:
+            self._resource_filter.attach(page)
+        return page
+
     @property
     def active_tab(self) -> Page:
         """
@@ -90,6 +145,21 @@ class BrowserNavigator:
         :return:
         """
         self._active_tab = self._active_window.pages[tab_index]
+        if self._resource_filter is not None:
+            self._resource_filter.attach(self._active_tab)
+
+    @property
+    def endpoint(self) -> BrowserEndpoint:
+        return self._endpoint
+
+    @property
+    def startup_time(self) -> Optional[float]:
+        """
+        Returns the seconds the browser started by ``setup`` took to open its DevTools endpoint,
+        ``None`` if ``setup`` connected to a running browser.
+        :return:
+        """
+        return self._startup_time
 
     @property
     def active_window_tabs_count(self) -> int:
@@ -0,0 +1,164 @@
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from typing import Optional, Union, Iterable
+from src.core.browser_endpoint import BrowserEndpoint
+from src.core.constants import REMOTE_DEBUGGING_HOST, REMOTE_DEBUGGING_PORT, BROWSER_STARTUP_TIMEOUT
+from src.core.errors import BrowserStartupError
+from src.utils.browser_utils import wait_for_devtools, terminate_process
+
+logger = getLogger("autotyper")
+
+
+class BrowserPool:
+    def __init__(self, browser_path:Union[str, Path], size:int, base_port:int = REMOTE_DEBUGGING_PORT + 1,
+                 host:str = REMOTE_DEBUGGING_HOST, user_data_root:Union[str, Path] = "", arguments:Iterable[str] = ()):
+        """
+        Browser processes listening on consecutive remote debugging ports, each one with its own profile.
+        Every browser has its own renderer processes, so the lessons typed on different browsers don't compete
+        for the same browser main thread.
+
+        The browsers already listening on a port of the pool are attached to instead of started, and are left running
+        by ``close``.
+        :param browser_path: The path to the browser.
+        :param size: The number of browsers.
+        :param base_port: The port of the first browser, the next ones use the following ports.
+        By default the pool starts after the port of the main browser.
+        :param host: The host of the browsers, only local browsers can be started.
+        :param user_data_root: The directory holding the profile of every browser, a temporary directory
+        (removed by ``close``) if empty. Reuse a directory to keep the sessions between runs.
+        :param arguments: Extra command line arguments of the started browsers. e.g: "--headless=new"
+        """
+        if size < 1:
+            raise ValueError("A browser pool needs at least one browser")
+        self._browser_path = browser_path
+        self._size = size
+        self._base_port = base_port
+        self._host = host
+        self._user_data_root:Optional[Path] = Path(user_data_root) if user_data_root else None
+        self._temporary_root:Optional[Path] = None
+        self._arguments = tuple(arguments)
+        self._endpoints:list[BrowserEndpoint] = []
+        self._processes:dict[BrowserEndpoint, subprocess.Popen] = {}
+        self._startup_times:dict[BrowserEndpoint, float] = {}
+        self._idle:queue.Queue[BrowserEndpoint] = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the browsers of the pool that are not running yet, all of them at once, and waits for their
+        DevTools endpoints.
+        :raises BrowserStartupError:
+        :return:
+        """
+        with self._lock:
+            if self._endpoints:
+                return
+            root = self._user_data_root
+            if root is None:
+                root = self._temporary_root = Path(tempfile.mkdtemp(prefix="autotyper-pool-"))
+
+            endpoints = [BrowserEndpoint(self._base_port + index, self._host, str(root / f"browser-{index}"))
+                         for index in range(self._size)]
+            try:
+                for endpoint in endpoints:
+                    if endpoint.is_listening():
+                        logger.info(f"Attaching to the browser running on {endpoint.url}")
+                        continue
+                    if not endpoint.is_local:
+                        raise BrowserStartupError(endpoint.url, "no browser is running on the remote host")
+                    self._processes[endpoint] = endpoint.launch(self._browser_path, self._arguments)
+
+                for endpoint, process in self._processes.items():
+                    self._startup_times[endpoint] = wait_for_devtools(endpoint.url, BROWSER_STARTUP_TIMEOUT, process)
+            except BaseException:
+                self._stop_processes()
+                raise
+
+            if self._processes:
+                logger.info(f"Started {len(self._processes)} browser(s) in {max(self._startup_times.values()):.2f}s")
+            self._endpoints = endpoints
+            for endpoint in endpoints:
+                self._idle.put(endpoint)
+
+    def acquire(self, timeout:Optional[float] = None) -> BrowserEndpoint:
+        """
+        Hands out the endpoint of an idle browser, waiting for one to be released.
+        :param timeout: Seconds to wait, ``None`` to wait forever.
+        :raises queue.Empty: If no browser was released in time.
+        :return:
+        """
+        return self._idle.get(timeout=timeout)
+
+    def release(self, endpoint:BrowserEndpoint):
+        """
+        Gives back an endpoint handed out by ``acquire``.
+        :param endpoint: The endpoint.
+        :return:
+        """
+        self._idle.put(endpoint)
+
+    @contextmanager
+    def lease(self, count:int):
+        """
+        Hands out the endpoints of up to ``count`` idle browsers (at least one) for the duration of the block.
+        :param count: The maximum number of browsers wanted.
+        :return:
+        """
+        endpoints = [self.acquire()]
+        while len(endpoints) < count:
+            try:
+                endpoints.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            yield endpoints
+        finally:
+            for endpoint in endpoints:
+                self.release(endpoint)
+
+    def _stop_processes(self):
+        for process in self._processes.values():
+            terminate_process(process)
+        self._processes.clear()
+
+    def close(self):
+        """
+        Stops the browsers started by the pool and removes its temporary profiles.
+        :return:
+        """
+        with self._lock:
+            self._stop_processes()
+            self._endpoints = []
+            self._idle = queue.Queue()
+            if self._temporary_root is not None:
+                shutil.rmtree(self._temporary_root, ignore_errors=True)
+                self._temporary_root = None
+
+    def __enter__(self) -> "BrowserPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def endpoints(self) -> list[BrowserEndpoint]:
+        return list(self._endpoints)
+
+    @property
+    def startup_times(self) -> dict[BrowserEndpoint, float]:
+        """
+        Returns the seconds every browser started by the pool took to open its DevTools endpoint.
+        :return:
+        """
+        return dict(self._startup_times)
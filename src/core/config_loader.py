@@ -1,5 +1,5 @@
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from typing import Optional
 
@@ -8,6 +8,28 @@ class ConfigLoader:
     class ConfigFile:
         browser_path: str = ""
         typing_delay: float = 120.0
+        target_wpm: float = 0.0
+        adaptive_pacing: bool = False
+        lookahead: bool = False
+        event_driven: bool = False
+        dispatch_backend: str = "locator"
+        keyboard_layout: str = "us"
+        catalog_ttl: float = 3600.0
+        block_resources: bool = False
+        lesson_deadline: float = 600.0
+        instrument_calls: bool = False
+        trace_file: str = ""
+        journal_file: str = ""
+        log_file: str = "autotyper.log"
+        log_level: str = "INFO"
+        log_max_bytes: int = 5 * 1024 * 1024
+        log_backup_count: int = 3
+        log_sampling: dict[str, float] = field(default_factory=dict)
+        metrics_file: str = ""
+        metrics_port: int = 0
+        remote_debugging_host: str = "localhost"
+        remote_debugging_port: int = 9222
+        browser_pool_size: int = 0
         first_time: bool = True
 
     _CONFIG_FILE_PATH:Path = Path("config.conf")
@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 
 SPECIAL_KEYS = {
@@ -9,7 +10,15 @@ SPECIAL_KEYS = {
     "↹": "Tab",
     "⌫": "BackSpace"
 }
-TYPING_URL = "https://www.typing.com/student/lessons"
+# The site root can be overridden (e.g: to point to the offline replica used by the benchmarks)
+TYPING_BASE_URL = os.environ.get("AUTOTYPER_BASE_URL", "https://www.typing.com").rstrip("/")
+TYPING_URL = f"{TYPING_BASE_URL}/student/lessons"
+# Default remote debugging endpoint of the browser driven through CDP, see ``remote_debugging_host``
+# and ``remote_debugging_port`` in the config file.
+REMOTE_DEBUGGING_HOST = "localhost"
+REMOTE_DEBUGGING_PORT = 9222
+# Seconds a spawned browser has to open its remote debugging endpoint
+BROWSER_STARTUP_TIMEOUT = 30.0
 
 
 @dataclass()
@@ -26,6 +35,9 @@ class TypingLocators:
     CARD_SURVEY_CONTAINER = "form[class='survey'] div.card--survey"
     ACHIEVEMENT_CONTAINER = ".growl-achievementOuterWrap"
     CONTAINERS_CLOSE_BUTTON = ".js-close"
+    # Goal screen shown over the lessons after a while of typing
+    GOAL_SCREEN_CONTAINER = "[role='dialog']:has-text('goal')"
+    GOAL_CONTINUE_BUTTON = "button:has-text('Continue')"
 
 
 class TypingLessonLocators:
@@ -35,4 +47,8 @@ class TypingLessonLocators:
     KEY_LABEL = ".key-label"
     ACTIVE_KEY = "div.keyboard-key.is-active"
     KEYBOARD_CONTAINER = "div.js-keyboard-holder"
-    BADGE = ".badge"
\ No newline at end of file
+    BADGE = ".badge"
+    # Letters of the exercise text already typed, used to check that the keystrokes are accepted.
+    TYPED_LETTER = ".screenBasic-letter.is-correct, .screenBasic-letter.is-wrong"
+    # Every letter of the exercise text, read at once by the lookahead typing.
+    LETTER = ".screenBasic-letter"
\ No newline at end of file
@@ -31,3 +31,32 @@ class DefaultBrowserNotFoundError(AutotyperError):
         super().__init__(message)
 
 
+class LessonNotAvailableError(AutotyperError):
+    def __init__(self, lesson_title:str):
+        message = f"The lesson: {lesson_title} doesn't have a start button (Premium lessons might not be available)"
+        super().__init__(message)
+
+
+class LessonNotFoundError(AutotyperError):
+    def __init__(self, selection:str, reason:str):
+        message = f"The lesson: {selection} was not found ({reason})"
+        super().__init__(message)
+
+
+class LessonDeadlineError(AutotyperError):
+    def __init__(self, operation:str):
+        message = f"The lesson deadline was exceeded while performing: {operation}"
+        super().__init__(message)
+
+class CircuitOpenError(AutotyperError):
+    def __init__(self, reason:str):
+        message = f"Stopped retrying browser operations: {reason}"
+        super().__init__(message)
+
+class BrowserStartupError(AutotyperError):
+    def __init__(self, endpoint:str, reason:str):
+        message = f"The browser did not open the remote debugging endpoint: {endpoint} ({reason})"
+        super().__init__(message)
+
+class DaemonError(AutotyperError):
+    pass
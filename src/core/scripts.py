@@ -0,0 +1,162 @@
+"""
+JavaScript sources evaluated inside the typing page.
+
+Every script receives the selectors it needs as its argument so ``constants.py`` remains the single
+place where the typing website locators are defined.
+"""
+
+# Reads the whole exercise state in a single round trip.
+# ``remaining`` is the text of the letters not typed yet, ``null`` if the exercise text is not in the page.
+# Receives: {badge, nextButton, mainKeyRole, keyLabel, keyboard, activeKey, typedLetter, letter}
+EXERCISE_SNAPSHOT_SCRIPT = """
+(locators) => {
+    const labelsOf = (key) => {
+        const labels = [];
+        for (const label of key.querySelectorAll(locators.keyLabel)) {
+            const spans = label.querySelectorAll("span");
+            if (spans.length > 0) {
+                for (const span of spans) labels.push(span.innerText);
+            } else {
+                labels.push(label.innerText);
+            }
+        }
+        return labels;
+    };
+
+    const mainKey = document.querySelector(`[role="${locators.mainKeyRole}"] ${locators.keyLabel}`);
+    const keyboard = document.querySelector(locators.keyboard);
+    const activeKeys = keyboard ? Array.from(keyboard.querySelectorAll(locators.activeKey), labelsOf) : [];
+    const letters = Array.from(document.querySelectorAll(locators.letter));
+
+    return {
+        is_complete: document.querySelector(locators.badge) !== null,
+        has_next_button: document.querySelector(locators.nextButton) !== null,
+        main_key: mainKey ? mainKey.innerText : null,
+        active_keys: activeKeys,
+        typed: document.querySelectorAll(locators.typedLetter).length,
+        remaining: letters.length > 0 ?
+            letters.filter((letter) => !letter.matches(locators.typedLetter)).map((letter) => letter.textContent).join("") :
+            null,
+        url: window.location.href,
+    };
+}
+"""
+
+# Resolves once the streamed exercise text is typed: ``expected`` letters are typed or the exercise ended.
+# Used with ``page.wait_for_function``, which polls it inside the page instead of one round trip per check.
+# Receives: {typedLetter, nextButton, badge, expected}
+LOOKAHEAD_SETTLED_SCRIPT = """
+(args) => document.querySelectorAll(args.typedLetter).length >= args.expected ||
+    document.querySelector(args.nextButton) !== null ||
+    document.querySelector(args.badge) !== null
+"""
+
+# Installs a MutationObserver that pushes a new exercise snapshot and its sequence number through
+# the exposed binding every time the watched elements change.
+# Installing it twice on the same document is a no-op.
+# Receives: {binding, locators} where ``locators`` are the ones of ``EXERCISE_SNAPSHOT_SCRIPT``
+EXERCISE_OBSERVER_SCRIPT = """
+(args) => {
+    if (window.__autotyperObserver) {
+        return;
+    }
+    const snapshot = """ + EXERCISE_SNAPSHOT_SCRIPT.strip() + """;
+    const watched = [
+        args.locators.keyboard,
+        `[role="${args.locators.mainKeyRole}"]`,
+        args.locators.nextButton,
+        args.locators.badge,
+    ].join(", ");
+    // A change inside a watched element (the element itself included), ancestors of a watched element don't count.
+    const isWatched = (node) => {
+        const element = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+        return element !== null && element.closest(watched) !== null;
+    };
+    // An added or removed subtree holding a watched element. e.g: the continue button inserted in its footer
+    const holdsWatched = (node) => node.nodeType === Node.ELEMENT_NODE && (node.matches(watched) || node.querySelector(watched) !== null);
+    const isRelevant = (record) => isWatched(record.target) ||
+        Array.from(record.addedNodes).some(holdsWatched) || Array.from(record.removedNodes).some(holdsWatched);
+
+    let sequence = 0;
+    let scheduled = false;
+    const push = () => {
+        scheduled = false;
+        sequence += 1;
+        window[args.binding](snapshot(args.locators), sequence);
+    };
+
+    window.__autotyperObserver = new MutationObserver((records) => {
+        if (scheduled || !records.some(isRelevant)) {
+            return;
+        }
+        scheduled = true;
+        queueMicrotask(push);
+    });
+    window.__autotyperObserver.observe(document.body, {
+        subtree: true,
+        childList: true,
+        characterData: true,
+        attributes: true,
+        attributeFilter: ["class"],
+    });
+}
+"""
+
+# Reads the button id and class of every lesson of the active category and the class of its exercises
+# in a single round trip.
+# Receives: {container, button, exercise}
+LESSON_STATES_SCRIPT = """
+(locators) => Array.from(document.querySelectorAll(locators.container), (container) => {
+    const button = container.querySelector(locators.button);
+    const exercises = Array.from(container.querySelectorAll(locators.exercise), (exercise) => exercise.className);
+    return button ? [button.dataset.id ?? null, button.className, exercises] : [null, null, exercises];
+})
+"""
+
+# Reads the data of a single lesson div. Shared by the dashboard scripts.
+_LESSON_DATA_FUNCTION = """
+(locators, container) => {
+    const title = container.querySelector(locators.title);
+    const button = container.querySelector(locators.button);
+    return {
+        title: title ? title.innerText : "",
+        button_id: button ? button.dataset.id ?? null : null,
+        button_class: button ? button.className : null,
+        exercises: Array.from(container.querySelectorAll(locators.exercise), (exercise) => ({
+            index: Number(exercise.dataset.displayOrder),
+            class: exercise.className,
+        })),
+    };
+}
+""".strip()
+
+# Reads every lesson of the active category and its exercises in a single round trip.
+# Receives: {container, title, button, exercise}
+DASHBOARD_SCRIPT = """
+(locators) => {
+    const lessonData = """ + _LESSON_DATA_FUNCTION + """;
+    return Array.from(document.querySelectorAll(locators.container), (container) => lessonData(locators, container));
+}
+"""
+
+# Reads the lessons with the given button ids, ``null`` for the ones that are not found.
+# Receives: {locators, ids} where ``locators`` are the ones of ``DASHBOARD_SCRIPT``
+LESSONS_BY_ID_SCRIPT = """
+(args) => {
+    const lessonData = """ + _LESSON_DATA_FUNCTION + """;
+    return args.ids.map((id) => {
+        const button = document.querySelector(`${args.locators.button}[data-id="${id}"]`);
+        const container = button ? button.closest(args.locators.container) : null;
+        return container ? lessonData(args.locators, container) : null;
+    });
+}
+"""
+
+# Reads the name of every category tab in a single round trip.
+# Receives: {tabList, tab} (ARIA roles)
+CATEGORIES_SCRIPT = """
+(roles) => Array.from(
+    document.querySelectorAll(`[role="${roles.tabList}"] [role="${roles.tab}"]`),
+    (tab) => tab.innerText.split("\\n\\n")[0],
+)
+"""
@@ -0,0 +1,136 @@
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+from logging import getLogger
+from pathlib import Path
+from typing import Optional, Union
+
+logger = getLogger("autotyper")
+
+# Executable names of the chromium based browsers looked up on the PATH, in order of preference.
+LINUX_BROWSER_NAMES = (
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "microsoft-edge", "microsoft-edge-stable",
+    "brave-browser", "vivaldi", "opera",
+)
+# Directories holding the .desktop files on Linux, the user ones first.
+_XDG_APPLICATION_DIRS = (
+    Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share")) / "applications",
+    *(Path(directory) / "applications" for directory in os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")),
+)
+
+
+def is_valid_browser_path(path:Union[str, Path, None]) -> bool:
+    """
+    Returns ``True`` if the path points to an executable file.
+    :param path: The browser path.
+    :return:
+    """
+    if not path:
+        return False
+    path = Path(path)
+    return path.is_file() and os.access(path, os.X_OK)
+
+
+def _get_windows_default_browser() -> Optional[Path]:
+    """
+    Retrieves the full executable path of the default browser from the Windows registry.
+    :return:
+    """
+    import winreg
+
+    try:
+        # Get the ProgId of the default browser
+        user_choice_key = r"Software\Microsoft\Windows\Shell\Associations\UrlAssociations\https\UserChoice"
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, user_choice_key) as key:
+            browser_name = winreg.QueryValueEx(key, "ProgId")[0]
+
+        # Get the browser executable path
+        command_key = rf"{browser_name}\shell\open\command"
+        with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, command_key) as key:
+            command = winreg.QueryValueEx(key, "")[0]
+
+        # Extract and clean the executable path
+        executable = command.split('"')[1] if '"' in command else command.split()[0]
+        return Path(executable)
+
+    except (FileNotFoundError, IndexError, winreg.error) as e:
+        logger.exception(f"Error retrieving default browser path: {e}")
+        return None
+
+
+def _desktop_file_executable(desktop_file:str) -> Optional[Path]:
+    """
+    Returns the executable launched by a .desktop file of the XDG application directories.
+    :param desktop_file: The .desktop file name. e.g: "google-chrome.desktop"
+    :return:
+    """
+    for directory in _XDG_APPLICATION_DIRS:
+        path = directory / desktop_file
+        if not path.is_file():
+            continue
+        for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+            if line.startswith("Exec="):
+                executable = shutil.which(shlex.split(line[len("Exec="):])[0])
+                return Path(executable) if executable else None
+    return None
+
+
+def _get_linux_default_browser() -> Optional[Path]:
+    """
+    Retrieves the default browser with ``xdg-settings`` when it's chromium based,
+    otherwise the first chromium based browser found on the PATH.
+    :return:
+    """
+    try:
+        desktop_file = subprocess.run(["xdg-settings", "get", "default-web-browser"], capture_output=True, text=True,
+                                      timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        desktop_file = ""
+
+    if desktop_file:
+        executable = _desktop_file_executable(desktop_file)
+        if executable and executable.name in LINUX_BROWSER_NAMES:
+            return executable
+        logger.info(f"The default browser: {desktop_file} is not chromium based, looking for one on the PATH")
+
+    for name in LINUX_BROWSER_NAMES:
+        executable = shutil.which(name)
+        if executable:
+            return Path(executable)
+    return None
+
+
+def get_default_browser() -> Optional[Path]:
+    """
+    Retrieves the full executable path of the default browser on Windows (registry) or Linux (xdg-settings and PATH).
+
+    Returns:
+        Optional[Path]: Path to the browser executable, or None if not found.
+    """
+    logger.info("Trying to get default browser")
+    match platform.system():
+        case "Windows":
+            return _get_windows_default_browser()
+        case "Linux":
+            return _get_linux_default_browser()
+        case system:
+            logger.warning(f"The default browser can't be discovered on: {system}, set the browser path in the settings")
+            return None
+
+
+def resolve_browser_path(configured_path:Union[str, Path, None]) -> Optional[Path]:
+    """
+    Returns the configured browser path if it's still valid, otherwise the discovered default browser.
+    Callers store the result in the config file so the discovery only runs again once the path becomes invalid.
+    :param configured_path: The browser path of the config file.
+    :return:
+    """
+    if is_valid_browser_path(configured_path):
+        return Path(configured_path)
+    if configured_path:
+        logger.warning(f"The browser path: {configured_path} is not valid anymore, looking for the default browser")
+
+    path = get_default_browser()
+    return path if is_valid_browser_path(path) else None
@@ -1,44 +1,82 @@
-import winreg
-import platform
+import asyncio
+import subprocess
+import time
+import urllib.request
 from logging import getLogger
-from typing import Any
+from typing import Any, Optional
+from dataclasses import replace
 from functools import wraps
-from pathlib import Path
-from typing import Optional
-from winreg import HKEY_CURRENT_USER, HKEY_CLASSES_ROOT, OpenKey, QueryValueEx
+import greenlet
 import playwright.sync_api
+import playwright.async_api
 from playwright.sync_api import Locator
+from src.core.errors import BrowserStartupError
+# Re-exported, the discovery lives in its own module so it can be used without importing Playwright.
+from src.utils.browser_discovery import get_default_browser
+from src.utils.retry_policy import RetryPolicy, RetryAttempts, DEFAULT_POLICY
+from src.utils.tracing import TRACER
 
 logger = getLogger("autotyper")
 
-def get_default_browser() -> Optional[Path]:
+def wait_for_devtools(endpoint:str, timeout:float, process:Optional[subprocess.Popen]=None) -> float:
     """
-    Retrieves the full executable path of the default browser on Windows.
-
-    Returns:
-        Optional[Path]: Path to the browser executable, or None if not found.
+    Polls the DevTools ``/json/version`` endpoint until the browser answers, waiting a growing interval
+    between attempts (25ms doubled up to 500ms).
+    :param endpoint: The remote debugging endpoint. e.g: "http://localhost:9222"
+    :param timeout: Seconds the browser has to answer.
+    :param process: The spawned browser process, polling stops if it exits.
+    :raises BrowserStartupError:
+    :return: The seconds waited until the endpoint answered.
     """
-    logger.info("Trying to get default browser")
-    path: Optional[Path] = None
-    try:
-        # Get the ProgId of the default browser
-        user_choice_key = r"Software\Microsoft\Windows\Shell\Associations\UrlAssociations\https\UserChoice"
-        with OpenKey(HKEY_CURRENT_USER, user_choice_key) as key:
-            browser_name = QueryValueEx(key, "ProgId")[0]
+    started = time.monotonic()
+    interval = 0.025
+    while True:
+        try:
+            with urllib.request.urlopen(f"{endpoint}/json/version", timeout=1.0) as response:
+                response.read()
+            return time.monotonic() - started
+        except OSError:
+            pass
 
-        # Get the browser executable path
-        command_key = rf"{browser_name}\shell\open\command"
-        with OpenKey(HKEY_CLASSES_ROOT, command_key) as key:
-            command = QueryValueEx(key, "")[0]
+        if process is not None and process.poll() is not None:
+            raise BrowserStartupError(endpoint, f"the browser exited with code {process.returncode}")
+        elapsed = time.monotonic() - started
+        if elapsed >= timeout:
+            raise BrowserStartupError(endpoint, f"no answer after {timeout:.0f}s")
+        time.sleep(min(interval, timeout - elapsed))
+        interval = min(interval * 2, 0.5)
 
-        # Extract and clean the executable path
-        executable = command.split('"')[1] if '"' in command else command.split()[0]
-        path = Path(executable)
-
-    except (FileNotFoundError, IndexError, winreg.error) as e:
-        logger.exception(f"Error retrieving default browser path: {e}")
+def terminate_process(process:subprocess.Popen, timeout:float=5.0):
+    """
+    Asks the process to exit and kills it if it is still running after ``timeout`` seconds.
+    :param process: The process to stop.
+    :param timeout: Seconds to wait for a clean exit.
+    :return:
+    """
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
 
-    return path
+def pause(page:Optional[playwright.sync_api.Page], seconds:float):
+    """
+    Sleeps for the given seconds.
+    On the greenlet of a lesson typed on a tab of a concurrent run, the wait goes through the page instead
+    so the other tabs keep typing meanwhile.
+    :param page: The page of the greenlet, ``None`` to always sleep.
+    :param seconds: The seconds to wait.
+    :return:
+    """
+    if seconds <= 0:
+        return
+    if page is None or greenlet.getcurrent().parent is None:
+        time.sleep(seconds)
+    else:
+        page.wait_for_timeout(seconds * 1000)
 
 def locator_exists(locator:Locator) -> bool:
     """
@@ -48,26 +86,89 @@ def locator_exists(locator:Locator) -> bool:
     """
     return locator.count() > 0
 
-def retries(tries:int=3):
+def retries(tries:Optional[int]=None, policy:RetryPolicy=DEFAULT_POLICY):
     """
-    A decorator function that retries the execution of the given function a specified number of times
-    if a playwright.sync_api.TimeoutError is raised. If the function fails after the specified number of retries,
-    it returns None.
+    A decorator function that retries the execution of the decorated method following a ``RetryPolicy``
+    if a playwright.sync_api.TimeoutError is raised. If the method fails after the specified number of retries,
+    the error is raised.
 
-    :param tries: The maximum number of retry attempts. Defaults to 3 retries.
+    The attempts wait a jittered exponential backoff, every Playwright call of an attempt is bounded by the policy
+    timeout budget and the remaining ``lesson_deadline``. The circuit breaker of the page (``self._typing_page``)
+    stops the retries as soon as the page is gone.
+
+    :param tries: The maximum number of attempts, overrides the one of the policy.
+    :param policy: The retry policy of the operation. Defaults to ``DEFAULT_POLICY`` (3 attempts).
+    :raises CircuitOpenError, LessonDeadlineError:
     :return: The decorated function that retries on failure.
     """
+    if tries is not None:
+        policy = replace(policy, tries=tries)
+
     def decorator(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs) -> Any:  # Include 'self' in the wrapper's signature
-            inner_tries = tries
-            while inner_tries > 0:
+            page = getattr(self, "_typing_page", None)
+            attempts = RetryAttempts(policy, func.__qualname__, page)
+            while True:
+                previous_budget, token = attempts.start()
+                try:
+                    result = func(self, *args, **kwargs)  # Pass 'self' explicitly to the function
+                except playwright.sync_api.Error as error:
+                    delay = attempts.failed(error)
+                    if delay is None:
+                        raise
+                    TRACER.instant("retry", "retry", function=func.__qualname__, attempt=attempts.attempt)
+                    pause(page, delay)
+                else:
+                    attempts.succeeded()
+                    return result
+                finally:
+                    attempts.finish(previous_budget, token)
+        return wrapper
+
+    return decorator
+
+async def async_locator_exists(locator:playwright.async_api.Locator) -> bool:
+    """
+    Async version of ``locator_exists``.
+    Returns True if the locator count is greater than 0 (locator.count > 0).
+    :param locator: The locator to check.
+    :return:
+    """
+    return await locator.count() > 0
+
+def async_retries(tries:Optional[int]=None, policy:RetryPolicy=DEFAULT_POLICY):
+    """
+    Async version of ``retries``. Retries the awaited coroutine method following a ``RetryPolicy``
+    if a playwright.async_api.TimeoutError is raised.
+
+    :param tries: The maximum number of attempts, overrides the one of the policy.
+    :param policy: The retry policy of the operation. Defaults to ``DEFAULT_POLICY`` (3 attempts).
+    :raises CircuitOpenError, LessonDeadlineError:
+    :return: The decorated coroutine function that retries on failure.
+    """
+    if tries is not None:
+        policy = replace(policy, tries=tries)
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs) -> Any:
+            attempts = RetryAttempts(policy, func.__qualname__, getattr(self, "_typing_page", None))
+            while True:
+                previous_budget, token = attempts.start()
                 try:
-                    return func(self, *args, **kwargs)  # Pass 'self' explicitly to the function
-                except playwright.sync_api.TimeoutError as timeout_error:
-                    inner_tries -= 1
-                    if inner_tries <= 0:
-                        raise timeout_error
+                    result = await func(self, *args, **kwargs)
+                except playwright.async_api.Error as error:
+                    delay = attempts.failed(error)
+                    if delay is None:
+                        raise
+                    TRACER.instant("retry", "retry", function=func.__qualname__, attempt=attempts.attempt)
+                    await asyncio.sleep(delay)
+                else:
+                    attempts.succeeded()
+                    return result
+                finally:
+                    attempts.finish(previous_budget, token)
         return wrapper
 
     return decorator
@@ -0,0 +1,223 @@
+import inspect
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from logging import getLogger
+from types import FrameType
+from typing import Optional
+from playwright.sync_api import Page, Locator, Keyboard, CDPSession
+from playwright.async_api import (Page as AsyncPage, Locator as AsyncLocator, Keyboard as AsyncKeyboard,
+                                  CDPSession as AsyncCDPSession)
+
+logger = getLogger("autotyper")
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last bucket holds everything above.
+LATENCY_BUCKETS:tuple[float, ...] = (1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+# The browser facing methods measured on each Playwright class of the sync and async APIs.
+INSTRUMENTED_METHODS:dict[type, tuple[str, ...]] = {
+    Page: ("goto", "click", "wait_for_load_state", "evaluate"),
+    Locator: ("count", "inner_text", "get_attribute", "press", "click", "evaluate", "evaluate_all", "wait_for"),
+    Keyboard: ("press", "type", "insert_text"),
+    CDPSession: ("send",),
+    AsyncPage: ("goto", "click", "wait_for_load_state", "evaluate"),
+    AsyncLocator: ("count", "inner_text", "get_attribute", "press", "click", "evaluate", "evaluate_all", "wait_for"),
+    AsyncKeyboard: ("press", "type", "insert_text"),
+    AsyncCDPSession: ("send",),
+}
+
+# Frames of these files are skipped when looking for the method that made the call.
+_SKIPPED_FILES = (__file__, "browser_utils.py")
+
+
+@dataclass
+class CallStats:
+    """
+    Number of calls and latency histogram of one Playwright operation made from one method.
+    """
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def add(self, elapsed:float):
+        """
+        Records a call.
+        :param elapsed: The call latency in milliseconds.
+        :return:
+        """
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def percentile(self, percent:float) -> float:
+        """
+        Returns the upper bound of the histogram bucket holding the given percentile.
+        The calls above the last bucket bound are reported with the max latency.
+        :param percent: The percentile from 0 to 100.
+        :return:
+        """
+        target = self.calls * percent / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class Instrumentation:
+    def __init__(self):
+        """
+        Opt-in registry of the Playwright calls made by the Autotyper.
+        Once enabled, the methods listed in ``INSTRUMENTED_METHODS`` (coroutines included) are wrapped to count their
+        calls and record their latency, keyed by the calling method (e.g: ``TypingKeyboard.get_snapshot``) and the operation
+        (e.g: ``Page.evaluate``).
+        """
+        self._lock = threading.Lock()
+        self._stats:dict[tuple[str, str], CallStats] = {}
+        self._originals:dict[tuple[type, str], object] = {}
+        self._sections:int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self):
+        """
+        Wraps the instrumented Playwright methods. Calling it twice is a no-op.
+        :return:
+        """
+        if self.enabled:
+            return
+        for cls, methods in INSTRUMENTED_METHODS.items():
+            for name in methods:
+                original = getattr(cls, name)
+                self._originals[(cls, name)] = original
+                setattr(cls, name, self._wrap(original, f"{cls.__name__}.{name}"))
+
+    def disable(self):
+        """
+        Restores the original Playwright methods.
+        :return:
+        """
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals.clear()
+
+    def _wrap(self, method, operation:str):
+        if inspect.iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(*args, **kwargs):
+                caller = _find_caller()
+                started = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self.record(caller, operation, (time.perf_counter() - started) * 1000)
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            caller = _find_caller()
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(caller, operation, (time.perf_counter() - started) * 1000)
+        return wrapper
+
+    def record(self, caller:str, operation:str, elapsed:float):
+        """
+        Records a call.
+        :param caller: The qualified name of the method that made the call.
+        :param operation: The Playwright method called. e.g: "Locator.press"
+        :param elapsed: The call latency in milliseconds.
+        :return:
+        """
+        with self._lock:
+            stats = self._stats.get((caller, operation))
+            if stats is None:
+                stats = self._stats[(caller, operation)] = CallStats()
+            stats.add(elapsed)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> dict[tuple[str, str], CallStats]:
+        """
+        Returns a copy of the recorded stats keyed by (caller, operation).
+        :return:
+        """
+        with self._lock:
+            return {key: CallStats(stats.calls, stats.total, stats.max, list(stats.buckets)) for key, stats in self._stats.items()}
+
+    def summary(self) -> str:
+        """
+        Returns the recorded stats as a text table sorted by total time.
+        :return:
+        """
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1].total, reverse=True)
+        header = ("caller", "operation", "calls", "total ms", "mean ms", "p50 ms", "p95 ms", "max ms")
+        lines = [
+            (caller, operation, str(stats.calls), f"{stats.total:.1f}", f"{stats.mean:.2f}",
+             f"{stats.percentile(50):.1f}", f"{stats.percentile(95):.1f}", f"{stats.max:.1f}")
+            for (caller, operation), stats in rows
+        ]
+        widths = [max(len(row[column]) for row in [header, *lines]) for column in range(len(header))]
+        return "\n".join(
+            "  ".join(value.ljust(width) if column < 2 else value.rjust(width) for column, (value, width) in enumerate(zip(row, widths)))
+            for row in [header, *lines]
+        )
+
+    @contextmanager
+    def section(self, name:str):
+        """
+        Resets the stats on entry and logs the summary table on exit. Does nothing if disabled.
+        The sections opened inside another one are part of it. e.g: the lessons of a concurrent run.
+        e.g:
+            ``
+            with INSTRUMENTATION.section("Lesson: Home row"):
+                lesson.start()
+            ``
+        :param name: The section name shown above the table.
+        :return:
+        """
+        if not self.enabled or self._sections:
+            yield
+            return
+        self.reset()
+        self._sections += 1
+        try:
+            yield
+        finally:
+            self._sections -= 1
+            logger.info(f"Browser calls of {name}:\n{self.summary()}")
+
+
+def _find_caller() -> str:
+    """
+    Returns the qualified name of the closest Autotyper method on the call stack.
+    The retry decorators and the instrumentation frames are skipped.
+    :return:
+    """
+    frame:Optional[FrameType] = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.endswith(_SKIPPED_FILES) and "playwright" not in filename:
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return "<unknown>"
+
+
+INSTRUMENTATION = Instrumentation()
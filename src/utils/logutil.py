@@ -1,22 +1,252 @@
-from logging import getLogger, Formatter, StreamHandler, FileHandler, DEBUG, INFO
+"""
+Logging backend of the Autotyper.
 
-# Setup for the custom logger
+The "autotyper" logger only puts the records on a queue, a ``QueueListener`` thread formats and writes them, so a log
+call of the typing loop never waits for the disk. The log file is made of JSON lines carrying the lesson context set by
+``log_context`` and rotated by size.
 
-#logger formatter setup
-logger_formatter = Formatter(fmt="[{asctime}] - [MODULE]: {module} -> [FUNCTION]: {funcName} - [LEVEL]: {levelname} -> {message}", style="{")
+Usage:
+    ``listener = setup_logging(LoggingSettings(level="DEBUG", sampling={"autotyper.typing": 0.01}))``
 
-# stream handler setup
-logger_console_handler = StreamHandler()
-logger_console_handler.setFormatter(logger_formatter)
-logger_console_handler.setLevel(DEBUG)
+Nothing is configured at import time, records logged before ``setup_logging`` go to the default ``logging`` handler.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional, TYPE_CHECKING
 
-# file handler setup
-logger_file_handler = FileHandler(filename="autotyper.log", mode="w")
-logger_file_handler.setLevel(INFO)
-logger_file_handler.setFormatter(logger_formatter)
+if TYPE_CHECKING:
+    from src.core.config_loader import ConfigLoader
 
-# logger setup
-logger = getLogger("autotyper")
-logger.setLevel(DEBUG)
-logger.addHandler(logger_console_handler)
-logger.addHandler(logger_file_handler)
\ No newline at end of file
+ROOT_LOGGER = "autotyper"
+# Logger of the typing loop, its debug records are the ones worth sampling.
+TYPING_LOGGER = f"{ROOT_LOGGER}.typing"
+# Attributes of every ``LogRecord``, the others were passed through ``extra``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "context"}
+
+_log_context:ContextVar[Optional[dict[str, Any]]] = ContextVar("log_context", default=None)
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Adds the fields to the records logged inside the block, on top of the fields of the enclosing blocks.
+    The context follows the thread and the asyncio task it was set in.
+    :param fields: The context fields. e.g: lesson="Home Row", exercise=1
+    :return:
+    """
+    token = _log_context.set({**(_log_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def update_log_context(**fields):
+    """
+    Updates the fields of the innermost ``log_context`` block. e.g: the exercise number inside a lesson.
+    Does nothing outside a ``log_context`` block.
+    :param fields: The context fields to update.
+    :return:
+    """
+    context = _log_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def current_log_context() -> dict[str, Any]:
+    return dict(_log_context.get() or {})
+
+
+@dataclass
+class LoggingSettings:
+    """
+    How the records of the "autotyper" logger are written.
+
+    ``path``: The JSON lines log file, "" to not write a file.
+    ``level``: The level of the "autotyper" logger. e.g: "DEBUG"
+    ``console_level``: The level of the readable records written to stderr, "" to not write them.
+    ``max_bytes``: The size the log file is rotated at, 0 to never rotate it.
+    ``backup_count``: The number of rotated files kept. e.g: autotyper.log.1, autotyper.log.2
+    ``sampling``: The fraction of the records below ``WARNING`` kept for every logger (and its children).
+    e.g: ``{"autotyper.typing": 0.01}`` keeps one debug record of the typing loop out of 100.
+    """
+    path: str = "autotyper.log"
+    level: str = "INFO"
+    console_level: str = ""
+    max_bytes: int = 5 * 1024 * 1024
+    backup_count: int = 3
+    sampling: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, config:"ConfigLoader.ConfigFile", console_level:str = "") -> "LoggingSettings":
+        """
+        Builds the logging settings from the config file.
+        :param config: The loaded config file.
+        :param console_level: The level of the records written to stderr, "" to not write them. e.g: the menus don't
+        want them.
+        :return:
+        """
+        return cls(config.log_file, config.log_level, console_level, config.log_max_bytes, config.log_backup_count,
+                   dict(config.log_sampling))
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the ``log_context`` of the logging thread to the record, before it's handed to the listener thread.
+    """
+    def filter(self, record:logging.LogRecord) -> bool:
+        record.context = current_log_context()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates:dict[str, float]):
+        """
+        Keeps a fraction of the records below ``WARNING`` of the given loggers, the others are never sampled.
+        The records are kept at a regular interval instead of at random so the log stays predictable.
+        :param rates: The fraction of the records kept, keyed by logger name. The rate of the closest parent is used.
+        """
+        super().__init__()
+        self._rates = dict(rates)
+        self._credits:dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _rate(self, name:str) -> Optional[tuple[str, float]]:
+        while name:
+            if name in self._rates:
+                return name, self._rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record:logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None:
+            return True
+        name, fraction = rate
+        with self._lock:
+            credit = self._credits.get(name, 1.0) + fraction
+            keep = credit >= 1.0
+            self._credits[name] = credit - 1.0 if keep else credit
+        return keep
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single JSON line with its time, level, logger, source, message, context and extra fields.
+    """
+    def format(self, record:logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        data.update(getattr(record, "context", None) or {})
+        data.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _ContextFormatter(logging.Formatter):
+    def format(self, record:logging.LogRecord) -> str:
+        message = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            message += " " + " ".join(f"{key}={value}" for key, value in context.items())
+        return message
+
+
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record:logging.LogRecord) -> logging.LogRecord:
+        """
+        Unlike ``QueueHandler.prepare``, the record isn't formatted in the logging thread: the message is merged with
+        its arguments and the traceback rendered, the listener formats the rest.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# The listener running for every configured logger.
+_listeners:dict[str, QueueListener] = {}
+_listeners_lock = threading.Lock()
+
+
+def setup_logging(settings:Optional[LoggingSettings]=None, name:str=ROOT_LOGGER) -> QueueListener:
+    """
+    Sends the records of the logger to a background writer, replacing the handlers of a previous call.
+    The listener is stopped (its queue flushed) when the program exits.
+    :param settings: How the records are written, defaults to ``LoggingSettings()``
+    :param name: The logger to configure.
+    :return: The started listener.
+    """
+    settings = settings or LoggingSettings()
+    handlers:list[logging.Handler] = []
+    if settings.path:
+        file_handler = RotatingFileHandler(settings.path, maxBytes=settings.max_bytes, backupCount=settings.backup_count,
+                                           encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if settings.console_level:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(settings.console_level.upper())
+        console_handler.setFormatter(_ContextFormatter(
+            fmt="[{asctime}] - [MODULE]: {module} -> [FUNCTION]: {funcName} - [LEVEL]: {levelname} -> {message}", style="{"))
+        handlers.append(console_handler)
+
+    records:queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(records)
+    if settings.sampling:
+        queue_handler.addFilter(SamplingFilter(settings.sampling))
+    queue_handler.addFilter(ContextFilter())
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+
+    logger = logging.getLogger(name)
+    with _listeners_lock:
+        shutdown_logging(name)
+        logger.setLevel(settings.level.upper())
+        logger.addHandler(queue_handler)
+        listener.start()
+        _listeners[name] = listener
+    atexit.register(shutdown_logging, name)
+    return listener
+
+
+def shutdown_logging(name:str=ROOT_LOGGER):
+    """
+    Writes the queued records and removes the handlers installed by ``setup_logging``, does nothing if they were
+    already removed.
+    :param name: The configured logger.
+    :return:
+    """
+    listener = _listeners.pop(name, None)
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers):
+        if isinstance(handler, _RecordQueueHandler):
+            logger.removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
@@ -0,0 +1,405 @@
+"""
+Counters, gauges and histograms of the Autotyper, exported in the OpenMetrics text format.
+
+The metrics are always collected, exporting them is opt-in:
+    ``METRICS.start_export(path="autotyper.prom")`` rewrites the file every 15 seconds (node_exporter textfile collector)
+    ``METRICS.start_export(port=9464)`` serves ``http://127.0.0.1:9464/metrics``
+
+Rates (keystrokes/s, exercises/s, errors/s) are meant to be computed by the monitoring from the counters,
+``rate(autotyper_keystrokes_total[5m])``, the ``*_per_second`` gauges only hold the rates of the last lesson.
+"""
+import atexit
+import math
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+logger = getLogger("autotyper")
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Seconds between two writes of the metrics file.
+EXPORT_INTERVAL = 15.0
+# Upper bounds in seconds of the probe latency buckets.
+PROBE_BUCKETS:tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Upper bounds in seconds of the lesson duration buckets.
+LESSON_BUCKETS:tuple[float, ...] = (10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0)
+
+
+@dataclass
+class MetricFamily:
+    """
+    The samples of a metric at export time.
+
+    ``kind``: "counter", "gauge" or "histogram"
+    ``samples``: ``(suffix, labels, value)`` tuples. e.g: ("_total", {"outcome": "completed"}, 3)
+    """
+    name: str
+    kind: str
+    help: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+    unit: str = ""
+
+
+def _escape(value:str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value:float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(value)
+
+
+def _format_labels(labels:dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...] = (), unit:str = ""):
+        self._name = name
+        self._help = help
+        self._labels = labels
+        self._unit = unit
+        self._lock = threading.Lock()
+
+    def _key(self, labels:dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self._labels):
+            raise ValueError(f"{self._name} expects the labels {self._labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self._labels)
+
+    def _family(self) -> MetricFamily:
+        return MetricFamily(self._name, self.kind, self._help, unit=self._unit)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...] = (), unit:str = ""):
+        """
+        A value that only goes up. e.g: the number of completed lessons.
+        :param name: The metric name, without the "_total" suffix.
+        :param help: The description of the metric.
+        :param labels: The names of the labels every increment must give.
+        :param unit: The unit the name ends with. e.g: "seconds"
+        """
+        super().__init__(name, help, labels, unit)
+        # A metric without labels is exported from the start, even if it's never updated.
+        self._values:dict[tuple[str, ...], float] = {} if labels else {(): 0}
+
+    def inc(self, amount:float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can't be decreased")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> MetricFamily:
+        family = self._family()
+        with self._lock:
+            for key, value in self._values.items():
+                family.samples.append(("_total", dict(zip(self._labels, key)), value))
+        return family
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...] = (), unit:str = ""):
+        """
+        A value that goes up and down. e.g: the keystrokes per second of the last lesson.
+        :param name: The metric name.
+        :param help: The description of the metric.
+        :param labels: The names of the labels every update must give.
+        :param unit: The unit the name ends with. e.g: "seconds"
+        """
+        super().__init__(name, help, labels, unit)
+        # A metric without labels is exported from the start, even if it's never updated.
+        self._values:dict[tuple[str, ...], float] = {} if labels else {(): 0}
+
+    def set(self, value:float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount:float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount:float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def collect(self) -> MetricFamily:
+        family = self._family()
+        with self._lock:
+            for key, value in self._values.items():
+                family.samples.append(("", dict(zip(self._labels, key)), value))
+        return family
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name:str, help:str, labels:tuple[str, ...] = (), buckets:tuple[float, ...] = PROBE_BUCKETS,
+                 unit:str = ""):
+        """
+        The distribution of observed values. e.g: the latency of the page reads.
+        :param name: The metric name.
+        :param help: The description of the metric.
+        :param labels: The names of the labels every observation must give.
+        :param buckets: The sorted upper bounds of the buckets, the "+Inf" bucket is added.
+        :param unit: The unit the name ends with. e.g: "seconds"
+        """
+        super().__init__(name, help, labels, unit)
+        self._buckets = tuple(sorted(buckets))
+        # Label values -> [counts of every bucket (not cumulative), sum]
+        self._values:dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        if not labels:
+            self._values[()] = ([0] * (len(self._buckets) + 1), [0.0])
+
+    def observe(self, value:float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self._buckets) + 1), [0.0]))
+            counts[bisect_left(self._buckets, value)] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes the seconds spent in the block, only if it doesn't raise.
+        :param labels: The labels of the observation.
+        :return:
+        """
+        start = time.perf_counter()
+        yield
+        self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([], [0.0]))
+            return sum(counts)
+
+    def collect(self) -> MetricFamily:
+        family = self._family()
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                labels = dict(zip(self._labels, key))
+                cumulative = 0
+                for bound, count in zip(self._buckets + (math.inf,), counts):
+                    cumulative += count
+                    family.samples.append(("_bucket", {**labels, "le": _format_value(float(bound))}, cumulative))
+                family.samples.append(("_count", labels, cumulative))
+                family.samples.append(("_sum", labels, total[0]))
+        return family
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        The metrics of the Autotyper and the collectors of the counters kept elsewhere (e.g: ``RETRY_METRICS``),
+        both are read at export time.
+        """
+        self._lock = threading.Lock()
+        self._metrics:dict[str, _Metric] = {}
+        self._collectors:dict[str, Callable[[], Iterable[MetricFamily]]] = {}
+        self._server:Optional[ThreadingHTTPServer] = None
+        self._writer:Optional[threading.Thread] = None
+        self._stop_writer = threading.Event()
+
+    def _register(self, metric:_Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"The metric {metric.name} is already registered as a {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name:str, help:str, labels:tuple[str, ...] = (), unit:str = "") -> Counter:
+        """
+        Returns the counter with the given name, registering it on first use.
+        :return:
+        """
+        return self._register(Counter(name, help, labels, unit))
+
+    def gauge(self, name:str, help:str, labels:tuple[str, ...] = (), unit:str = "") -> Gauge:
+        """
+        Returns the gauge with the given name, registering it on first use.
+        :return:
+        """
+        return self._register(Gauge(name, help, labels, unit))
+
+    def histogram(self, name:str, help:str, labels:tuple[str, ...] = (), buckets:tuple[float, ...] = PROBE_BUCKETS,
+                  unit:str = "") -> Histogram:
+        """
+        Returns the histogram with the given name, registering it on first use.
+        :return:
+        """
+        return self._register(Histogram(name, help, labels, buckets, unit))
+
+    def register_collector(self, name:str, collector:Callable[[], Iterable[MetricFamily]]):
+        """
+        Adds the families returned by the collector to every export, replacing the collector with the same name.
+        :param name: The collector name. e.g: "retries"
+        :param collector: Returns the current families.
+        :return:
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name:str):
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def collect(self) -> list[MetricFamily]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def to_openmetrics(self) -> str:
+        """
+        Returns the metrics in the OpenMetrics text format.
+        :return:
+        """
+        lines = []
+        for family in self.collect():
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            if family.unit:
+                lines.append(f"# UNIT {family.name} {family.unit}")
+            lines.append(f"# HELP {family.name} {_escape(family.help)}")
+            for suffix, labels, value in family.samples:
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path:Union[str, Path]):
+        """
+        Writes the metrics file, the file is replaced at once so a scraper never reads a partial export.
+        :param path: The metrics file path. e.g: "autotyper.prom"
+        :return:
+        """
+        path = Path(path)
+        descriptor, temporary = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                file.write(self.to_openmetrics())
+            os.replace(temporary, path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    def serve(self, port:int, host:str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serves the metrics on ``http://host:port/metrics`` from a background thread.
+        :param port: The local port, 0 to pick a free one.
+        :param host: The interface to listen on.
+        :return: The running server.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.to_openmetrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Metrics request: {format % args}")
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="autotyper-metrics-server", daemon=True).start()
+        logger.info(f"Serving the metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+    def start_export(self, path:str = "", port:int = 0, interval:float = EXPORT_INTERVAL):
+        """
+        Starts exporting the metrics, stopping a previous export. Does nothing if neither a path nor a port is given.
+        :param path: Rewrites this file every ``interval`` seconds and when the program exits, "" to not write it.
+        :param port: Serves the metrics on this local port, 0 to not serve them.
+        :param interval: Seconds between two writes of the file.
+        :return:
+        """
+        self.stop_export()
+        if port:
+            self._server = self.serve(port)
+        if path:
+            self._stop_writer.clear()
+
+            def write_periodically():
+                while not self._stop_writer.wait(interval):
+                    self._write_quietly(path)
+
+            self._writer = threading.Thread(target=write_periodically, name="autotyper-metrics-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self._write_quietly, path)
+
+    def _write_quietly(self, path:str):
+        try:
+            self.write(path)
+        except OSError as error:
+            logger.warning(f"The metrics could not be written to {path}: {error}")
+
+    def stop_export(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._writer is not None:
+            self._stop_writer.set()
+            self._writer.join()
+            self._writer = None
+
+
+METRICS = MetricsRegistry()
+
+LESSONS = METRICS.counter("autotyper_lessons", "Lessons run, by outcome (completed or failed).", ("outcome",))
+LESSON_ERRORS = METRICS.counter("autotyper_lesson_errors", "Failed lessons, by error type. e.g: URLChangedError, TimeoutError",
+                                ("error",))
+LESSON_DURATION = METRICS.histogram("autotyper_lesson_duration_seconds", "Wall time of the lessons.",
+                                    buckets=LESSON_BUCKETS, unit="seconds")
+EXERCISES = METRICS.counter("autotyper_exercises", "Completed exercises.")
+KEYSTROKES = METRICS.counter("autotyper_keystrokes", "Keystrokes sent to the typing page.")
+EXERCISES_PER_SECOND = METRICS.gauge("autotyper_exercises_per_second", "Completed exercises per second of the last lesson.")
+KEYSTROKES_PER_SECOND = METRICS.gauge("autotyper_keystrokes_per_second", "Keystrokes per second of the last lesson.")
+PROBE_LATENCY = METRICS.histogram("autotyper_probe_latency_seconds", "Latency of the reads of the exercise page.",
+                                  ("probe",), buckets=PROBE_BUCKETS, unit="seconds")
@@ -0,0 +1,165 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, Optional
+from weakref import WeakSet
+import playwright.sync_api
+import playwright.async_api
+from src.utils.metrics import MetricFamily
+
+logger = getLogger("autotyper")
+
+# File extensions of the resource types that can be blocked, the route only intercepts the matching urls so the
+# requests of the other types never reach Python.
+RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpe?g", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff2?", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "mp3", "wav", "m4a"),
+}
+# Hosts of analytics beacons, ads and trackers, none of them are needed to type a lesson.
+TRACKER_PATTERNS = (
+    r"google-analytics\.com", r"googletagmanager\.com", r"doubleclick\.net", r"googlesyndication\.com",
+    r"adservice\.google\.", r"facebook\.(net|com)/tr", r"connect\.facebook\.net", r"hotjar\.com", r"clarity\.ms",
+    r"segment\.(io|com)", r"mixpanel\.com", r"amplitude\.com", r"fullstory\.com", r"/analytics/", r"/beacon",
+)
+
+
+@dataclass
+class ResourceFilterSettings:
+    """
+    What is blocked while the lessons are typed.
+
+    ``blocked_types``: Playwright resource types aborted when their url ends with a known extension of the type
+    (``RESOURCE_EXTENSIONS``). Stylesheets are never blocked, the visibility checks depend on them.
+    ``blocked_patterns``: Regular expressions of the urls aborted whatever their type.
+    ``allowed_patterns``: Regular expressions of the urls that are always loaded. e.g: a script served from a blocked host
+    that the lesson page needs.
+    """
+    blocked_types: tuple[str, ...] = ("image", "font", "media")
+    blocked_patterns: tuple[str, ...] = TRACKER_PATTERNS
+    allowed_patterns: tuple[str, ...] = field(default_factory=tuple)
+
+
+class ResourceStats:
+    def __init__(self):
+        """
+        Counters of the requests of the filtered pages.
+        ``blocked`` is keyed by resource type, ``loaded_bytes`` sums the "Content-Length" of the loaded responses,
+        compare it with the filter enabled and disabled to measure the saved bytes.
+        """
+        self._lock = threading.Lock()
+        self.blocked:dict[str, int] = {}
+        self.loaded:int = 0
+        self.loaded_bytes:int = 0
+
+    def record_blocked(self, resource_type:str):
+        with self._lock:
+            self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    def record_loaded(self, size:int):
+        with self._lock:
+            self.loaded += 1
+            self.loaded_bytes += size
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {"blocked": dict(self.blocked), "blocked_total": sum(self.blocked.values()), "loaded": self.loaded,
+                    "loaded_bytes": self.loaded_bytes}
+
+    def metric_families(self) -> list[MetricFamily]:
+        snapshot = self.snapshot()
+        blocked = MetricFamily("autotyper_resources_blocked", "counter", "Blocked requests, by resource type.")
+        for resource_type, value in snapshot["blocked"].items():
+            blocked.samples.append(("_total", {"type": resource_type}, value))
+        return [
+            blocked,
+            MetricFamily("autotyper_resources_loaded", "counter", "Loaded responses of the filtered pages.",
+                         [("_total", {}, snapshot["loaded"])]),
+            MetricFamily("autotyper_resources_loaded_bytes", "counter", "Content-Length of the loaded responses.",
+                         [("_total", {}, snapshot["loaded_bytes"])], unit="bytes"),
+        ]
+
+
+class ResourceFilter:
+    def __init__(self, settings:Optional[ResourceFilterSettings]=None):
+        """
+        Aborts the requests of the typing pages that don't help to type a lesson (images, fonts, trackers, ...),
+        so the page loads and the "networkidle" waits of the typing loop don't wait for them.
+        The filter is attached to single pages instead of the browser context: a context route would be served by
+        the sync Playwright connection, which doesn't dispatch its events while the async engine is running.
+        **NOTE**: Chromium disables the HTTP cache of a routed page.
+        :param settings: What is blocked, defaults to ``ResourceFilterSettings()``
+        """
+        settings = self._settings = settings or ResourceFilterSettings()
+        self._allowed = re.compile("|".join(settings.allowed_patterns)) if settings.allowed_patterns else None
+        self._blocked_url = re.compile("|".join(settings.blocked_patterns)) if settings.blocked_patterns else None
+        extensions = [extension for resource_type in settings.blocked_types
+                      for extension in RESOURCE_EXTENSIONS.get(resource_type, ())]
+        patterns = list(settings.blocked_patterns)
+        if extensions:
+            patterns.append(rf"\.({'|'.join(extensions)})(\?|#|$)")
+        # Only these urls are intercepted.
+        self._route_pattern = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+        self._pages:WeakSet = WeakSet()
+        self.stats = ResourceStats()
+
+    def _should_block(self, request:Any) -> bool:
+        url = request.url
+        if self._allowed is not None and self._allowed.search(url):
+            return False
+        if self._blocked_url is not None and self._blocked_url.search(url):
+            return True
+        return request.resource_type in self._settings.blocked_types
+
+    def _on_response(self, response:Any):
+        length = response.headers.get("content-length")
+        self.stats.record_loaded(int(length) if length and length.isdigit() else 0)
+
+    def attach(self, page:playwright.sync_api.Page):
+        """
+        Starts filtering the requests of the page, once per page.
+        :param page: The page to filter.
+        :return:
+        """
+        if page in self._pages:
+            return
+        self._pages.add(page)
+        page.on("response", self._on_response)
+        if self._route_pattern is None:
+            return
+
+        def handle(route:playwright.sync_api.Route):
+            if self._should_block(route.request):
+                self.stats.record_blocked(route.request.resource_type)
+                route.abort("blockedbyclient")
+            else:
+                route.fallback()
+
+        page.route(self._route_pattern, handle)
+
+    async def attach_async(self, page:playwright.async_api.Page):
+        """
+        Starts filtering the requests of the page, once per page.
+        :param page: The page to filter.
+        :return:
+        """
+        if page in self._pages:
+            return
+        self._pages.add(page)
+        page.on("response", self._on_response)
+        if self._route_pattern is None:
+            return
+
+        async def handle(route:playwright.async_api.Route):
+            if self._should_block(route.request):
+                self.stats.record_blocked(route.request.resource_type)
+                await route.abort("blockedbyclient")
+            else:
+                await route.fallback()
+
+        await page.route(self._route_pattern, handle)
+
+    @property
+    def settings(self) -> ResourceFilterSettings:
+        return self._settings
@@ -0,0 +1,260 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Any
+from weakref import WeakKeyDictionary
+import playwright.sync_api
+import playwright.async_api
+from src.core.errors import LessonDeadlineError, CircuitOpenError
+from src.utils.metrics import METRICS, MetricFamily
+
+# Playwright default timeout of every action in milliseconds.
+DEFAULT_TIMEOUT = 30000.0
+
+# Substrings of the Playwright errors raised once the page, its context or the browser are gone.
+_PAGE_GONE_MESSAGES = ("has been closed", "Target closed", "Browser closed", "Connection closed")
+
+_lesson_deadline:ContextVar[Optional[float]] = ContextVar("lesson_deadline", default=None)
+_timeout_budget:ContextVar[float] = ContextVar("timeout_budget", default=DEFAULT_TIMEOUT)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How an operation is retried when a Playwright ``TimeoutError`` is raised.
+
+    ``tries``: The maximum number of attempts.
+    ``timeout``: The Playwright timeout budget in milliseconds of every attempt, ``None`` to inherit the budget of the
+    calling operation (``DEFAULT_TIMEOUT`` at the top level). It is always capped by the remaining lesson deadline.
+    ``base_delay``, ``max_delay``: The exponential backoff between attempts in seconds. ``base_delay * 2 ** attempt``
+    ``jitter``: The fraction of the backoff that is randomized. 0.5 waits between 50% and 100% of the backoff.
+    """
+    tries: int = 3
+    timeout: Optional[float] = None
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+    jitter: float = 0.5
+
+    def backoff(self, attempt:int) -> float:
+        """
+        Returns the seconds to wait after the given failed attempt.
+        :param attempt: The number of the failed attempt, starting at 1.
+        :return:
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1)
+
+
+DEFAULT_POLICY = RetryPolicy()
+# Single round trip reads of the page state. e.g: snapshots
+PROBE_POLICY = RetryPolicy(tries=3, timeout=5000.0)
+# Keystrokes and clicks on the exercise page.
+ACTION_POLICY = RetryPolicy(tries=3, timeout=10000.0)
+# Page navigations, a slow network deserves the full budget but fewer attempts.
+NAVIGATION_POLICY = RetryPolicy(tries=2, timeout=DEFAULT_TIMEOUT, base_delay=0.5)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold:int = 3, cooldown:float = 30.0):
+        """
+        Fails fast on a page that keeps failing.
+        The circuit opens once the page is closed or after ``threshold`` consecutive operations exhausted their
+        retries, every call then raises ``CircuitOpenError`` until ``cooldown`` seconds have passed.
+        :param threshold: The consecutive failed operations that open the circuit.
+        :param cooldown: Seconds the circuit stays open.
+        """
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures:int = 0
+        self._opened_until:float = 0.0
+        self._reason:str = ""
+
+    def check(self, page:Any, operation:str = ""):
+        """
+        Raises ``CircuitOpenError`` if the circuit is open or the page is closed.
+        :param page: The sync or async page of the operation.
+        :param operation: The qualified name of the operation about to run.
+        :raise CircuitOpenError:
+        :return:
+        """
+        if page is not None and page.is_closed():
+            self.trip("the page was closed", operation)
+        if time.monotonic() < self._opened_until:
+            raise CircuitOpenError(self._reason)
+
+    def trip(self, reason:str, operation:str = ""):
+        """
+        Opens the circuit and raises ``CircuitOpenError``.
+        :param reason: Why the circuit was opened.
+        :param operation: The qualified name of the operation that found the page gone.
+        :raise CircuitOpenError:
+        :return:
+        """
+        self._reason = reason
+        self._opened_until = time.monotonic() + self._cooldown
+        RETRY_METRICS.increment("circuit_trips", operation)
+        raise CircuitOpenError(reason)
+
+    def record_success(self):
+        self._failures = 0
+
+    def record_failure(self, operation:str):
+        """
+        Counts an operation that exhausted its retries, opening the circuit once ``threshold`` is reached.
+        :param operation: The qualified name of the failed operation.
+        :return:
+        """
+        self._failures += 1
+        if self._failures >= self._threshold:
+            self._failures = 0
+            self._reason = f"{self._threshold} consecutive operations failed, the last one was {operation}"
+            self._opened_until = time.monotonic() + self._cooldown
+            RETRY_METRICS.increment("circuit_trips", operation)
+
+
+class RetryMetrics:
+    def __init__(self):
+        """
+        Counters of the retried operations keyed by counter name and the qualified name of the operation.
+        Counters: "calls", "retries", "failures", "circuit_trips", "deadline_exceeded"
+        """
+        self._lock = threading.Lock()
+        self._counters:dict[tuple[str, str], int] = {}
+
+    def increment(self, counter:str, operation:str):
+        with self._lock:
+            self._counters[(counter, operation)] = self._counters.get((counter, operation), 0) + 1
+
+    def snapshot(self) -> dict[tuple[str, str], int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+    def metric_families(self) -> list[MetricFamily]:
+        family = MetricFamily("autotyper_retry_events", "counter",
+                              "Retried operations events, by event (calls, retries, failures, circuit_trips, "
+                              "deadline_exceeded) and operation.")
+        for (counter, operation), value in self.snapshot().items():
+            family.samples.append(("_total", {"event": counter, "operation": operation}, value))
+        return [family]
+
+
+RETRY_METRICS = RetryMetrics()
+METRICS.register_collector("retries", RETRY_METRICS.metric_families)
+_breakers:WeakKeyDictionary = WeakKeyDictionary()
+
+
+def get_breaker(page:Any) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of the page, creating it on first use.
+    :param page: The sync or async page.
+    :return:
+    """
+    breaker = _breakers.get(page)
+    if breaker is None:
+        breaker = _breakers[page] = CircuitBreaker()
+    return breaker
+
+
+@contextmanager
+def lesson_deadline(seconds:float):
+    """
+    Sets the time the retried operations of the block have to complete.
+    Once it is exceeded, the next attempt raises ``LessonDeadlineError`` and every Playwright timeout is capped
+    to the remaining time. A value of 0 disables the deadline.
+    :param seconds: The deadline in seconds.
+    :return:
+    """
+    token = _lesson_deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    try:
+        yield
+    finally:
+        _lesson_deadline.reset(token)
+
+
+def _remaining() -> Optional[float]:
+    deadline = _lesson_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _is_page_gone(error:Exception) -> bool:
+    return not isinstance(error, (playwright.sync_api.TimeoutError, playwright.async_api.TimeoutError)) and \
+        any(message in str(error) for message in _PAGE_GONE_MESSAGES)
+
+
+class RetryAttempts:
+    def __init__(self, policy:RetryPolicy, operation:str, page:Any):
+        """
+        State of the attempts of a single retried call, shared by the sync and async retry decorators.
+        :param policy: The retry policy of the operation.
+        :param operation: The qualified name of the operation.
+        :param page: The page the operation works on, ``None`` if unknown.
+        """
+        self._policy = policy
+        self._operation = operation
+        self._page = page
+        self._breaker:Optional[CircuitBreaker] = get_breaker(page) if page is not None else None
+        self.attempt:int = 0
+
+    def start(self) -> tuple[float, object]:
+        """
+        Checks the circuit and the deadline, then applies the timeout budget of the next attempt.
+        :raise CircuitOpenError, LessonDeadlineError:
+        :return: The previous budget and the token restoring it, to be passed to ``finish``.
+        """
+        self.attempt += 1
+        RETRY_METRICS.increment("calls" if self.attempt == 1 else "retries", self._operation)
+        if self._breaker is not None:
+            self._breaker.check(self._page, self._operation)
+
+        previous = _timeout_budget.get()
+        budget = self._policy.timeout if self._policy.timeout is not None else previous
+        remaining = _remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                RETRY_METRICS.increment("deadline_exceeded", self._operation)
+                raise LessonDeadlineError(self._operation)
+            budget = min(budget, remaining * 1000)
+        if self._page is not None and budget != previous:
+            self._page.set_default_timeout(budget)
+        return previous, _timeout_budget.set(budget)
+
+    def finish(self, previous:float, token:object):
+        budget = _timeout_budget.get()
+        _timeout_budget.reset(token)
+        if self._page is not None and budget != previous and not self._page.is_closed():
+            self._page.set_default_timeout(previous)
+
+    def succeeded(self):
+        if self._breaker is not None:
+            self._breaker.record_success()
+
+    def failed(self, error:Exception) -> Optional[float]:
+        """
+        Decides what to do after a failed attempt.
+        :param error: The raised error.
+        :raise CircuitOpenError: If the page is gone.
+        :return: The seconds to wait before the next attempt, ``None`` if the error must be raised.
+        """
+        if _is_page_gone(error):
+            if self._breaker is not None:
+                self._breaker.trip(str(error).splitlines()[0], self._operation)
+            return None
+        if not isinstance(error, (playwright.sync_api.TimeoutError, playwright.async_api.TimeoutError)):
+            return None
+
+        remaining = _remaining()
+        if self.attempt >= self._policy.tries or (remaining is not None and remaining <= 0):
+            RETRY_METRICS.increment("failures", self._operation)
+            if self._breaker is not None:
+                self._breaker.record_failure(self._operation)
+            return None
+
+        delay = self._policy.backoff(self.attempt)
+        return delay if remaining is None else max(0.0, min(delay, remaining))
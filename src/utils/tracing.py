@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Optional, Union
+import greenlet
+
+# Returned by ``TraceRecorder.span`` while disabled, so a disabled span costs a single attribute check.
+_DISABLED_SPAN = nullcontext()
+
+
+class TraceRecorder:
+    def __init__(self):
+        """
+        Records spans of the typing loop as Chrome trace events.
+        The exported file opens in Perfetto (ui.perfetto.dev) or chrome://tracing.
+        Disabled by default, every method is a no-op until ``enable`` is called.
+        """
+        self._lock = threading.Lock()
+        self._events:list[dict] = []
+        self._path:Optional[Path] = None
+        self._origin:int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._path is not None
+
+    def enable(self, path:Union[str, Path]):
+        """
+        Starts recording. The events are appended to ``path`` on every ``flush``.
+        The file uses the JSON array format of the trace events, which is valid without its closing bracket,
+        so it can be opened while the Autotyper is still running.
+        :param path: The trace json file, overwritten.
+        :return:
+        """
+        self._path = Path(path)
+        self._path.write_text("[\n", encoding="utf-8")
+        self._origin = time.perf_counter_ns()
+        self._events = []
+
+    def disable(self):
+        self._path = None
+
+    def _timestamp(self) -> float:
+        # trace events use microseconds
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def _add(self, event:dict):
+        event["pid"] = os.getpid()
+        # One track per greenlet, the lessons typed on the tabs of a concurrent run share the thread.
+        current = greenlet.getcurrent()
+        event["tid"] = threading.get_ident() if current.parent is None else id(current)
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def _span(self, name:str, category:str, args:dict):
+        start = self._timestamp()
+        try:
+            yield
+        finally:
+            event = {"name": name, "cat": category, "ph": "X", "ts": start, "dur": self._timestamp() - start}
+            if args:
+                event["args"] = args
+            self._add(event)
+
+    def span(self, name:str, category:str = "typing", **args):
+        """
+        Returns a context manager recording a complete event around its block.
+        Spans opened inside another span are shown nested on the timeline.
+        e.g:
+            ``
+            with TRACER.span("snapshot", "probe"):
+                snapshot = keyboard.get_snapshot()
+            ``
+        :param name: The span name.
+        :param category: The span category used to filter the timeline. e.g: "wait", "probe", "input"
+        :param args: Extra values shown when the span is selected.
+        :return:
+        """
+        if self._path is None:
+            return _DISABLED_SPAN
+        return self._span(name, category, args)
+
+    def begin(self, name:str, category:str = "typing", **args):
+        """
+        Opens a span that is closed by the next ``end`` call of the same thread (or greenlet).
+        Used for spans that don't fit a single block. e.g: the exercises of the typing loop.
+        :param name: The span name.
+        :param category: The span category.
+        :param args: Extra values shown when the span is selected.
+        :return:
+        """
+        if self._path is not None:
+            self._add({"name": name, "cat": category, "ph": "B", "ts": self._timestamp(), "args": args})
+
+    def end(self):
+        if self._path is not None:
+            self._add({"ph": "E", "ts": self._timestamp()})
+
+    def instant(self, name:str, category:str = "typing", **args):
+        """
+        Records a point in time. e.g: a retried timeout.
+        :param name: The event name.
+        :param category: The event category.
+        :param args: Extra values shown when the event is selected.
+        :return:
+        """
+        if self._path is not None:
+            self._add({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self._timestamp(), "args": args})
+
+    def flush(self):
+        """
+        Appends the events recorded since the last flush to the trace file.
+        :return:
+        """
+        if self._path is None:
+            return
+        with self._lock:
+            events, self._events = self._events, []
+            if events:
+                with self._path.open("a", encoding="utf-8") as file:
+                    file.writelines(json.dumps(event) + ",\n" for event in events)
+
+
+TRACER = TraceRecorder()
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.autotyper.catalog_cache import CatalogCache, LessonRecord, ExerciseRecord
+
+
+class FakeClock:
+    def __init__(self, now:float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def lesson(title:str, button_id:str, state:str = "INCOMPLETE") -> LessonRecord:
+    return LessonRecord(title, button_id, state, [ExerciseRecord(1, False), ExerciseRecord(2, False)])
+
+
+def states_of(lessons:list[LessonRecord]) -> list[tuple[str, str, list[bool]]]:
+    return [(record.button_id, record.state, [exercise.complete for exercise in record.exercises]) for record in lessons]
+
+
+class CatalogCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / "catalog.json"
+        self.clock = FakeClock()
+        self.cache = CatalogCache(self.path, ttl=60.0, clock=self.clock)
+        self.lessons = [lesson("Home Row", "lesson-1"), lesson("Top Row", "lesson-2"), lesson("Shift Keys", "lesson-3")]
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_categories_expire_after_the_ttl(self):
+        self.cache.put_categories(["Beginner", "Intermediate"])
+        self.clock.now += 59.0
+        self.assertEqual(self.cache.get_categories(), ["Beginner", "Intermediate"])
+        self.clock.now += 1.0
+        self.assertIsNone(self.cache.get_categories())
+
+    def test_lessons_expire_after_the_ttl(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        self.clock.now += 30.0
+        self.assertEqual(self.cache.get_lessons("Beginner"), self.lessons)
+        self.clock.now += 30.0
+        self.assertIsNone(self.cache.get_lessons("Beginner"))
+        self.assertIsNone(self.cache.get_lessons("Advanced"))
+
+    def test_lessons_are_read_back_from_the_file(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        cache = CatalogCache(self.path, ttl=60.0, clock=self.clock)
+        self.assertEqual(cache.get_lessons("Beginner"), self.lessons)
+
+    def test_changed_lessons_returns_the_positions_of_the_changed_states(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        states = [("lesson-1", "COMPLETE", [False, False]), ("lesson-2", "INCOMPLETE", [False, False]),
+                  ("lesson-3", "IN_PROGRESS", [False, False])]
+        self.assertEqual(self.cache.changed_lessons("Beginner", states), [0, 2])
+        self.assertEqual(self.cache.changed_lessons("Beginner", states_of(self.lessons)), [])
+
+    def test_changed_lessons_returns_the_positions_of_the_changed_exercises(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        states = states_of(self.lessons)
+        states[1] = ("lesson-2", "INCOMPLETE", [True, False])
+        self.assertEqual(self.cache.changed_lessons("Beginner", states), [1])
+
+    def test_changed_lessons_needs_the_same_lessons(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        self.assertIsNone(self.cache.changed_lessons("Beginner", states_of(self.lessons[:2])))
+        states = states_of([self.lessons[0], lesson("Numbers", "lesson-4"), self.lessons[2]])
+        self.assertIsNone(self.cache.changed_lessons("Beginner", states))
+        self.assertIsNone(self.cache.changed_lessons("Advanced", states))
+
+    def test_changed_lessons_of_an_expired_category(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        self.clock.now += 60.0
+        self.assertIsNone(self.cache.changed_lessons("Beginner", states_of(self.lessons)))
+
+    def test_update_lessons_keeps_the_ttl(self):
+        self.cache.put_lessons("Beginner", self.lessons)
+        self.clock.now += 50.0
+        updated = lesson("Top Row", "lesson-2", "COMPLETE")
+        self.cache.update_lessons("Beginner", {1: updated})
+        self.assertEqual(self.cache.get_lessons("Beginner")[1], updated)
+        self.assertEqual(CatalogCache(self.path, ttl=60.0, clock=self.clock).get_lessons("Beginner")[1], updated)
+        self.clock.now += 10.0
+        self.assertIsNone(self.cache.get_lessons("Beginner"))
+
+    def test_update_lessons_of_a_missing_category(self):
+        self.cache.update_lessons("Beginner", {0: lesson("Home Row", "lesson-1", "COMPLETE")})
+        self.assertIsNone(self.cache.get_lessons("Beginner"))
+        self.assertFalse(self.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from src.autotyper.lesson import BaseLesson, BaseLessonExercise, ExerciseState, LessonState
+from src.autotyper.progress_journal import ProgressJournal
+
+
+def lesson(title:str, states:list[ExerciseState], indexes:list[int]) -> BaseLesson:
+    exercises = [BaseLessonExercise(None, title, state, index) for state, index in zip(states, indexes)]
+    return BaseLesson("Beginner", title, "lesson-1", LessonState.ACTIVE, exercises, None, 0.0)
+
+
+class ProgressJournalTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / "journal.jsonl"
+        self.journal = ProgressJournal(self.path)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_entries_are_replayed_from_the_file(self):
+        self.journal.record_exercise("Beginner", "Home Row", 1)
+        self.journal.record_exercise("Beginner", "Home Row", 2)
+        self.journal.record_lesson("Beginner", "Top Row")
+        journal = ProgressJournal(self.path)
+        self.assertEqual(journal.completed_exercises("Beginner", "Home Row"), {1, 2})
+        self.assertTrue(journal.is_lesson_complete("Beginner", "Top Row"))
+        self.assertEqual(len(self.path.read_text(encoding="utf-8").splitlines()), 3)
+
+    def test_a_truncated_last_line_is_ignored(self):
+        self.journal.record_exercise("Beginner", "Home Row", 1)
+        entry = json.dumps({"event": "exercise", "category": "Beginner", "lesson": "Home Row", "exercise": 2})
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(entry[:len(entry) // 2])
+        journal = ProgressJournal(self.path)
+        self.assertEqual(journal.completed_exercises("Beginner", "Home Row"), {1})
+
+    def test_malformed_lines_are_skipped(self):
+        lines = [
+            json.dumps({"event": "exercise", "category": "Beginner", "lesson": "Home Row"}),
+            json.dumps({"event": "exercise", "category": "Beginner", "lesson": "Home Row", "exercise": "first"}),
+            json.dumps({"event": "lesson", "category": "Beginner", "lesson": "Top Row"}),
+        ]
+        self.path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        journal = ProgressJournal(self.path)
+        self.assertEqual(journal.completed_exercises("Beginner", "Home Row"), set())
+        self.assertTrue(journal.is_lesson_complete("Beginner", "Top Row"))
+
+    def test_completed_exercises_and_lessons_are_kept_per_lesson(self):
+        self.journal.record_exercise("Beginner", "Home Row", 3)
+        self.journal.record_lesson("Beginner", "Home Row")
+        self.assertEqual(self.journal.completed_exercises("Beginner", "Home Row"), {3})
+        self.assertEqual(self.journal.completed_exercises("Beginner", "Top Row"), set())
+        self.assertEqual(self.journal.completed_exercises("Intermediate", "Home Row"), set())
+        self.assertTrue(self.journal.is_lesson_complete("Beginner", "Home Row"))
+        self.assertFalse(self.journal.is_lesson_complete("Intermediate", "Home Row"))
+
+    def test_completed_exercises_returns_a_copy(self):
+        self.journal.record_exercise("Beginner", "Home Row", 1)
+        self.journal.completed_exercises("Beginner", "Home Row").add(2)
+        self.assertEqual(self.journal.completed_exercises("Beginner", "Home Row"), {1})
+
+    def test_the_callback_records_the_exercises_counted_from_the_first_typed_one(self):
+        home_row = lesson("Home Row", [ExerciseState.COMPLETE] + [ExerciseState.INCOMPLETE] * 3, [10, 20, 30, 40])
+        record = home_row._journal_callback(self.journal, 2)
+        record(1)
+        record(2)
+        self.assertEqual(self.journal.completed_exercises("Beginner", "Home Row"), {20, 30})
+        record(4)
+        self.assertEqual(self.journal.completed_exercises("Beginner", "Home Row"), {20, 30})
+        self.assertIsNone(home_row._journal_callback(None, 1))
+
+    def test_a_lesson_resumes_after_the_journaled_exercises(self):
+        home_row = lesson("Home Row", [ExerciseState.COMPLETE] + [ExerciseState.INCOMPLETE] * 3, [10, 20, 30, 40])
+        self.assertEqual(home_row._resume_number(self.journal), 2)
+        self.journal.record_exercise("Beginner", "Home Row", 20)
+        self.assertEqual(home_row._resume_number(self.journal), 3)
+        self.journal.record_exercise("Beginner", "Home Row", 30)
+        self.journal.record_exercise("Beginner", "Home Row", 40)
+        self.assertIsNone(home_row._resume_number(self.journal))
+        self.assertTrue(self.journal.is_lesson_complete("Beginner", "Home Row"))
+
+
+if __name__ == "__main__":
+    unittest.main()
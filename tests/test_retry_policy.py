@@ -0,0 +1,132 @@
+import unittest
+from unittest import mock
+import playwright.sync_api
+from src.core.errors import CircuitOpenError, LessonDeadlineError
+from src.utils import retry_policy
+from src.utils.retry_policy import (RetryPolicy, RetryAttempts, CircuitBreaker, RETRY_METRICS, DEFAULT_TIMEOUT,
+                                    lesson_deadline)
+
+
+class FakeClock:
+    def __init__(self, now:float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.timeouts:list[float] = []
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def set_default_timeout(self, timeout:float):
+        self.timeouts.append(timeout)
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_backoff_doubles_up_to_the_max_delay(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.5, jitter=0.0)
+        self.assertEqual([policy.backoff(attempt) for attempt in range(1, 6)], [0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_backoff_jitter_waits_a_fraction_of_the_delay(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=1.0, jitter=0.5)
+        for value, expected in ((0.0, 0.5), (0.5, 0.75), (1.0, 1.0)):
+            with mock.patch.object(retry_policy.random, "uniform", side_effect=lambda low, high: low + (high - low) * value):
+                self.assertAlmostEqual(policy.backoff(3), expected)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(retry_policy, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(RETRY_METRICS.reset)
+        self.page = FakePage()
+        self.breaker = CircuitBreaker(threshold=3, cooldown=30.0)
+
+    def test_opens_after_the_threshold_and_closes_after_the_cooldown(self):
+        for _ in range(2):
+            self.breaker.record_failure("TypingKeyboard._press")
+        self.breaker.check(self.page)
+        self.breaker.record_failure("TypingKeyboard._press")
+        self.assertRaises(CircuitOpenError, self.breaker.check, self.page)
+        self.clock.now += 29.0
+        self.assertRaises(CircuitOpenError, self.breaker.check, self.page)
+        self.clock.now += 1.0
+        self.breaker.check(self.page)
+
+    def test_a_success_resets_the_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure("TypingKeyboard._press")
+        self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure("TypingKeyboard._press")
+        self.breaker.check(self.page)
+
+    def test_a_closed_page_opens_the_circuit(self):
+        self.page.closed = True
+        self.assertRaises(CircuitOpenError, self.breaker.check, self.page)
+        self.page.closed = False
+        self.assertRaises(CircuitOpenError, self.breaker.check, self.page)
+        self.clock.now += 30.0
+        self.breaker.check(self.page)
+        self.assertEqual(RETRY_METRICS.snapshot()[("circuit_trips", "")], 1)
+
+
+class LessonDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(retry_policy, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(RETRY_METRICS.reset)
+        self.page = FakePage()
+        self.policy = RetryPolicy(tries=3, timeout=10000.0, base_delay=4.0, max_delay=4.0, jitter=0.0)
+
+    def budget_of_an_attempt(self) -> float:
+        attempts = RetryAttempts(self.policy, "TypingKeyboard._press", self.page)
+        previous, token = attempts.start()
+        budget = retry_policy._timeout_budget.get()
+        attempts.finish(previous, token)
+        return budget
+
+    def test_the_budget_is_the_policy_timeout_without_deadline(self):
+        self.assertEqual(self.budget_of_an_attempt(), 10000.0)
+        with lesson_deadline(0):
+            self.clock.now += 3600.0
+            self.assertEqual(self.budget_of_an_attempt(), 10000.0)
+
+    def test_the_budget_is_capped_by_the_remaining_deadline(self):
+        with lesson_deadline(60.0):
+            self.assertEqual(self.budget_of_an_attempt(), 10000.0)
+            self.clock.now += 58.0
+            self.assertEqual(self.budget_of_an_attempt(), 2000.0)
+        # the page gets the capped budget during the attempt and its previous timeout afterwards
+        self.assertEqual(self.page.timeouts[-2:], [2000.0, DEFAULT_TIMEOUT])
+
+    def test_an_exceeded_deadline_stops_the_attempts(self):
+        with lesson_deadline(60.0):
+            self.clock.now += 60.0
+            self.assertRaises(LessonDeadlineError, self.budget_of_an_attempt)
+        self.assertEqual(RETRY_METRICS.snapshot()[("deadline_exceeded", "TypingKeyboard._press")], 1)
+
+    def test_the_backoff_is_capped_by_the_remaining_deadline(self):
+        error = playwright.sync_api.TimeoutError("Timeout 10000ms exceeded.")
+        with lesson_deadline(60.0):
+            attempts = RetryAttempts(self.policy, "TypingKeyboard._press", self.page)
+            attempts.finish(*attempts.start())
+            self.assertEqual(attempts.failed(error), 4.0)
+            self.clock.now += 59.0
+            attempts.finish(*attempts.start())
+            self.assertEqual(attempts.failed(error), 1.0)
+            attempts.finish(*attempts.start())
+            self.assertIsNone(attempts.failed(error))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from src.autotyper.lesson import BaseLesson, LessonState, select_lessons
+from src.core.errors import LessonNotFoundError
+
+TITLES = ["Home Row", "Top Row", "Bottom Row", "Numbers", "Shift Keys", "Symbols"]
+
+
+def lesson(title:str) -> BaseLesson:
+    return BaseLesson("Beginner", title, None, LessonState.ACTIVE, [], None, 0.0)
+
+
+class SelectLessonsTest(unittest.TestCase):
+    def setUp(self):
+        self.lessons = [lesson(title) for title in TITLES]
+
+    def test_valid_selections(self):
+        cases = [
+            ([], TITLES),
+            ([1], ["Home Row"]),
+            (["2"], ["Top Row"]),
+            ([" 6 "], ["Symbols"]),
+            (["3-5"], ["Bottom Row", "Numbers", "Shift Keys"]),
+            (["1 - 2"], ["Home Row", "Top Row"]),
+            (["4-4"], ["Numbers"]),
+            (["Shift Keys"], ["Shift Keys"]),
+            ([1, "3-5", "Shift Keys"], ["Home Row", "Bottom Row", "Numbers", "Shift Keys", "Shift Keys"]),
+            (["Symbols", 1], ["Symbols", "Home Row"]),
+            # as split by the ``--lessons`` option of the cli
+            ("1,3-5,Shift Keys".split(","), ["Home Row", "Bottom Row", "Numbers", "Shift Keys", "Shift Keys"]),
+        ]
+        for selection, expected in cases:
+            with self.subTest(selection=selection):
+                self.assertEqual([selected.title for selected in select_lessons(self.lessons, selection)], expected)
+
+    def test_invalid_selections(self):
+        cases = [
+            [0],
+            [7],
+            ["0-2"],
+            ["5-7"],
+            ["4-2"],
+            ["Space Bar"],
+            ["home row"],
+            ["1,3"],
+            [1, "Space Bar"],
+        ]
+        for selection in cases:
+            with self.subTest(selection=selection):
+                self.assertRaises(LessonNotFoundError, select_lessons, self.lessons, selection)
+
+    def test_an_empty_selection_returns_a_copy(self):
+        selected = select_lessons(self.lessons, [])
+        self.assertIsNot(selected, self.lessons)
+        self.assertEqual(selected, self.lessons)
+
+
+if __name__ == "__main__":
+    unittest.main()